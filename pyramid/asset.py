@@ -16,7 +16,15 @@ class OverrideProvider(pkg_resources.DefaultProvider):
 
     def _get_overrides(self):
         reg = get_current_registry()
-        overrides = reg.queryUtility(IPackageOverrides, self.module_name)
+        # the package's loader is the overrides object of the registry which
+        # most recently overrode it; only when another application's
+        # registry is current do we need to look up its own overrides.  The
+        # loader is shared by every application in the process, so the
+        # current registry must still be checked: an application which
+        # never overrode this package must not use another one's overrides
+        overrides = self.loader
+        if getattr(overrides, 'registry', None) is not reg:
+            overrides = reg.queryUtility(IPackageOverrides, self.module_name)
         return overrides
     
     def get_resource_filename(self, manager, resource_name):
@@ -81,8 +89,10 @@ class OverrideProvider(pkg_resources.DefaultProvider):
         
 class PackageOverrides:
     implements(IPackageOverrides)
+    # the maximum number of resolved asset names remembered
+    resolved_max = 10000
     # pkg_resources arg in kw args below for testing
-    def __init__(self, package, pkg_resources=pkg_resources):
+    def __init__(self, package, pkg_resources=pkg_resources, registry=None):
         if hasattr(package, '__loader__') and not isinstance(package.__loader__,
                                                              self.__class__):
             raise TypeError('Package %s already has a non-%s __loader__ '
@@ -104,6 +114,8 @@ class PackageOverrides:
         pkg_resources.register_loader_type(self.__class__, OverrideProvider)
         self.overrides = []
         self.overridden_package_name = package.__name__
+        self.registry = registry
+        self.resolved = {}
 
     def insert(self, path, package, prefix):
         if not path or path.endswith('/'):
@@ -111,6 +123,7 @@ class PackageOverrides:
         else:
             override = FileOverride(path, package, prefix)
         self.overrides.insert(0, override)
+        self.resolved.clear()
         return override
 
     def search_path(self, resource_name):
@@ -120,35 +133,56 @@ class PackageOverrides:
                 package, name = o
                 yield package, name
 
-    def get_filename(self, resource_name):
+    def resolve(self, resource_name):
+        """ Return the ``(package, name)`` of the existing asset which
+        overrides ``resource_name``, or ``None`` if it is not overridden.
+        The result is remembered until the next :meth:`insert`, unless the
+        ``reload_assets`` setting of the registry is true."""
+        resolved = self.resolved
+        try:
+            return resolved[resource_name]
+        except KeyError:
+            pass
+        result = None
         for package, rname in self.search_path(resource_name):
             if pkg_resources.resource_exists(package, rname):
-                return pkg_resources.resource_filename(package, rname)
+                result = package, rname
+                break
+        settings = getattr(self.registry, 'settings', None)
+        if not (settings and settings.get('reload_assets')):
+            if len(resolved) >= self.resolved_max:
+                resolved.clear()
+            resolved[resource_name] = result
+        return result
+
+    def get_filename(self, resource_name):
+        resolved = self.resolve(resource_name)
+        if resolved is not None:
+            return pkg_resources.resource_filename(*resolved)
 
     def get_stream(self, resource_name):
-        for package, rname in self.search_path(resource_name):
-            if pkg_resources.resource_exists(package, rname):
-                return pkg_resources.resource_stream(package, rname)
+        resolved = self.resolve(resource_name)
+        if resolved is not None:
+            return pkg_resources.resource_stream(*resolved)
 
     def get_string(self, resource_name):
-        for package, rname in self.search_path(resource_name):
-            if pkg_resources.resource_exists(package, rname):
-                return pkg_resources.resource_string(package, rname)
+        resolved = self.resolve(resource_name)
+        if resolved is not None:
+            return pkg_resources.resource_string(*resolved)
 
     def has_resource(self, resource_name):
-        for package, rname in self.search_path(resource_name):
-            if pkg_resources.resource_exists(package, rname):
-                return True
+        if self.resolve(resource_name) is not None:
+            return True
 
     def isdir(self, resource_name):
-        for package, rname in self.search_path(resource_name):
-            if pkg_resources.resource_exists(package, rname):
-                return pkg_resources.resource_isdir(package, rname)
+        resolved = self.resolve(resource_name)
+        if resolved is not None:
+            return pkg_resources.resource_isdir(*resolved)
 
     def listdir(self, resource_name):
-        for package, rname in self.search_path(resource_name):
-            if pkg_resources.resource_exists(package, rname):
-                return pkg_resources.resource_listdir(package, rname)
+        resolved = self.resolve(resource_name)
+        if resolved is not None:
+            return pkg_resources.resource_listdir(*resolved)
     
 
 class DirectoryOverride:
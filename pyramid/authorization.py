@@ -111,26 +111,74 @@ class ACLAuthorizationPolicy(object):
                 acl = location.__acl__
             except AttributeError:
                 continue
-
-            allowed_here = set()
-            denied_here = set()
-            
-            for ace_action, ace_principal, ace_permissions in acl:
-                if not hasattr(ace_permissions, '__iter__'):
-                    ace_permissions = [ace_permissions]
-                if (ace_action == Allow) and (permission in ace_permissions):
-                    if not ace_principal in denied_here:
-                        allowed_here.add(ace_principal)
-                if (ace_action == Deny) and (permission in ace_permissions):
-                        denied_here.add(ace_principal)
-                        if ace_principal == Everyone:
-                            # clear the entire allowed set, as we've hit a
-                            # deny of Everyone ala (Deny, Everyone, ALL)
-                            allowed = set()
-                            break
-                        elif ace_principal in allowed:
-                            allowed.remove(ace_principal)
-
-            allowed.update(allowed_here)
+            allowed = _apply_acl(allowed, acl, permission)
 
         return allowed
+
+    def bulk_principals_allowed_by_permission(self, contexts, permission):
+        """ Return a list containing, for each context in the sequence
+        ``contexts`` (in the same order), the set of principals which
+        :meth:`principals_allowed_by_permission` would return for it.  The
+        set computed for each location in the :term:`lineage` of the
+        contexts is reused for all of its descendants, so computing the
+        sets of many siblings, or of every resource in a subtree, applies
+        each ACL only once."""
+        # id(location) -> (location, principals allowed at location); the
+        # location is kept so that its id is not reused by another object
+        # (e.g. when the contexts are created lazily) during this call
+        computed = {}
+        result = []
+
+        for context in contexts:
+            unknown = []
+            allowed = None
+            location = context
+            while location is not None:
+                entry = computed.get(id(location))
+                if entry is not None:
+                    allowed = entry[1]
+                    break
+                unknown.append(location)
+                location = getattr(location, '__parent__', None)
+            if allowed is None:
+                allowed = set()
+            while unknown:
+                # NB: we're walking *down* the object graph to the context
+                location = unknown.pop()
+                try:
+                    acl = location.__acl__
+                except AttributeError:
+                    pass
+                else:
+                    # the parent's set is shared by its other descendants
+                    allowed = _apply_acl(set(allowed), acl, permission)
+                computed[id(location)] = (location, allowed)
+            result.append(set(allowed))
+
+        return result
+
+def _apply_acl(allowed, acl, permission):
+    # return the principals allowed ``permission`` after the ACL ``acl`` of
+    # a location is applied to the principals allowed by its parent;
+    # ``allowed`` may be mutated
+    allowed_here = set()
+    denied_here = set()
+
+    for ace_action, ace_principal, ace_permissions in acl:
+        if not hasattr(ace_permissions, '__iter__'):
+            ace_permissions = [ace_permissions]
+        if (ace_action == Allow) and (permission in ace_permissions):
+            if not ace_principal in denied_here:
+                allowed_here.add(ace_principal)
+        if (ace_action == Deny) and (permission in ace_permissions):
+                denied_here.add(ace_principal)
+                if ace_principal == Everyone:
+                    # clear the entire allowed set, as we've hit a
+                    # deny of Everyone ala (Deny, Everyone, ALL)
+                    allowed = set()
+                    break
+                elif ace_principal in allowed:
+                    allowed.remove(ace_principal)
+
+    allowed.update(allowed_here)
+    return allowed
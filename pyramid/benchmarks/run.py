@@ -0,0 +1,296 @@
+""" Measure the requests handled per second by the :term:`router` of a set
+of canonical applications: a hello world view, URL dispatch with 10, 100
+and 1000 routes, deep traversal, a view secured by an ACL, views rendered
+by the JSON, Chameleon and Mako renderers, a view using a session and a
+static view.  Besides the timing, the number of Python function calls made
+per request and the number of objects retained per request (a non-zero
+value indicates a cache filling up or a leak) are reported.  The results
+can be written as JSON (``-o``), so that they can be compared across
+releases.  Deployment settings (e.g. ``-s lean_router=true``) are passed to
+the configurator of each application.
+
+Usage::
+
+  python -m pyramid.benchmarks.run [-n iterations] [-o results.json]
+                                   [-s name=value ...] [scenario ...]
+"""
+import gc
+import optparse
+import platform
+import sys
+import time
+
+from StringIO import StringIO
+
+from pyramid.authentication import RemoteUserAuthenticationPolicy
+from pyramid.authorization import ACLAuthorizationPolicy
+from pyramid.compat import json
+from pyramid.config import Configurator
+from pyramid.response import Response
+from pyramid.security import ALL_PERMISSIONS
+from pyramid.security import Allow
+from pyramid.security import Authenticated
+from pyramid.security import Everyone
+from pyramid.session import UnencryptedCookieSessionFactoryConfig
+
+def hello_view(request):
+    return Response('Hello world')
+
+def data_view(request):
+    return {'greeting':'Hello world', 'items':range(10)}
+
+def session_view(request):
+    session = request.session
+    session['count'] = session.get('count', 0) + 1
+    return Response('Hello world')
+
+class Resource(dict):
+    pass
+
+class SecuredRoot(object):
+    __acl__ = [(Allow, 'admin', ALL_PERMISSIONS),
+               (Allow, Authenticated, 'edit'),
+               (Allow, Everyone, 'view')]
+    def __init__(self, request):
+        pass
+
+def make_environ(path, **kw):
+    environ = {
+        'wsgi.version':(1, 0),
+        'wsgi.url_scheme':'http',
+        'wsgi.input':StringIO(''),
+        'SERVER_NAME':'localhost',
+        'SERVER_PORT':'80',
+        'SERVER_PROTOCOL':'HTTP/1.0',
+        'REQUEST_METHOD':'GET',
+        'SCRIPT_NAME':'',
+        'PATH_INFO':path,
+        }
+    environ.update(kw)
+    return environ
+
+def hello_app(settings):
+    config = Configurator(settings=settings)
+    config.add_view(hello_view)
+    return config.make_wsgi_app(), make_environ('/')
+
+def routes_app(settings, count):
+    # the last route is requested, so every route is tried
+    config = Configurator(settings=settings)
+    for i in range(count):
+        name = 'route%d' % i
+        config.add_route(name, '/%s/{id}' % name)
+        config.add_view(hello_view, route_name=name)
+    return config.make_wsgi_app(), make_environ('/route%d/1' % (count - 1))
+
+def traversal_app(settings, depth=10):
+    root = node = Resource()
+    path = ''
+    for i in range(depth):
+        name = 'node%d' % i
+        node[name] = node = Resource()
+        path += '/' + name
+    config = Configurator(settings=settings,
+                          root_factory=lambda request: root)
+    config.add_view(hello_view, context=Resource)
+    return config.make_wsgi_app(), make_environ(path + '/')
+
+def secured_app(settings):
+    config = Configurator(
+        settings=settings,
+        root_factory=SecuredRoot,
+        authentication_policy=RemoteUserAuthenticationPolicy(),
+        authorization_policy=ACLAuthorizationPolicy())
+    config.add_view(hello_view, permission='view')
+    return config.make_wsgi_app(), make_environ('/', REMOTE_USER='fred')
+
+def renderer_app(settings, renderer, extra=None):
+    settings = dict(settings)
+    settings.update(extra or {})
+    config = Configurator(settings=settings)
+    config.add_view(data_view, renderer=renderer)
+    return config.make_wsgi_app(), make_environ('/')
+
+def session_app(settings):
+    config = Configurator(
+        settings=settings,
+        session_factory=UnencryptedCookieSessionFactoryConfig('secret'))
+    config.add_view(session_view)
+    app = config.make_wsgi_app()
+    # obtain a session cookie, so that each measured request loads and
+    # saves an existing session
+    headers = []
+    def start_response(status, headerlist, exc_info=None):
+        headers.extend(headerlist)
+    app(make_environ('/'), start_response)
+    cookie = [ value.split(';')[0] for name, value in headers
+               if name.lower() == 'set-cookie' ][0]
+    return app, make_environ('/', HTTP_COOKIE=cookie)
+
+def static_app(settings):
+    config = Configurator(settings=settings)
+    config.add_static_view('static', 'pyramid.benchmarks:static')
+    return config.make_wsgi_app(), make_environ('/static/hello.txt')
+
+scenarios = (
+    ('hello', hello_app),
+    ('routes_10', lambda settings: routes_app(settings, 10)),
+    ('routes_100', lambda settings: routes_app(settings, 100)),
+    ('routes_1000', lambda settings: routes_app(settings, 1000)),
+    ('traversal', traversal_app),
+    ('secured', secured_app),
+    ('json', lambda settings: renderer_app(settings, 'json')),
+    ('chameleon', lambda settings: renderer_app(
+        settings, 'pyramid.benchmarks:templates/hello.pt')),
+    ('mako', lambda settings: renderer_app(
+        settings, 'hello.mak',
+        {'mako.directories':'pyramid.benchmarks:templates'})),
+    ('session', session_app),
+    ('static', static_app),
+    )
+
+def make_caller(app, environ):
+    """ Return a function which makes a request to ``app`` with a copy of
+    ``environ`` and consumes the response body like a WSGI server would.
+    The function raises a :exc:`RuntimeError` if the response status is
+    not ``200 OK``."""
+    statuses = []
+    def start_response(status, headerlist, exc_info=None):
+        statuses.append(status)
+    def call():
+        result = app(environ.copy(), start_response)
+        try:
+            for chunk in result:
+                pass
+        finally:
+            close = getattr(result, 'close', None)
+            if close is not None:
+                close()
+        status = statuses.pop()
+        if status != '200 OK':
+            raise RuntimeError('%s %s' % (environ['PATH_INFO'], status))
+    return call
+
+def count_calls(call):
+    """ Return the number of Python function calls made by ``call()``."""
+    calls = [0]
+    def profile(frame, event, arg):
+        if event == 'call':
+            calls[0] += 1
+    sys.setprofile(profile)
+    try:
+        call()
+    finally:
+        sys.setprofile(None)
+    return calls[0] - 1 # the call to ``call`` itself
+
+def count_retained(call, iterations):
+    """ Return the mean number of objects tracked by the garbage collector
+    which remain alive after each of ``iterations`` calls to ``call()``."""
+    gc.collect()
+    before = len(gc.get_objects())
+    for i in xrange(iterations):
+        call()
+    gc.collect()
+    return float(len(gc.get_objects()) - before) / iterations
+
+def measure(app, environ, iterations):
+    """ Make ``iterations`` requests to ``app`` using ``environ`` (after one
+    warm-up request) and return a dictionary of results."""
+    call = make_caller(app, environ)
+    call()
+    timer = time.time
+    start = timer()
+    for i in xrange(iterations):
+        call()
+    elapsed = timer() - start
+    return {
+        'requests':iterations,
+        'seconds':elapsed,
+        'requests_per_second':iterations / (elapsed or 1e-9),
+        'usec_per_request':elapsed / iterations * 1e6,
+        'calls_per_request':count_calls(call),
+        'retained_per_request':count_retained(call, iterations),
+        }
+
+def run(iterations=1000, names=None, settings=None):
+    """ Run the scenarios named in ``names`` (all scenarios if ``names`` is
+    ``None``) using the deployment settings in ``settings`` and return a
+    list of ``(name, results)`` tuples."""
+    if settings is None:
+        settings = {}
+    results = []
+    for name, factory in scenarios:
+        if names is None or name in names:
+            app, environ = factory(settings)
+            results.append((name, measure(app, environ, iterations)))
+    return results
+
+def pyramid_version():
+    try:
+        import pkg_resources
+        return pkg_resources.get_distribution('pyramid').version
+    except Exception: # pragma: no cover
+        return None
+
+def main(argv=sys.argv, out=sys.stdout):
+    parser = optparse.OptionParser(
+        usage='%prog [-n iterations] [-o results.json] [-s name=value ...] '
+              '[scenario ...]')
+    parser.add_option('-n', '--iterations', dest='iterations', type='int',
+                      default=1000,
+                      help='Number of requests per scenario (default 1000)')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='Write the results as JSON to this file '
+                           '("-" for standard output)')
+    parser.add_option('-s', '--setting', dest='settings', action='append',
+                      default=[],
+                      help='A deployment setting passed to each '
+                           'application, as name=value (may be repeated)')
+    options, args = parser.parse_args(argv[1:])
+    settings = {}
+    for setting in options.settings:
+        if '=' not in setting:
+            parser.error('setting %r is not of the form name=value' % (
+                setting,))
+        name, value = setting.split('=', 1)
+        settings[name] = value
+    known = [ name for name, factory in scenarios ]
+    for name in args:
+        if name not in known:
+            parser.error('unknown scenario %r (choose from %s)' % (
+                name, ', '.join(known)))
+
+    results = run(options.iterations, args or None, settings)
+
+    if options.output is None:
+        out.write('%-12s %10s %10s %8s %9s\n' % (
+            'scenario', 'req/s', 'usec/req', 'calls', 'retained'))
+        for name, result in results:
+            out.write('%-12s %10.1f %10.1f %8d %9.2f\n' % (
+                name, result['requests_per_second'],
+                result['usec_per_request'], result['calls_per_request'],
+                result['retained_per_request']))
+        return
+
+    data = {
+        'pyramid':pyramid_version(),
+        'python':platform.python_version(),
+        'platform':platform.platform(),
+        'time':time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'iterations':options.iterations,
+        'settings':settings,
+        'scenarios':dict(results),
+        }
+    if options.output == '-':
+        json.dump(data, out, indent=2, sort_keys=True)
+        out.write('\n')
+    else:
+        f = open(options.output, 'w')
+        try:
+            json.dump(data, f, indent=2, sort_keys=True)
+        finally:
+            f.close()
+
+if __name__ == '__main__': # pragma: no cover
+    main()
@@ -0,0 +1,10 @@
+<html>
+<body>
+  <h1>${greeting}</h1>
+  <ul>
+  % for item in items:
+    <li>${item}</li>
+  % endfor
+  </ul>
+</body>
+</html>
@@ -0,0 +1,85 @@
+""" Measure the per-call overhead added by view derivation for a plain
+view, a view protected by a permission, a view which uses a renderer and a
+view which combines a predicate, a permission and a renderer.
+
+Usage::
+
+  python -m pyramid.benchmarks.views [iterations]
+"""
+import sys
+import time
+
+from pyramid.authentication import RemoteUserAuthenticationPolicy
+from pyramid.authorization import ACLAuthorizationPolicy
+from pyramid.config import Configurator
+from pyramid.request import Request
+from pyramid.response import Response
+from pyramid.security import Allow
+from pyramid.security import Everyone
+
+class Context(object):
+    __acl__ = [(Allow, Everyone, 'view')]
+
+# the response is created once so that only the view call overhead is
+# measured
+response = Response('OK')
+
+def plain_view(request):
+    return response
+
+def data_view(request):
+    return 'OK'
+
+def true_predicate(context, request):
+    return True
+
+scenarios = (
+    ('plain', plain_view, {}),
+    ('secured', plain_view, {'permission':'view'}),
+    ('rendered', data_view, {'renderer':'string'}),
+    ('combined', data_view, {'renderer':'string', 'permission':'view',
+                             'predicates':(true_predicate,)}),
+    )
+
+def derive(view, **kw):
+    """ Return a ``(derived_view, request)`` tuple for ``view`` derived
+    with the view options in ``kw``."""
+    config = Configurator(
+        authentication_policy=RemoteUserAuthenticationPolicy(),
+        authorization_policy=ACLAuthorizationPolicy(),
+        autocommit=True)
+    derived = config._derive_view(view, **kw)
+    request = Request.blank('/')
+    request.registry = config.registry
+    return derived, request
+
+def timeit(view, context, request, iterations):
+    """ Return the number of seconds taken to call ``view`` ``iterations``
+    times."""
+    timer = time.time
+    start = timer()
+    for i in xrange(iterations):
+        view(context, request)
+    return timer() - start
+
+def run(iterations=10000):
+    """ Run each scenario and return a list of ``(name, usec)`` tuples,
+    where ``usec`` is the mean microseconds per call."""
+    results = []
+    context = Context()
+    for name, view, kw in scenarios:
+        derived, request = derive(view, **kw)
+        elapsed = timeit(derived, context, request, iterations)
+        results.append((name, elapsed / iterations * 1e6))
+    return results
+
+def main(argv=sys.argv, out=sys.stdout):
+    iterations = 10000
+    if len(argv) > 1:
+        iterations = int(argv[1])
+    out.write('%-10s %12s\n' % ('view', 'time'))
+    for name, usec in run(iterations):
+        out.write('%-10s %10.2fus\n' % (name, usec))
+
+if __name__ == '__main__': # pragma: no cover
+    main()
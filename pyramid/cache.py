@@ -0,0 +1,407 @@
+""" Cache backends used by the ``cache`` :term:`view configuration` option,
+which caches the rendered responses of a view, and by the
+:class:`FragmentCache` available to templates as ``fragment_cache``.
+
+A backend is registered via
+:meth:`pyramid.config.Configurator.set_cache_backend`; when none is
+registered, an in-process :class:`MemoryCacheBackend` is used.  Any object
+implementing :class:`pyramid.interfaces.ICacheBackend` may be used as a
+backend; the backends in this module are:
+
+:class:`MemoryCacheBackend`
+  A least-recently-used cache with per-entry expiry, private to the
+  process.
+
+:class:`FileCacheBackend`
+  One file per entry in a directory, shared by the processes using the
+  same directory.
+
+:class:`MemcachedCacheBackend`
+  A client for a server speaking the memcached text protocol, shared by
+  all the processes using the server.
+
+Values stored in the file and memcached backends must be pickleable.
+"""
+import os
+import socket
+import tempfile
+import threading
+import time
+
+try:
+    import cPickle as pickle
+except ImportError: # pragma: no cover
+    import pickle
+
+from repoze.lru import LRUCache
+
+from zope.interface import implements
+
+from pyramid.interfaces import ICacheBackend
+
+from pyramid.compat import md5
+from pyramid.decorator import reify
+from pyramid.exceptions import ConfigurationError
+from pyramid.i18n import get_locale_name
+from pyramid.security import effective_principals
+
+class MemoryCacheBackend(object):
+    """ An in-process cache holding at most ``max_entries`` entries; the
+    least recently used entries are evicted first.  Values are stored as is
+    (they are not copied)."""
+    implements(ICacheBackend)
+
+    timer = time.time # for testing injection
+
+    def __init__(self, max_entries=1000):
+        self.entries = LRUCache(max_entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires <= self.timer():
+            self.entries.invalidate(key)
+            return None
+        return value
+
+    def set(self, key, value, timeout=None):
+        self.entries.put(key, (_expires(self.timer, timeout), value))
+
+    def delete(self, key):
+        self.entries.invalidate(key)
+
+class FileCacheBackend(object):
+    """ A cache storing each entry as a pickle in a file in ``directory``
+    (created if it does not exist), named by a hash of its key.  Expired
+    entries are removed when they are read; entries which are never read
+    again are left on disk, so the directory should be cleaned periodically
+    (e.g. by removing files older than the longest timeout used)."""
+    implements(ICacheBackend)
+
+    timer = time.time # for testing injection
+
+    def __init__(self, directory):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+
+    def filename(self, key):
+        """ Return the name of the file the entry ``key`` is stored in."""
+        return os.path.join(self.directory, md5(key).hexdigest())
+
+    def get(self, key):
+        filename = self.filename(key)
+        try:
+            f = open(filename, 'rb')
+            try:
+                stored_key, expires, value = pickle.load(f)
+            finally:
+                f.close()
+        except (IOError, OSError, EOFError, ValueError, pickle.PickleError):
+            return None
+        if stored_key != key:
+            return None
+        if expires is not None and expires <= self.timer():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key, value, timeout=None):
+        # write to a temporary file and rename it into place so that
+        # readers never see a partially written entry
+        filename = self.filename(key)
+        entry = (key, _expires(self.timer, timeout), value)
+        fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            f = os.fdopen(fd, 'wb')
+            try:
+                pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+            finally:
+                f.close()
+            try:
+                os.rename(tmpname, filename)
+            except OSError: # pragma: no cover (windows)
+                os.remove(filename)
+                os.rename(tmpname, filename)
+        except:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            raise
+
+    def delete(self, key):
+        try:
+            os.remove(self.filename(key))
+        except OSError:
+            pass
+
+class MemcachedCacheBackend(object):
+    """ A cache stored by a server speaking the memcached text protocol at
+    ``host`` and ``port``.  Keys are hashed (and prefixed with ``prefix``)
+    to satisfy the protocol's restrictions on keys, and values are pickled.
+    Each thread uses its own connection.  Errors communicating with the
+    server are not raised: a failed ``get`` is a miss and a failed ``set``
+    is ignored, so an unavailable server never fails a request."""
+    implements(ICacheBackend)
+
+    def __init__(self, host='127.0.0.1', port=11211, prefix='pyramid:',
+                 timeout=1.0):
+        self.address = (host, int(port))
+        self.prefix = prefix
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def server_key(self, key):
+        """ Return the key under which ``key`` is stored on the server."""
+        return self.prefix + md5(key).hexdigest()
+
+    def connect(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.address)
+        return sock, sock.makefile('rb')
+
+    def _command(self, command, reader):
+        # send ``command`` and return the result of ``reader(file)``, or
+        # ``None`` if communicating with the server fails
+        connection = getattr(self.local, 'connection', None)
+        try:
+            if connection is None:
+                connection = self.local.connection = self.connect()
+            sock, f = connection
+            sock.sendall(command)
+            return reader(f)
+        except (socket.error, IOError, EOFError, ValueError):
+            self.local.connection = None
+            if connection is not None:
+                try:
+                    connection[0].close()
+                except socket.error: # pragma: no cover
+                    pass
+            return None
+
+    def get(self, key):
+        def read(f):
+            line = _readline(f)
+            if line == 'END':
+                return None
+            parts = line.split()
+            if len(parts) != 4 or parts[0] != 'VALUE':
+                raise ValueError(line)
+            length = int(parts[3])
+            data = f.read(length + 2)
+            if len(data) != length + 2:
+                raise EOFError
+            if _readline(f) != 'END':
+                raise ValueError(line)
+            return pickle.loads(data[:length])
+        return self._command('get %s\r\n' % self.server_key(key), read)
+
+    def set(self, key, value, timeout=None):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        command = 'set %s 0 %d %d\r\n%s\r\n' % (
+            self.server_key(key), int(timeout or 0), len(data), data)
+        self._command(command, _readline)
+
+    def delete(self, key):
+        self._command('delete %s\r\n' % self.server_key(key), _readline)
+
+def _readline(f):
+    line = f.readline()
+    if not line.endswith('\r\n'):
+        raise EOFError
+    return line[:-2]
+
+def _expires(timer, timeout):
+    if not timeout:
+        return None
+    return timer() + timeout
+
+class _KeyLocks(object):
+    # a lock per key, which exists only while it is held or waited for
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.locks = {} # key -> [lock, number of holders and waiters]
+
+    def acquire(self, key):
+        self.lock.acquire()
+        try:
+            entry = self.locks.get(key)
+            if entry is None:
+                entry = self.locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        finally:
+            self.lock.release()
+        entry[0].acquire()
+
+    def release(self, key):
+        self.lock.acquire()
+        try:
+            entry = self.locks[key]
+            entry[1] -= 1
+            if not entry[1]:
+                del self.locks[key]
+            entry[0].release()
+        finally:
+            self.lock.release()
+
+_key_locks = _KeyLocks()
+
+def get_or_create(backend, key, creator, timeout=None):
+    """ Return the value stored in ``backend`` for ``key``.  If there is
+    none, call ``creator()`` and store the value it returns (unless it is
+    ``None``) for ``timeout`` seconds.  Only one thread of the process
+    calls ``creator`` for a missing key at a time; other threads asking for
+    the same key wait for it and then use the value it stored, so an
+    expired entry is not recomputed by every thread that requests it."""
+    value = backend.get(key)
+    if value is not None:
+        return value
+    _key_locks.acquire(key)
+    try:
+        value = backend.get(key)
+        if value is None:
+            value = creator()
+            if value is not None:
+                backend.set(key, value, timeout)
+        return value
+    finally:
+        _key_locks.release(key)
+
+def get_cache_backend(registry):
+    """ Return the cache backend registered in ``registry``, registering a
+    :class:`MemoryCacheBackend` if there is none."""
+    backend = registry.queryUtility(ICacheBackend)
+    if backend is None:
+        backend = MemoryCacheBackend()
+        registry.registerUtility(backend, ICacheBackend)
+    return backend
+
+class FragmentCache(object):
+    """ Caches fragments of rendered output, such as the markup of a
+    navigation tree or a footer, in the cache backend set with
+    :meth:`pyramid.config.Configurator.set_cache_backend` (see
+    :func:`get_cache_backend`).  An instance is passed to every template
+    renderer as the ``fragment_cache`` :term:`system value <renderer
+    globals>`, so it's available as a top-level name in Chameleon and Mako
+    templates.
+
+    Fragments are shared by all requests: the ``key`` of a fragment (any
+    object with a stable ``repr``, such as a string or a tuple of strings)
+    must include everything the fragment depends on.  Each fragment is
+    kept for ``timeout`` seconds (:attr:`default_timeout` if ``None``).
+    When a fragment is missing, only one thread of the process renders
+    it."""
+
+    default_timeout = 300
+
+    def __init__(self, registry, request=None, package=None):
+        self.registry = registry
+        self.request = request
+        self.package = package
+
+    @reify
+    def backend(self):
+        return get_cache_backend(self.registry)
+
+    def _key(self, key):
+        return repr(('fragment', key))
+
+    def __call__(self, key, creator, timeout=None):
+        """ Return the fragment stored for ``key``, calling ``creator``
+        without arguments to produce it (usually a string) if it is missing.
+        For example, in a Mako template which defines a ``nav`` def::
+
+          ${fragment_cache('nav', lambda: capture(nav), 600) | n}
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        return get_or_create(self.backend, self._key(key), creator, timeout)
+
+    def render(self, key, renderer_name, value=None, timeout=None):
+        """ Return the fragment stored for ``key``, rendering
+        ``renderer_name`` (e.g. a template asset specification, relative to
+        the package of the current renderer) with the dictionary ``value``
+        to produce it if it is missing.  For example, in a Chameleon ZPT
+        template::
+
+          <div tal:replace="structure fragment_cache.render(
+                                'nav', 'templates/nav.pt')"/>
+        """
+        def create():
+            from pyramid.renderers import RendererHelper
+            helper = RendererHelper(name=renderer_name, package=self.package,
+                                    registry=self.registry)
+            return helper.render(value or {}, None, request=self.request)
+        return self(key, create, timeout)
+
+    def invalidate(self, key):
+        """ Remove the fragment stored for ``key``, if any."""
+        self.backend.delete(self._key(key))
+
+def _vary_path(context, request):
+    return request.path_info
+
+def _vary_matchdict(context, request):
+    return sorted((getattr(request, 'matchdict', None) or {}).items())
+
+def _vary_params(context, request):
+    return sorted(request.params.items())
+
+def _vary_principals(context, request):
+    return sorted(effective_principals(request))
+
+def _vary_locale(context, request):
+    return get_locale_name(request)
+
+vary_functions = {
+    'path':_vary_path,
+    'matchdict':_vary_matchdict,
+    'params':_vary_params,
+    'principals':_vary_principals,
+    'locale':_vary_locale,
+    }
+
+DEFAULT_VARY = ('path', 'params', 'principals')
+
+# stored in place of a response which may not be cached (e.g. an error or a
+# response setting a cookie), so that later requests for the same key call
+# the view without waiting for the lock of get_or_create
+NOT_CACHEABLE = 'pyramid.cache.NOT_CACHEABLE'
+
+def parse_cache_option(cache):
+    """ Return a ``(timeout, vary)`` tuple for the value of the ``cache``
+    view configuration option: either a number of seconds, or a
+    ``(seconds, vary)`` tuple where ``vary`` is a sequence of the names in
+    :data:`vary_functions` and of functions accepting ``(context,
+    request)``, whose results are made part of the cache key.  ``vary``
+    defaults to ``('path', 'params', 'principals')``.  The returned
+    ``vary`` is a tuple of functions."""
+    if isinstance(cache, (tuple, list)):
+        if len(cache) != 2:
+            raise ConfigurationError(
+                'cache must be a number of seconds or a (seconds, vary) '
+                'tuple, not %r' % (cache,))
+        timeout, vary = cache
+    else:
+        timeout, vary = cache, DEFAULT_VARY
+    try:
+        timeout = int(timeout)
+    except (TypeError, ValueError):
+        raise ConfigurationError('cache timeout must be a number of seconds, '
+                                 'not %r' % (timeout,))
+    if timeout <= 0:
+        raise ConfigurationError('cache timeout must be positive, not %r' %
+                                 (timeout,))
+    functions = []
+    for name in vary:
+        if callable(name):
+            functions.append(name)
+        elif name in vary_functions:
+            functions.append(vary_functions[name])
+        else:
+            raise ConfigurationError(
+                'unknown cache vary %r (choose from %s or pass a function)' %
+                (name, ', '.join(sorted(vary_functions.keys()))))
+    return timeout, tuple(functions)
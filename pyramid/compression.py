@@ -0,0 +1,198 @@
+""" Compression of the responses returned by a :app:`Pyramid` application.
+
+When the ``compress_responses`` setting is true, the :term:`router`
+compresses the body of each response (after the ``NewResponse`` event has
+been sent and response callbacks have been called) using the ``gzip`` or
+``deflate`` content coding preferred by the client's ``Accept-Encoding``
+header.  Only successful responses with a textual content type (``text/*``,
+JSON, JavaScript, XML and SVG) are compressed: images, archives and other
+formats which are already compressed are left alone, as are responses
+which already have a ``Content-Encoding``, responses whose
+``Cache-Control`` header contains ``no-transform`` and responses smaller
+than the ``compress_min_size`` setting.  Responses whose body is not
+already in memory (e.g. files or generators) are compressed while they are
+sent, so they are never read into memory as a whole.  The ``ETag`` of a
+compressed response is made weak, since its body is no longer the same
+sequence of bytes; the static view compares the ``If-None-Match`` header
+of a revalidation weakly, so it still answers ``304 Not Modified``.
+
+The :term:`static view` serves a precompressed variant of a file, stored
+alongside it with a ``.gz`` suffix (e.g. ``app.js.gz`` for ``app.js``), to
+clients which accept ``gzip``, whether or not ``compress_responses`` is
+enabled."""
+
+import zlib
+
+_compressible_types = set([
+    'application/ecmascript',
+    'application/javascript',
+    'application/json',
+    'application/x-javascript',
+    'application/xml',
+    'image/svg+xml',
+    ])
+
+def compressible(content_type):
+    """ Return ``True`` if a body of ``content_type`` (the value of a
+    ``Content-Type`` header, possibly with parameters) is worth
+    compressing."""
+    if not content_type:
+        return False
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return (media_type.startswith('text/') or
+            media_type in _compressible_types or
+            media_type.endswith('+xml') or
+            media_type.endswith('+json'))
+
+def negotiate_encoding(accept_encoding, encodings=('gzip', 'deflate')):
+    """ Return the content coding in ``encodings`` which is preferred by the
+    value of an ``Accept-Encoding`` header (the first of ``encodings`` if
+    several are equally preferred), or ``None`` if the header is empty or
+    accepts none of them."""
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for item in accept_encoding.split(','):
+        params = item.split(';')
+        coding = params[0].strip().lower()
+        if coding == 'x-gzip':
+            coding = 'gzip'
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params[1:]:
+            name, value = (param.split('=', 1) + [''])[:2]
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    best = None
+    best_quality = 0.0
+    for coding in encodings:
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+class ResponseCompressor(object):
+    """ Compresses responses using the ``zlib`` compression ``level`` (``1``
+    to ``9``), leaving bodies smaller than ``min_size`` bytes
+    uncompressed."""
+
+    def __init__(self, level=6, min_size=256):
+        self.level = level
+        self.min_size = min_size
+
+    def __call__(self, request, response):
+        """ Compress the body of ``response`` (which is modified in place
+        and returned) if it is eligible for compression and the client
+        which sent ``request`` accepts a supported content coding."""
+        try:
+            code = int(str(response.status).split(None, 1)[0])
+        except ValueError:
+            return response
+        if code < 200 or code >= 300 or code in (204, 206):
+            return response
+        headerlist = response.headerlist
+        headers = {}
+        for name, value in headerlist:
+            headers[name.lower()] = value
+        if 'content-encoding' in headers:
+            return response
+        if not compressible(headers.get('content-type')):
+            return response
+        if 'no-transform' in headers.get('cache-control', '').lower():
+            return response
+        app_iter = response.app_iter
+        body = None
+        if isinstance(app_iter, (list, tuple)):
+            body = ''.join(app_iter)
+            size = len(body)
+        else:
+            size = headers.get('content-length')
+            if size is not None:
+                try:
+                    size = int(size)
+                except ValueError:
+                    size = None
+        if size is not None and size < self.min_size:
+            return response
+
+        # the representation now depends on the Accept-Encoding header,
+        # whether or not this client gets a compressed one
+        _add_vary(headerlist, headers, 'Accept-Encoding')
+        encoding = negotiate_encoding(
+            request.environ.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        if encoding == 'gzip':
+            wbits = 16 + zlib.MAX_WBITS
+        else:
+            wbits = zlib.MAX_WBITS # the zlib format, as "deflate" means
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, wbits)
+        for i in range(len(headerlist) - 1, -1, -1):
+            name = headerlist[i][0].lower()
+            if name == 'content-length':
+                del headerlist[i]
+            elif name == 'etag':
+                # the compressed body is not byte-for-byte the same
+                # representation, but is semantically equivalent
+                etag = headerlist[i][1]
+                if not etag.startswith('W/'):
+                    headerlist[i] = (headerlist[i][0], 'W/' + etag)
+        headerlist.append(('Content-Encoding', encoding))
+        if body is not None:
+            body = compressor.compress(body) + compressor.flush()
+            # setting the app_iter of a WebOb response removes its
+            # Content-Length, so it is added afterwards
+            response.app_iter = [body]
+            response.headerlist.append(('Content-Length', str(len(body))))
+        else:
+            response.app_iter = CompressingIterable(app_iter, compressor)
+        return response
+
+class CompressingIterable(object):
+    """ An iterable which compresses the chunks of ``app_iter`` using the
+    ``zlib`` compression object ``compressor`` while they are iterated
+    over, closing ``app_iter`` when it is closed."""
+    def __init__(self, app_iter, compressor):
+        self.app_iter = app_iter
+        self.compressor = compressor
+
+    def __iter__(self):
+        compress = self.compressor.compress
+        for chunk in self.app_iter:
+            data = compress(chunk)
+            if data:
+                yield data
+        yield self.compressor.flush()
+
+    def close(self):
+        close = getattr(self.app_iter, 'close', None)
+        if close is not None:
+            close()
+
+def _add_vary(headerlist, headers, name):
+    vary = headers.get('vary')
+    if vary is None:
+        headerlist.append(('Vary', name))
+        return
+    tokens = [ token.strip().lower() for token in vary.split(',') ]
+    if '*' in tokens or name.lower() in tokens:
+        return
+    for i, (header, value) in enumerate(headerlist):
+        if header.lower() == 'vary':
+            headerlist[i] = (header, '%s, %s' % (value, name))
+            break
+
+def make_response_compressor(settings):
+    """ Return a :class:`ResponseCompressor` configured by the
+    ``compress_level`` and ``compress_min_size`` settings, or ``None`` if
+    the ``compress_responses`` setting is false."""
+    if not settings.get('compress_responses'):
+        return None
+    return ResponseCompressor(level=settings.get('compress_level', 6),
+                              min_size=settings.get('compress_min_size', 256))
@@ -2,18 +2,28 @@ import inspect
 import os
 import re
 import sys
+import time
 import types
 import traceback
 import warnings
+import weakref
 
 import venusian
 
+from repoze.lru import LRUCache
+
 from translationstring import ChameleonTranslate
 
 from zope.configuration.config import GroupingContextDecorator
 from zope.configuration.config import ConfigurationMachine
+from zope.configuration.config import RootStackItem
+from zope.configuration.config import _bootstrap
 from zope.configuration.xmlconfig import registerCommonDirectives
 
+from webob.cachecontrol import CacheControl
+from webob.datetime_utils import parse_date
+from webob.datetime_utils import serialize_date
+
 from zope.interface import Interface
 from zope.interface import implementedBy
 from zope.interface.interfaces import IInterface
@@ -22,6 +32,7 @@ from zope.interface import classProvides
 
 from pyramid.interfaces import IAuthenticationPolicy
 from pyramid.interfaces import IAuthorizationPolicy
+from pyramid.interfaces import ICacheBackend
 from pyramid.interfaces import IChameleonTranslate
 from pyramid.interfaces import IDebugLogger
 from pyramid.interfaces import IDefaultPermission
@@ -29,6 +40,7 @@ from pyramid.interfaces import IDefaultRootFactory
 from pyramid.interfaces import IException
 from pyramid.interfaces import IExceptionResponse
 from pyramid.interfaces import IExceptionViewClassifier
+from pyramid.interfaces import IInstrumentationSink
 from pyramid.interfaces import ILocaleNegotiator
 from pyramid.interfaces import IMultiView
 from pyramid.interfaces import IPackageOverrides
@@ -36,8 +48,10 @@ from pyramid.interfaces import IRendererFactory
 from pyramid.interfaces import IRendererGlobalsFactory
 from pyramid.interfaces import IRequest
 from pyramid.interfaces import IRequestFactory
+from pyramid.interfaces import IResponseFactory
 from pyramid.interfaces import IRootFactory
 from pyramid.interfaces import IRouteRequest
+from pyramid.interfaces import IRouter
 from pyramid.interfaces import IRoutesMapper
 from pyramid.interfaces import ISecuredView
 from pyramid.interfaces import ISessionFactory
@@ -51,7 +65,10 @@ from pyramid.interfaces import IViewMapperFactory
 
 from pyramid import renderers
 from pyramid.authorization import ACLAuthorizationPolicy
-from pyramid.compat import all
+from pyramid.cache import NOT_CACHEABLE
+from pyramid.cache import get_cache_backend
+from pyramid.cache import get_or_create
+from pyramid.cache import parse_cache_option
 from pyramid.compat import md5
 from pyramid.compat import any
 from pyramid.events import ApplicationCreated
@@ -59,15 +76,21 @@ from pyramid.exceptions import ConfigurationError
 from pyramid.exceptions import Forbidden
 from pyramid.exceptions import NotFound
 from pyramid.exceptions import PredicateMismatch
+from pyramid.httpexceptions import HTTPNotModified
 from pyramid.i18n import get_localizer
+from pyramid.instrumentation import request_key
 from pyramid.log import make_stream_logger
 from pyramid.mako_templating import renderer_factory as mako_renderer_factory
 from pyramid.path import caller_package
 from pyramid.path import package_path
 from pyramid.path import package_of
 from pyramid.registry import Registry
+from pyramid.response import Response
 from pyramid.renderers import RendererHelper
+from pyramid.renderers import precompile_template
 from pyramid.request import route_request_iface
+from pyramid.scan import CachingScanner
+from pyramid.scan import ScanCache
 from pyramid.asset import PackageOverrides
 from pyramid.asset import resolve_asset_spec
 from pyramid.settings import Settings
@@ -120,9 +143,14 @@ def action_method(wrapped):
             except: # pragma: no cover
                 info = ''
         self._ainfo.append(info)
+        profiler = getattr(self.registry, '_startup_profiler', None)
+        if profiler is not None:
+            profiler.begin(wrapped.__name__)
         try:
             result = wrapped(self, *arg, **kw)
         finally:
+            if profiler is not None:
+                profiler.end(info)
             self._ainfo.pop()
         return result
     wrapper.__name__ = wrapped.__name__
@@ -130,6 +158,24 @@ def action_method(wrapped):
     wrapper.__docobj__ = wrapped # for sphinx
     return wrapper
 
+def profiled_method(wrapped):
+    """ Wrapper which records the time spent in a configurator method which
+    is not an action method (such as ``scan``, ``include`` or ``commit``) in
+    the startup profiler when one is active."""
+    def wrapper(self, *arg, **kw):
+        profiler = getattr(self.registry, '_startup_profiler', None)
+        if profiler is None:
+            return wrapped(self, *arg, **kw)
+        profiler.begin(wrapped.__name__)
+        try:
+            return wrapped(self, *arg, **kw)
+        finally:
+            profiler.end()
+    wrapper.__name__ = wrapped.__name__
+    wrapper.__doc__ = wrapped.__doc__
+    wrapper.__docobj__ = wrapped # for sphinx
+    return wrapper
+
 class Configurator(object):
     """
     A Configurator is used to configure a :app:`Pyramid`
@@ -400,7 +446,7 @@ class Configurator(object):
     def _fix_registry(self):
         """ Fix up a ZCA component registry that is not a
         pyramid.registry.Registry by adding analogues of ``has_listeners``,
-        and ``notify`` through monkey-patching."""
+        ``has_listeners_for`` and ``notify`` through monkey-patching."""
 
         _registry = self.registry
 
@@ -412,9 +458,13 @@ class Configurator(object):
         if not hasattr(_registry, 'has_listeners'):
             _registry.has_listeners = True
 
+        if not hasattr(_registry, 'has_listeners_for'):
+            def has_listeners_for(event_type):
+                return True
+            _registry.has_listeners_for = has_listeners_for
+
     def _make_context(self, autocommit=False):
         context = PyramidConfigurationMachine()
-        registerCommonDirectives(context)
         context.registry = self.registry
         context.autocommit = autocommit
         return context
@@ -469,8 +519,12 @@ class Configurator(object):
                 else:
                     info = ''
                 context.info = info
+            profiler = getattr(self.registry, '_startup_profiler', None)
+            if profiler is not None and callable is not None:
+                callable = profiler.wrap(callable)
             context.action(discriminator, callable, args, kw, order)
 
+    @profiled_method
     def commit(self):
         """ Commit any pending configuration actions. If a configuration
         conflict is detected in the pending configuration actins, this method
@@ -484,6 +538,7 @@ class Configurator(object):
         # unwrap and reset the context
         self._ctx = None
 
+    @profiled_method
     def include(self, *callables):
         """Include one or more configuration callables, to support imperative
         application extensibility.
@@ -677,7 +732,9 @@ class Configurator(object):
         descriptions in the Configurator constructor."""
         registry = self.registry
         self._fix_registry()
-        self._set_settings(settings)
+        settings = self._set_settings(settings)
+        if settings['profile_startup']:
+            registry._startup_profiler = StartupProfiler()
         self._set_root_factory(root_factory)
         debug_logger = self.maybe_dotted(debug_logger)
         if debug_logger is None:
@@ -902,8 +959,19 @@ class Configurator(object):
         and returns a :app:`Pyramid` WSGI application representing the
         committed configuration state."""
         self.commit()
+        settings = self.registry.settings
+        if settings and settings.get('warm_templates'):
+            self.warm_templates()
+        profiler = getattr(self.registry, '_startup_profiler', None)
+        if profiler is not None:
+            logger = self.registry.queryUtility(IDebugLogger)
+            if logger is not None:
+                logger.info(profiler.report())
         from pyramid.router import Router # avoid circdep
         app = Router(self.registry)
+        # the router is registered so that subrequests can be dispatched
+        # through it (see pyramid.request.Request.invoke_subrequest)
+        self.registry.registerUtility(app, IRouter)
         # We push the registry on to the stack here in case any code
         # that depends on the registry threadlocal APIs used in
         # listeners subscribed to the IApplicationCreated event.
@@ -914,13 +982,55 @@ class Configurator(object):
             self.manager.pop()
         return app
 
+    def warm_templates(self):
+        """ Load and compile every template used as the :term:`renderer` of
+        a view registered via :meth:`pyramid.config.Configurator.add_view`
+        (and the other view-registering directives), so that the first
+        request to each view does not pay for locating and compiling its
+        template.  Chameleon templates are compiled without being rendered;
+        Mako templates are compiled when they are loaded.  Renderers which
+        are not template renderers (e.g. ``json``) are ignored.  An error in
+        a template is raised by this method rather than by the first
+        request to the view.
+
+        This method must be called after the views have been committed; it
+        is called by :meth:`pyramid.config.Configurator.make_wsgi_app` when
+        the ``warm_templates`` setting is true.  Only the views registered
+        while that setting is true are known to this method.  Return the
+        list of renderer names whose templates were compiled; a template
+        which can't be compiled ahead of rendering (e.g. by a Chameleon
+        version this method doesn't support) is loaded but not listed.
+        """
+        logger = self.registry.queryUtility(IDebugLogger)
+        warmed = []
+        seen = set()
+        for helper in getattr(self.registry, '_view_renderers', ()):
+            if not isinstance(helper, RendererHelper):
+                continue
+            name = getattr(helper, 'name', None)
+            key = (helper.type, name, helper.package)
+            if name is None or key in seen:
+                continue
+            seen.add(key)
+            renderer = helper.renderer
+            implementation = getattr(renderer, 'implementation', None)
+            if implementation is None:
+                continue
+            if precompile_template(implementation()):
+                warmed.append(name)
+            elif logger is not None:
+                logger.debug('warm_templates: the template of renderer %r '
+                             'was not compiled ahead of rendering' % name)
+        return warmed
+
     @action_method
     def add_view(self, view=None, name="", for_=None, permission=None,
                  request_type=None, route_name=None, request_method=None,
                  request_param=None, containment=None, attr=None,
                  renderer=None, wrapper=None, xhr=False, accept=None,
                  header=None, path_info=None, custom_predicates=(),
-                 context=None, decorator=None, mapper=None):
+                 context=None, decorator=None, mapper=None, etag=None,
+                 last_modified=None, cache=None):
         """ Add a :term:`view configuration` to the current
         configuration state.  Arguments to ``add_view`` are broken
         down below into *predicate* arguments and *non-predicate*
@@ -1047,7 +1157,59 @@ class Configurator(object):
           plug-point is useful for Pyramid extension developers, but it's not
           very useful for 'civilians' who are just developing stock Pyramid
           applications. Pay no attention to the man behind the curtain.
-          
+
+        etag
+
+          A :term:`dotted Python name` to a function (or the function itself)
+          which accepts ``(context, request)`` and returns the entity tag (a
+          string) of the representation the view would return, or ``None``.
+          It is called before the view callable; if the request is a ``GET``
+          or ``HEAD`` request whose ``If-None-Match`` header matches the
+          entity tag, a ``304 Not Modified`` response is returned without
+          calling the view callable or its renderer.  Otherwise the entity
+          tag is set as the ``ETag`` header of the view's response (unless
+          the view set one itself).  The function should be much cheaper
+          than the view itself.
+
+        last_modified
+
+          A :term:`dotted Python name` to a function (or the function itself)
+          which accepts ``(context, request)`` and returns the time the
+          representation the view would return was last modified (a
+          :class:`datetime.datetime` or a number of seconds since the epoch),
+          or ``None``.  It is used like ``etag``, compared against the
+          ``If-Modified-Since`` header of the request and set as the
+          ``Last-Modified`` header of the view's response.  When the request
+          has an ``If-None-Match`` header, ``If-Modified-Since`` is ignored.
+
+        cache
+
+          Cache the responses of the view for ``GET`` and ``HEAD`` requests
+          in the cache backend set by
+          :meth:`pyramid.config.Configurator.set_cache_backend` (an
+          in-process LRU cache by default).  Either a number of seconds, or
+          a ``(seconds, vary)`` tuple, where ``vary`` is a sequence naming
+          the request attributes the response depends on: ``path`` (the
+          ``PATH_INFO`` of the request), ``matchdict`` (the route's
+          matchdict), ``params`` (the query string and form parameters),
+          ``principals`` (the effective principals of the request) and
+          ``locale`` (the locale name of the request).  A ``vary`` entry may
+          also be a function accepting ``(context, request)``, whose
+          (``repr``-able) return value becomes part of the cache key.  The
+          default ``vary`` is ``('path', 'params', 'principals')``, so that
+          a response is never shared by users with different principals.
+          Responses are also keyed by the view configuration (including its
+          route, context and predicates) and by the host and script name
+          of the request.  Only ``200 OK`` responses which don't set a
+          cookie, aren't marked ``Cache-Control: private`` or ``no-store``
+          and for which the view added no response callback are cached;
+          the cached body and headers are returned in a
+          new response (made by the registered response factory) without
+          calling the view callable or its renderer.  When an entry
+          expires, only one thread of a process recomputes it while the
+          others wait for its result.  If this argument is not provided,
+          responses are not cached.
+
         Predicate Arguments
 
         name
@@ -1192,6 +1354,11 @@ class Configurator(object):
         containment = self.maybe_dotted(containment)
         mapper = self.maybe_dotted(mapper)
         decorator = self.maybe_dotted(decorator)
+        etag = self.maybe_dotted(etag)
+        last_modified = self.maybe_dotted(last_modified)
+        if cache is not None:
+            # fail early if the option is invalid
+            parse_cache_option(cache)
 
         if not view:
             if renderer:
@@ -1225,7 +1392,8 @@ class Configurator(object):
                     renderer=renderer, wrapper=wrapper, xhr=xhr, accept=accept,
                     header=header, path_info=path_info,
                     custom_predicates=custom_predicates, context=context,
-                    mapper = mapper,
+                    mapper = mapper, decorator=decorator, etag=etag,
+                    last_modified=last_modified, cache=cache,
                     )
                 view_info = deferred_views.setdefault(route_name, [])
                 view_info.append(info)
@@ -1275,7 +1443,12 @@ class Configurator(object):
                                   phash=phash,
                                   package=self.package,
                                   mapper=mapper,
-                                  decorator=decorator)
+                                  decorator=decorator,
+                                  etag=etag,
+                                  last_modified=last_modified,
+                                  cache=cache,
+                                  context=r_context,
+                                  route_name=route_name)
             derived_view = deriver(view)
 
             registered = self.registry.adapters.registered
@@ -1839,13 +2012,34 @@ class Configurator(object):
         :class:`pyramid.view.view_config`.  See the :term:`Venusian`
         documentation for more information about limiting a scan by using an
         explicit set of categories.
+
+        If the ``scan_cache`` :term:`deployment setting` names a file, the
+        names of the decorated objects found in each scanned module are
+        recorded in that file.  Subsequent scans only import and inspect
+        modules which have changed since they were recorded, and skip
+        importing modules which contained no decorated objects at all.
+        When the setting is empty (the default), every module is imported
+        and inspected during each scan.
         """
         package = self.maybe_dotted(package)
         if package is None: # pragma: no cover
             package = caller_package()
 
-        scanner = self.venusian.Scanner(config=self)
-        scanner.scan(package, categories=categories)
+        profiler = getattr(self.registry, '_startup_profiler', None)
+        if profiler is not None:
+            profiler.begin('scan')
+        try:
+            settings = self.registry.settings
+            cache_path = settings and settings.get('scan_cache')
+            if cache_path:
+                scanner = CachingScanner(config=self,
+                                         cache=ScanCache(cache_path))
+            else:
+                scanner = self.venusian.Scanner(config=self)
+            scanner.scan(package, categories=categories)
+        finally:
+            if profiler is not None:
+                profiler.end(package.__name__)
 
     @action_method
     def add_renderer(self, name, factory):
@@ -1885,7 +2079,7 @@ class Configurator(object):
         override_pkg_name = override_package.__name__
         override = self.registry.queryUtility(IPackageOverrides, name=pkg_name)
         if override is None:
-            override = PackageOverrides(package)
+            override = PackageOverrides(package, registry=self.registry)
             self.registry.registerUtility(override, IPackageOverrides,
                                           name=pkg_name)
         override.insert(path, override_pkg_name, override_prefix)
@@ -2127,6 +2321,59 @@ class Configurator(object):
         self.registry.registerUtility(permission, IDefaultPermission)
         self.action(IDefaultPermission, None)
 
+    @action_method
+    def set_instrumentation_sink(self, sink):
+        """
+        Enable instrumentation: the :term:`router` and all subsequent
+        :term:`view configuration` registrations will record the time taken
+        by each phase of processing a request (route matching, root
+        finding, traversal, permission checking, view execution, rendering
+        and response processing) and pass it to ``sink``, aggregated per
+        matched route or traversal view name.  ``sink`` must be an object
+        (or a :term:`dotted Python name` which refers to an object)
+        implementing :class:`pyramid.interfaces.IInstrumentationSink`, such
+        as the sinks in :mod:`pyramid.instrumentation`.  For example:
+
+        .. code-block:: python
+
+           from pyramid.instrumentation import MemorySink
+           sink = MemorySink()
+           config.set_instrumentation_sink(sink)
+           # ... later
+           print sink.report()
+
+        When no sink is set (the default), no timings are recorded and
+        requests do not pay for instrumentation.  The sink must be set
+        before views are added and before
+        :meth:`pyramid.config.Configurator.make_wsgi_app` is called.
+        """
+        sink = self.maybe_dotted(sink)
+        self.registry.registerUtility(sink, IInstrumentationSink)
+        self.action(IInstrumentationSink, None)
+
+    @action_method
+    def set_cache_backend(self, backend):
+        """
+        Set the cache used to store the responses of views configured with
+        the ``cache`` option (see
+        :meth:`pyramid.config.Configurator.add_view`).  ``backend`` must be
+        an object (or a :term:`dotted Python name` which refers to an
+        object) implementing :class:`pyramid.interfaces.ICacheBackend`, such
+        as the backends in :mod:`pyramid.cache`.  For example:
+
+        .. code-block:: python
+
+           from pyramid.cache import MemcachedCacheBackend
+           config.set_cache_backend(MemcachedCacheBackend('127.0.0.1'))
+
+        When no backend is set, an in-process
+        :class:`pyramid.cache.MemoryCacheBackend` is used.  The backend must
+        be set before views using the ``cache`` option are added.
+        """
+        backend = self.maybe_dotted(backend)
+        self.registry.registerUtility(backend, ICacheBackend)
+        self.action(ICacheBackend, None)
+
     @action_method
     def set_view_mapper(self, mapper):
         """
@@ -2492,6 +2739,18 @@ def _make_predicates(xhr=None, request_method=None, path_info=None,
     # share the same number of predicates.  Views which do not have
     # any predicates get an order of MAX_ORDER, meaning that they will
     # be tried very last.
+    #
+    # SHARING
+    # -------
+    #
+    # Predicates which are logically identical (e.g. two views which both
+    # use ``request_method='GET'``) are interned: the same predicate
+    # function is returned for each, keyed by the same information that
+    # feeds the phash.  The results of predicates which depend only on the
+    # request and which are comparatively expensive to compute (path_info,
+    # request_param, header, accept) are memoized on the request, so that
+    # an identical predicate shared by many views and routes is only
+    # computed once per request.
 
     predicates = []
     weights = []
@@ -2502,7 +2761,7 @@ def _make_predicates(xhr=None, request_method=None, path_info=None,
             return request.is_xhr
         xhr_predicate.__text__ = "xhr = True"
         weights.append(1 << 1)
-        predicates.append(xhr_predicate)
+        predicates.append(_shared_predicate('xhr', xhr_predicate))
         h.update('xhr:%r' % bool(xhr))
 
     if request_method is not None:
@@ -2511,8 +2770,9 @@ def _make_predicates(xhr=None, request_method=None, path_info=None,
         text = "request method = %s"
         request_method_predicate.__text__ = text % request_method
         weights.append(1 << 2)
-        predicates.append(request_method_predicate)
-        h.update('request_method:%r' % request_method)
+        key = 'request_method:%r' % request_method
+        predicates.append(_shared_predicate(key, request_method_predicate))
+        h.update(key)
 
     if path_info is not None:
         try:
@@ -2524,8 +2784,9 @@ def _make_predicates(xhr=None, request_method=None, path_info=None,
         text = "path_info = %s"
         path_info_predicate.__text__ = text % path_info
         weights.append(1 << 3)
-        predicates.append(path_info_predicate)
-        h.update('path_info:%r' % path_info)
+        key = 'path_info:%r' % path_info
+        predicates.append(_shared_predicate(key, path_info_predicate, True))
+        h.update(key)
 
     if request_param is not None:
         request_param_val = None
@@ -2541,8 +2802,10 @@ def _make_predicates(xhr=None, request_method=None, path_info=None,
             return request.params.get(request_param) == request_param_val
         request_param_predicate.__text__ = text
         weights.append(1 << 4)
-        predicates.append(request_param_predicate)
-        h.update('request_param:%r=%r' % (request_param, request_param_val))
+        key = 'request_param:%r=%r' % (request_param, request_param_val)
+        predicates.append(_shared_predicate(key, request_param_predicate,
+                                            True))
+        h.update(key)
 
     if header is not None:
         header_name = header
@@ -2566,7 +2829,10 @@ def _make_predicates(xhr=None, request_method=None, path_info=None,
             return header_val.match(val) is not None
         header_predicate.__text__ = text
         weights.append(1 << 5)
-        predicates.append(header_predicate)
+        # the repr of a compiled regex isn't stable, so the predicate is
+        # interned using the uncompiled header value
+        key = 'header:%r' % header
+        predicates.append(_shared_predicate(key, header_predicate, True))
         h.update('header:%r=%r' % (header_name, header_val))
 
     if accept is not None:
@@ -2574,15 +2840,17 @@ def _make_predicates(xhr=None, request_method=None, path_info=None,
             return accept in request.accept
         accept_predicate.__text__ = "accept = %s" % accept
         weights.append(1 << 6)
-        predicates.append(accept_predicate)
-        h.update('accept:%r' % accept)
+        key = 'accept:%r' % accept
+        predicates.append(_shared_predicate(key, accept_predicate, True))
+        h.update(key)
 
     if containment is not None:
         def containment_predicate(context, request):
             return find_interface(context, containment) is not None
         containment_predicate.__text__ = "containment = %s" % containment
         weights.append(1 << 7)
-        predicates.append(containment_predicate)
+        predicates.append(_shared_predicate(('containment', containment),
+                                            containment_predicate))
         h.update('containment:%r' % hash(containment))
 
     if request_type is not None:
@@ -2591,7 +2859,8 @@ def _make_predicates(xhr=None, request_method=None, path_info=None,
         text = "request_type = %s"
         request_type_predicate.__text__ = text % request_type
         weights.append(1 << 8)
-        predicates.append(request_type_predicate)
+        predicates.append(_shared_predicate(('request_type', request_type),
+                                            request_type_predicate))
         h.update('request_type:%r' % hash(request_type))
 
     if traverse is not None:
@@ -2636,16 +2905,56 @@ def _make_predicates(xhr=None, request_method=None, path_info=None,
     phash = h.hexdigest()
     return order, predicates, phash
 
+# interned predicates, keyed by the information that identifies them; an
+# entry lives only as long as a view or route uses its predicate, so the
+# mapping doesn't grow with (or keep alive the classes and interfaces
+# named by) configurations which have been discarded
+_predicates = weakref.WeakValueDictionary()
+
+def _shared_predicate(key, predicate, memoize=False):
+    """ Return the predicate previously interned under ``key`` or intern
+    ``predicate`` under ``key``.  If ``memoize`` is true, the (interned)
+    predicate remembers its result for the lifetime of each request it is
+    evaluated against; only predicates which depend on nothing but the
+    request may be memoized."""
+    shared = _predicates.get(key)
+    if shared is None:
+        if memoize:
+            predicate = _memoized_predicate(predicate)
+        shared = _predicates.setdefault(key, predicate)
+    return shared
+
+def _memoized_predicate(predicate):
+    def memoized_predicate(context, request):
+        attrs = getattr(request, '__dict__', None)
+        if attrs is None:
+            return predicate(context, request)
+        results = attrs.get('_predicate_results')
+        if results is None:
+            results = attrs['_predicate_results'] = {}
+        try:
+            return results[memoized_predicate]
+        except KeyError:
+            result = results[memoized_predicate] = predicate(context, request)
+            return result
+    memoized_predicate.__text__ = predicate.__text__
+    return memoized_predicate
+
 class MultiView(object):
     implements(IMultiView)
 
+    accept_cache_size = 100
+
     def __init__(self, name):
         self.name = name
         self.media_views = {}
         self.views = []
         self.accepts = []
+        # Accept header value -> ordered list of views
+        self.accept_views = LRUCache(self.accept_cache_size)
 
     def add(self, view, order, accept=None, phash=None):
+        self.accept_views.clear()
         if phash is not None:
             for i, (s, v, h) in enumerate(list(self.views)):
                 if phash == h:
@@ -2665,16 +2974,29 @@ class MultiView(object):
 
     def get_views(self, request):
         if self.accepts and hasattr(request, 'accept'):
+            accept = request.accept
+            # the ordering of views depends only on the value of the Accept
+            # header, so it is memoized per header value (a missing header
+            # is represented by a false "nil" accept object)
+            key = getattr(accept, 'header_value', None)
+            if key is None and not accept:
+                key = ''
+            if key is not None:
+                views = self.accept_views.get(key)
+                if views is not None:
+                    return views
             accepts = self.accepts[:]
             views = []
             while accepts:
-                match = request.accept.best_match(accepts)
+                match = accept.best_match(accepts)
                 if match is None:
                     break
                 subset = self.media_views[match]
                 views.extend(subset)
                 accepts.remove(match)
             views.extend(self.views)
+            if key is not None:
+                self.accept_views.put(key, views)
             return views
         return self.views
 
@@ -2699,6 +3021,14 @@ class MultiView(object):
 
     def __call__(self, context, request):
         for order, view, phash in self.get_views(request):
+            # check predicates up front rather than relying on the
+            # (comparatively expensive) PredicateMismatch raised by the view,
+            # then call the view without checking its predicates again
+            checker = getattr(view, '__predicated__', None)
+            if checker is not None:
+                if not checker(context, request):
+                    continue
+                view = getattr(view, '__predicated_view__', view)
             try:
                 return view(context, request)
             except PredicateMismatch:
@@ -2761,16 +3091,29 @@ class ViewDeriver(object):
         self.authn_policy = self.registry.queryUtility(IAuthenticationPolicy)
         self.authz_policy = self.registry.queryUtility(IAuthorizationPolicy)
         self.logger = self.registry.queryUtility(IDebugLogger)
+        self.sink = self.registry.queryUtility(IInstrumentationSink)
+        renderer = kw.get('renderer')
+        settings = self.registry.settings
+        if (renderer is not None and settings and
+            settings.get('warm_templates', False)):
+            # remembered for Configurator.warm_templates
+            renderers = getattr(self.registry, '_view_renderers', None)
+            if renderers is None:
+                renderers = self.registry._view_renderers = []
+            renderers.append(renderer)
 
     def __call__(self, view):
+        view = self.cached_view(
+            self.rendered_view(
+                self.timed_view(
+                    self.mapped_view(view))))
         return self.attr_wrapped_view(
             self.predicated_view(
                 self.authdebug_view(
                     self.secured_view(
-                        self.owrapped_view(
-                            self.decorated_view(
-                                self.rendered_view(
-                                    self.mapped_view(view))))))))
+                        self.conditional_view(
+                            self.owrapped_view(
+                                self.decorated_view(view)))))))
 
     @wraps_view
     def mapped_view(self, view):
@@ -2785,6 +3128,73 @@ class ViewDeriver(object):
         mapped_view = mapper(**self.kw)(view)
         return mapped_view
 
+    @wraps_view
+    def timed_view(self, view):
+        if self.sink is None:
+            return view
+        return self._timed('view_execution', view)
+
+    def _timed(self, phase, func):
+        # record the time taken by each call to ``func`` (which accepts a
+        # context and a request) as ``phase`` in the instrumentation sink
+        sink = self.sink
+        timer = time.time
+        def timed(context, request):
+            start = timer()
+            try:
+                return func(context, request)
+            finally:
+                sink.record(request_key(request), phase, timer() - start)
+        return timed
+
+    @wraps_view
+    def conditional_view(self, view):
+        if self.kw.get('etag') is None and self.kw.get('last_modified') is None:
+            return view
+        def _conditional_view(context, request):
+            etag, last_modified = self._validators(context, request)
+            if self._not_modified(request, etag, last_modified):
+                response = HTTPNotModified()
+            else:
+                response = view(context, request)
+            return self._set_validators(response, etag, last_modified)
+        return _conditional_view
+
+    def _validators(self, context, request):
+        # return the (etag, last_modified) of the current representation as
+        # computed by the ``etag`` and ``last_modified`` view options; the
+        # modification time is truncated to a second like the HTTP date the
+        # client will send back
+        etag = last_modified = None
+        etag_func = self.kw.get('etag')
+        if etag_func is not None:
+            etag = etag_func(context, request)
+        last_modified_func = self.kw.get('last_modified')
+        if last_modified_func is not None:
+            last_modified = last_modified_func(context, request)
+            if last_modified is not None:
+                last_modified = parse_date(serialize_date(last_modified))
+        return etag, last_modified
+
+    def _not_modified(self, request, etag, last_modified):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        if 'HTTP_IF_NONE_MATCH' in request.environ:
+            # If-Modified-Since is ignored when If-None-Match is present
+            return etag is not None and etag in request.if_none_match
+        if last_modified is not None:
+            since = request.if_modified_since
+            return since is not None and last_modified <= since
+        return False
+
+    def _set_validators(self, response, etag, last_modified):
+        if is_response(response) and response.status_int in (200, 304):
+            if etag is not None and response.etag is None:
+                response.etag = etag
+            if last_modified is not None and response.last_modified is None:
+                response.last_modified = last_modified
+        return response
+
     @wraps_view
     def owrapped_view(self, view):
         wrapper_viewname = self.kw.get('wrapper_viewname')
@@ -2820,6 +3230,8 @@ class ViewDeriver(object):
                 principals = self.authn_policy.effective_principals(request)
                 return self.authz_policy.permits(context, principals,
                                                  permission)
+            if self.sink is not None:
+                _permitted = self._timed('security', _permitted)
             def _secured_view(context, request):
                 result = _permitted(context, request)
                 if result:
@@ -2873,14 +3285,20 @@ class ViewDeriver(object):
         if not predicates:
             return view
         def predicate_wrapper(context, request):
-            if all((predicate(context, request) for predicate in predicates)):
-                return view(context, request)
-            raise PredicateMismatch('predicate mismatch for view %s' % view)
+            for predicate in predicates:
+                if not predicate(context, request):
+                    raise PredicateMismatch(
+                        'predicate mismatch for view %s' % view)
+            return view(context, request)
         def checker(context, request):
-            return all((predicate(context, request) for predicate in
-                        predicates))
+            for predicate in predicates:
+                if not predicate(context, request):
+                    return False
+            return True
         predicate_wrapper.__predicated__ = checker
         predicate_wrapper.__predicates__ = predicates
+        # called by a multiview once it has run ``checker`` itself
+        predicate_wrapper.__predicated_view__ = view
         return predicate_wrapper
 
     @wraps_view
@@ -2905,6 +3323,9 @@ class ViewDeriver(object):
         attr_view.__phash__ = phash
         attr_view.__view_attr__ = self.kw.get('attr')
         attr_view.__permission__ = self.kw.get('permission')
+        predicated_view = getattr(view, '__predicated_view__', None)
+        if predicated_view is not None:
+            attr_view.__predicated_view__ = predicated_view
         return attr_view
 
     @wraps_view
@@ -2934,12 +3355,75 @@ class ViewDeriver(object):
                 else:
                     view_inst = getattr(wrapped_view, '__original_view__',
                                         wrapped_view)
-                return renderer.render_view(request, response, view_inst,
-                                            context)
+                sink = self.sink
+                if sink is None:
+                    return renderer.render_view(request, response, view_inst,
+                                                context)
+                start = time.time()
+                try:
+                    return renderer.render_view(request, response, view_inst,
+                                                context)
+                finally:
+                    sink.record(request_key(request), 'render',
+                                time.time() - start)
             return response
 
         return _rendered_view
 
+    @wraps_view
+    def cached_view(self, view):
+        cache = self.kw.get('cache')
+        if cache is None:
+            return view
+        timeout, vary = parse_cache_option(cache)
+        backend = get_cache_backend(self.registry)
+        renderer = self.kw.get('renderer')
+        original_view = getattr(view, '__original_view__', view)
+        # identifies the view configuration across processes sharing a
+        # backend: the same callable may be registered for several routes,
+        # contexts or sets of predicates (which the phash identifies)
+        prefix = (getattr(original_view, '__module__', None),
+                  getattr(original_view, '__name__', None),
+                  self.kw.get('attr'),
+                  self.kw.get('viewname'),
+                  getattr(renderer, 'name', None),
+                  self.kw.get('route_name'),
+                  repr(self.kw.get('context')),
+                  self.kw.get('phash', DEFAULT_PHASH))
+        registry = self.registry
+        def _cached_view(context, request):
+            if request.method not in ('GET', 'HEAD'):
+                return view(context, request)
+            key = repr(prefix + (request.host, request.script_name) +
+                       tuple([ f(context, request) for f in vary ]))
+            created = []
+            def create():
+                callbacks = len(request.response_callbacks)
+                response = view(context, request)
+                created.append(response)
+                # responses which are private to the user, or which response
+                # callbacks added by the view would change, are not stored
+                if (is_response(response) and response.status_int == 200
+                    and 'Set-Cookie' not in response.headers
+                    and len(request.response_callbacks) == callbacks):
+                    cache_control = CacheControl.parse(
+                        response.headers.get('Cache-Control', ''),
+                        type='response')
+                    if not (cache_control.private or cache_control.no_store):
+                        return (response.status, response.headerlist[:],
+                                response.body)
+                return NOT_CACHEABLE
+            cached = get_or_create(backend, key, create, timeout)
+            if created:
+                return created[0]
+            if cached == NOT_CACHEABLE:
+                return view(context, request)
+            status, headerlist, body = cached
+            response_factory = registry.queryUtility(IResponseFactory,
+                                                     default=Response)
+            return response_factory(body, status, list(headerlist))
+        return _cached_view
+
     @wraps_view
     def decorated_view(self, view):
         decorator = self.kw.get('decorator')
@@ -3071,8 +3555,115 @@ def requestonly(view, attr=None):
 
     return False
 
+class StartupProfiler(object):
+    """ Records the wall-clock time spent in each configuration directive
+    (e.g. ``add_view``, ``add_route``, ``scan``, ``include`` and
+    ``commit``) while an application is being configured.  Time spent
+    executing a deferred action at commit time is attributed to the
+    directive which registered the action (e.g. ``add_view (action)``).
+    Enabled via the ``profile_startup`` setting; the report is logged to the
+    debug logger by :meth:`pyramid.config.Configurator.make_wsgi_app`."""
+
+    timer = time.time # for testing injection
+
+    def __init__(self):
+        self.stats = {} # name -> [calls, cumulative time, own time]
+        self.calls = [] # (elapsed, name, info)
+        self._stack = []
+
+    def begin(self, name):
+        self._stack.append([name, self.timer(), 0.0])
+
+    def end(self, info=''):
+        name, start, children = self._stack.pop()
+        elapsed = self.timer() - start
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        stat = self.stats.setdefault(name, [0, 0.0, 0.0])
+        stat[0] += 1
+        stat[1] += elapsed
+        stat[2] += elapsed - children
+        self.calls.append((elapsed, name, info))
+
+    def wrap(self, callable):
+        """ Return a wrapper for the action callable ``callable`` which
+        attributes the time spent executing it to the directive currently
+        being profiled."""
+        if self._stack:
+            name = '%s (action)' % self._stack[-1][0]
+        else:
+            name = 'action'
+        def profiled_action(*arg, **kw):
+            self.begin(name)
+            try:
+                return callable(*arg, **kw)
+            finally:
+                self.end()
+        return profiled_action
+
+    def report(self, limit=10):
+        """ Return a textual report listing the directives sorted by the
+        time spent in them (excluding time spent in nested directives)
+        followed by the ``limit`` slowest individual directive calls."""
+        lines = ['Startup profile (seconds):',
+                 '%8s %10s %10s  %s' % ('calls', 'cumulative', 'own',
+                                        'directive')]
+        items = self.stats.items()
+        items.sort(key=lambda item: item[1][2], reverse=True)
+        for name, (calls, cumulative, own) in items:
+            lines.append('%8d %10.4f %10.4f  %s' % (calls, cumulative, own,
+                                                   name))
+        calls = sorted(self.calls, key=lambda call: call[0], reverse=True)
+        if calls[:limit]:
+            lines.append('Slowest calls:')
+        for elapsed, name, info in calls[:limit]:
+            lines.append('%10.4f  %s %s' % (elapsed, name,
+                                            _format_info(info)))
+        return '\n'.join(lines)
+
+def _format_info(info):
+    if isinstance(info, tuple) and len(info) > 1:
+        return '(%s:%s)' % (info[0], info[1])
+    if info:
+        return '(%s)' % (info,)
+    return ''
+
 class PyramidConfigurationMachine(ConfigurationMachine):
+    """ A ZCML configuration machine which defers registering the
+    bootstrap and common ZCML directives (an expensive operation) until a
+    directive is actually registered or looked up; most imperative
+    configuration never uses ZCML at all."""
     autocommit = False
+    _bootstrapped = False
+
+    def __init__(self):
+        # this intentionally does not call ConfigurationMachine.__init__,
+        # which bootstraps the ZCML directive machinery eagerly
+        super(ConfigurationMachine, self).__init__()
+        self.actions = []
+        self.stack = [RootStackItem(self)]
+        self.i18n_strings = {}
+
+    def _bootstrap(self):
+        if not self._bootstrapped:
+            self._bootstrapped = True
+            info = self.info
+            _bootstrap(self)
+            registerCommonDirectives(self)
+            self.info = info
+
+    def register(self, interface, name, factory):
+        self._bootstrap()
+        ConfigurationMachine.register(self, interface, name, factory)
+
+    def document(self, name, schema, usedIn, handler, info, parent=None):
+        self._bootstrap()
+        ConfigurationMachine.document(self, name, schema, usedIn, handler,
+                                      info, parent)
+
+    def factory(self, context, name):
+        self._bootstrap()
+        return ConfigurationMachine.factory(self, context, name)
 
     def processSpec(self, spec):
         """Check whether a callable needs to be processed.  The ``spec``
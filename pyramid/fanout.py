@@ -0,0 +1,187 @@
+""" Concurrent execution of subrequests and view renderings.
+
+A page composed of several independent fragments (e.g. the panels of a
+dashboard) usually renders each fragment in turn, so the time taken to
+render the page is the sum of the times taken to render its fragments.  The
+APIs in this module (and :meth:`pyramid.request.Request.invoke_subrequests`)
+instead submit each fragment to a pool of worker threads, so the time taken
+becomes roughly that of the slowest fragment.
+
+Each registry has its own pool, created the first time it is used, whose
+number of worker threads is the value of the ``fanout_threads`` setting
+(see :ref:`environment_chapter`).  While a job runs, the
+:mod:`pyramid.threadlocal` registry and request of the worker thread are
+those of the job, so APIs such as
+:func:`pyramid.threadlocal.get_current_request` work as they do in the
+thread which called the API.
+"""
+import Queue
+import sys
+import threading
+
+from pyramid.threadlocal import manager
+from pyramid.view import render_view_to_response
+
+class FanoutResult(object):
+    """ The eventual result of a job submitted to a :class:`FanoutPool`."""
+    value = None
+    exc_info = None
+
+    def __init__(self):
+        self._done = threading.Event()
+
+    def _run(self, func, arg):
+        try:
+            try:
+                self.value = func(*arg)
+            except:
+                self.exc_info = sys.exc_info()
+        finally:
+            self._done.set()
+
+    def ready(self):
+        """ Return ``True`` if the job has finished, ``False`` otherwise."""
+        return self._done.isSet()
+
+    def wait(self):
+        """ Block until the job has finished."""
+        self._done.wait()
+
+    @property
+    def exception(self):
+        """ The exception raised by the job, or ``None`` if the job has not
+        finished or did not raise an exception."""
+        if self.exc_info is not None:
+            return self.exc_info[1]
+
+    def get(self):
+        """ Block until the job has finished and return its return value.
+        If the job raised an exception, the exception is reraised."""
+        self._done.wait()
+        if self.exc_info is not None:
+            raise self.exc_info[0], self.exc_info[1], self.exc_info[2]
+        return self.value
+
+# true within the worker threads of any pool
+_worker = threading.local()
+
+class FanoutPool(object):
+    """ A pool of ``size`` daemon worker threads, which are started when the
+    first job is submitted.  If ``size`` is less than 1, or if a job is
+    submitted from within a worker thread (which could otherwise deadlock
+    the pool once all of its workers wait for jobs queued behind them), jobs
+    are run immediately in the submitting thread."""
+
+    def __init__(self, size):
+        self.size = size
+        self.queue = Queue.Queue()
+        self.workers = []
+        self.lock = threading.Lock()
+
+    def submit(self, func, *arg):
+        """ Submit a job which calls ``func`` with the positional arguments
+        ``arg`` and return a :class:`FanoutResult` for it."""
+        result = FanoutResult()
+        if self.size < 1 or getattr(_worker, 'active', False):
+            result._run(func, arg)
+            return result
+        if len(self.workers) < self.size:
+            self._start()
+        self.queue.put((result, func, arg))
+        return result
+
+    def _start(self):
+        self.lock.acquire()
+        try:
+            while len(self.workers) < self.size:
+                worker = threading.Thread(target=self._work)
+                worker.setDaemon(True)
+                worker.start()
+                self.workers.append(worker)
+        finally:
+            self.lock.release()
+
+    def _work(self):
+        _worker.active = True
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            result, func, arg = job
+            result._run(func, arg)
+
+    def shutdown(self):
+        """ Stop the worker threads once the jobs which have already been
+        submitted have been run.  The pool restarts its workers if another
+        job is submitted."""
+        self.lock.acquire()
+        try:
+            for worker in self.workers:
+                self.queue.put(None)
+            for worker in self.workers:
+                worker.join()
+            self.workers = []
+        finally:
+            self.lock.release()
+
+_pool_lock = threading.Lock()
+
+def get_fanout_pool(registry):
+    """ Return the :class:`FanoutPool` of ``registry``, creating it if
+    necessary."""
+    pool = getattr(registry, '_fanout_pool', None)
+    if pool is None:
+        _pool_lock.acquire()
+        try:
+            pool = getattr(registry, '_fanout_pool', None)
+            if pool is None:
+                settings = registry.settings or {}
+                pool = FanoutPool(int(settings.get('fanout_threads', 4)))
+                registry._fanout_pool = pool
+        finally:
+            _pool_lock.release()
+    return pool
+
+# request attributes which must not be shared between a request and its
+# clones
+_uncloned = ('environ', 'response', 'response_callbacks',
+             'finished_callbacks')
+
+def clone_request(request):
+    """ Return a copy of ``request`` which may be used by another thread
+    while ``request`` is in use.  The copy has a shallow copy of the WSGI
+    environment of ``request`` (its body is not copied; the copy should not
+    read it) and shares all the attributes set on ``request`` (such as
+    ``registry``, ``context``, ``matchdict`` and ``session``) except its
+    ``response`` and its response and finished callbacks."""
+    clone = request.__class__(request.environ.copy())
+    attrs = clone.__dict__
+    for name, value in request.__dict__.items():
+        if name not in _uncloned:
+            attrs[name] = value
+    return clone
+
+def _render_view(registry, context, request, name, secure):
+    manager.push({'registry':registry, 'request':request})
+    try:
+        return render_view_to_response(context, request, name, secure)
+    finally:
+        manager.pop()
+
+def render_views_to_responses(context, request, names, secure=True):
+    """ Concurrently call the :term:`view callable` registered for each
+    :term:`view name` in ``names`` for ``context`` and ``request``, as
+    :func:`pyramid.view.render_view_to_response` would.  Each view is
+    passed its own clone of ``request`` (see :func:`clone_request`).
+
+    Returns a list containing a :class:`FanoutResult` per name, in the same
+    order.  The ``get`` method of a result returns the :term:`response` of
+    the view (or ``None`` if no view is registered for the name), or
+    reraises the exception raised by the view."""
+    registry = request.registry
+    pool = get_fanout_pool(registry)
+    results = []
+    for name in names:
+        results.append(pool.submit(_render_view, registry, context,
+                                   clone_request(request), name, secure))
+    return results
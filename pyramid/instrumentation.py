@@ -0,0 +1,168 @@
+""" Instrumentation sinks which receive the timings recorded by the router
+and by views once one is registered via
+:meth:`pyramid.config.Configurator.set_instrumentation_sink`.
+
+Timings are recorded per request for a key naming the matched
+:term:`route` (``route:<route name>``) or, if no route matched, the
+traversal :term:`view name` (``view:<view name>``, or ``view:default`` for
+the default view).  The phases recorded by the router are:
+
+``route_match``
+  Sending the ``NewRequest`` event and matching routes.
+
+``root_factory``
+  Calling the :term:`root factory`.
+
+``traversal``
+  Traversal and sending the ``ContextFound`` event.
+
+``view``
+  Calling the :term:`view callable` (or the :term:`exception view`),
+  including any permission check and rendering.
+
+``response``
+  Sending the ``NewResponse`` event and calling response callbacks.
+
+``total``
+  All of the above.
+
+Views record the ``security`` (permission check), ``view_execution`` (the
+view callable itself, without permission checking and rendering) and
+``render`` (the :term:`renderer`) phases.
+"""
+import bisect
+import logging
+import re
+import socket
+import threading
+
+from zope.interface import implements
+
+from pyramid.interfaces import IInstrumentationSink
+
+def request_key(request):
+    """ Return the key under which the timings of ``request`` are
+    recorded."""
+    route = getattr(request, 'matched_route', None)
+    if route is not None:
+        return 'route:%s' % route.name
+    return 'view:%s' % (getattr(request, 'view_name', '') or 'default')
+
+def record_timings(sink, key, checkpoints, end):
+    """ Record the time taken by each phase in ``checkpoints`` (a list of
+    ``(phase, end time)`` tuples, the first of which is the start time) and
+    the ``total`` time from the start time to ``end`` in ``sink``."""
+    start = previous = checkpoints[0][1]
+    for phase, when in checkpoints[1:]:
+        sink.record(key, phase, when - previous)
+        previous = when
+    sink.record(key, 'total', end - start)
+
+class Histogram(object):
+    """ The timings recorded for one phase of one key.  ``counts[i]`` is the
+    number of timings no longer than ``bounds[i]`` seconds (and longer than
+    ``bounds[i-1]``); the last count is that of timings longer than the last
+    bound."""
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, elapsed):
+        self.counts[bisect.bisect_left(self.bounds, elapsed)] += 1
+        self.count += 1
+        self.total += elapsed
+        if self.min is None or elapsed < self.min:
+            self.min = elapsed
+        if self.max is None or elapsed > self.max:
+            self.max = elapsed
+
+    def mean(self):
+        if self.count:
+            return self.total / self.count
+        return 0.0
+
+class MemorySink(object):
+    """ A sink which aggregates timings in memory into a :class:`Histogram`
+    per key and phase, available as the ``histograms`` dictionary (keyed by
+    ``(key, phase)`` tuples).  ``bounds`` is the sequence of the upper
+    bounds of the histogram buckets in seconds."""
+    implements(IInstrumentationSink)
+
+    bounds = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self, bounds=None):
+        if bounds is not None:
+            self.bounds = tuple(bounds)
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def record(self, key, phase, elapsed):
+        self.lock.acquire()
+        try:
+            histogram = self.histograms.get((key, phase))
+            if histogram is None:
+                histogram = Histogram(self.bounds)
+                self.histograms[(key, phase)] = histogram
+            histogram.add(elapsed)
+        finally:
+            self.lock.release()
+
+    def clear(self):
+        self.lock.acquire()
+        try:
+            self.histograms = {}
+        finally:
+            self.lock.release()
+
+    def report(self):
+        """ Return a text report of the aggregated timings (in
+        milliseconds), one line per key and phase."""
+        lines = ['%-30s %-16s %8s %10s %10s %10s' % (
+            'key', 'phase', 'count', 'mean ms', 'min ms', 'max ms')]
+        items = self.histograms.items()
+        items.sort()
+        for (key, phase), histogram in items:
+            lines.append('%-30s %-16s %8d %10.3f %10.3f %10.3f' % (
+                key, phase, histogram.count, histogram.mean() * 1000,
+                histogram.min * 1000, histogram.max * 1000))
+        return '\n'.join(lines)
+
+class LogSink(object):
+    """ A sink which logs each timing at the ``INFO`` level to ``logger`` (a
+    PEP 282 logger; by default, the ``pyramid.instrumentation`` logger)."""
+    implements(IInstrumentationSink)
+
+    def __init__(self, logger=None):
+        if logger is None:
+            logger = logging.getLogger('pyramid.instrumentation')
+        self.logger = logger
+
+    def record(self, key, phase, elapsed):
+        self.logger.info('%s %s %.6f' % (key, phase, elapsed))
+
+_unsafe = re.compile(r'[^A-Za-z0-9_\-]')
+
+class StatsdSink(object):
+    """ A sink which sends each timing as a `statsd
+    <https://github.com/etsy/statsd>`_ timer (in milliseconds) named
+    ``<prefix>.<key>.<phase>`` over UDP to ``host`` and ``port``.  Sending
+    is never retried and errors are ignored, so a missing statsd daemon
+    never affects requests."""
+    implements(IInstrumentationSink)
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix='pyramid'):
+        self.address = (host, int(port))
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def record(self, key, phase, elapsed):
+        name = '%s.%s.%s' % (self.prefix, _unsafe.sub('_', key), phase)
+        try:
+            self.socket.sendto('%s:%.3f|ms' % (name, elapsed * 1000),
+                               self.address)
+        except socket.error:
+            pass
@@ -352,6 +352,14 @@ class IRouter(Interface):
     a view registry."""
     registry = Attribute(
         """Component architecture registry local to this application.""")
+
+    def handle_request(request):
+        """ Route ``request`` to a view and return the response; the
+        threadlocals for the request must already have been pushed."""
+
+    def invoke_subrequest(request):
+        """ Push threadlocals for ``request``, route it to a view and return
+        the response, calling the request's finished callbacks."""
     
 class ISettings(Interface):
     """ Runtime settings utility for pyramid; represents the
@@ -500,6 +508,32 @@ class IDefaultPermission(Interface):
     for all view configurations which do not explicitly declare their
     own."""
 
+class IInstrumentationSink(Interface):
+    """ An object which receives the timings recorded by the router and by
+    views when instrumentation is enabled (see
+    :meth:`pyramid.config.Configurator.set_instrumentation_sink`)."""
+    def record(key, phase, elapsed):
+        """ Record that the ``phase`` (a string such as ``route_match`` or
+        ``render``) of processing a request for ``key`` (a string naming
+        the matched route or the traversal view name, such as
+        ``route:home`` or ``view:edit``) took ``elapsed`` seconds."""
+
+class ICacheBackend(Interface):
+    """ A cache used to store the responses of views configured with the
+    ``cache`` option (see
+    :meth:`pyramid.config.Configurator.set_cache_backend`)."""
+    def get(key):
+        """ Return the value stored for ``key`` (a string) or ``None`` if
+        there is none or it has expired."""
+
+    def set(key, value, timeout=None):
+        """ Store ``value`` for ``key``, expiring after ``timeout`` seconds
+        (or never if ``timeout`` is ``None``).  A cache may evict the value
+        earlier."""
+
+    def delete(key):
+        """ Remove the value stored for ``key``, if any."""
+
 class ISessionFactory(Interface):
     """ An interface representing a factory which accepts a request object and
     returns an ISession object """
@@ -1,4 +1,6 @@
 import os
+import re
+import tempfile
 import threading
 
 from zope.interface import implements
@@ -13,6 +15,12 @@ from pyramid.util import DottedNameResolver
 
 from mako.lookup import TemplateLookup
 from mako import exceptions
+import mako
+
+try:
+    from hashlib import sha1
+except ImportError: # pragma: no cover
+    from sha import new as sha1
 
 class IMakoLookup(Interface):
     pass
@@ -53,6 +61,147 @@ class PkgResourceTemplateLookup(TemplateLookup):
         return TemplateLookup.get_template(self, uri)
 
 
+_unsafe = re.compile(r'[^A-Za-z0-9_.-]')
+
+def default_module_directory():
+    """ Return the name of the directory used to cache compiled Mako
+    templates when the ``mako.module_directory`` setting is not set: a
+    directory private to the current user within the system's temporary
+    directory."""
+    getuid = getattr(os, 'getuid', None)
+    if getuid is None: # pragma: no cover (windows)
+        name = 'pyramid-mako-modules'
+    else:
+        name = 'pyramid-mako-modules-%d' % getuid()
+    return os.path.join(tempfile.gettempdir(), name)
+
+class ModuleFilename(object):
+    """ A Mako ``modulename_callable`` which names the compiled module of
+    a template after the template's path and uri, a hash of its source and
+    ``options`` (a string describing the compiler options in effect), so
+    that a module is never reused for a changed template, even if the
+    modification times of the template and the module say otherwise, and
+    so that several processes may safely share ``directory``.
+
+    If ``private`` is true, ``directory`` is created readable and writable
+    only by the current user, and it is not used (templates are compiled in
+    memory) if it is owned by another user."""
+
+    def __init__(self, directory, options='', private=False):
+        self.directory = directory
+        self.options = options
+        self.private = private
+        self.usable = None
+
+    def _check_directory(self):
+        directory = self.directory
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0700)
+            if self.private:
+                getuid = getattr(os, 'getuid', None)
+                if getuid is not None and (
+                    os.stat(directory).st_uid != getuid()):
+                    # another user could plant modules in it
+                    return False
+            return True
+        except OSError:
+            return False
+
+    def __call__(self, filename, uri):
+        if self.usable is None:
+            self.usable = self._check_directory()
+        if not self.usable:
+            return None
+        try:
+            f = open(filename, 'rb')
+            try:
+                source = f.read()
+            finally:
+                f.close()
+        except IOError:
+            # let Mako report the missing template
+            return None
+        key = '%r\0%r\0%s\0' % (os.path.abspath(filename), uri, self.options)
+        digest = sha1(key + source).hexdigest()
+        name = '%s-%s.py' % (_unsafe.sub('_', os.path.basename(filename)),
+                             digest[:20])
+        return os.path.join(self.directory, name)
+
+def make_lookup(settings, package=None):
+    """ Return a :class:`PkgResourceTemplateLookup` configured by the
+    ``mako.*`` settings in ``settings``; ``package`` is used to resolve a
+    relative ``mako.error_handler`` dotted name."""
+    reload_templates = settings.get('reload_templates', False)
+    directories = settings.get('mako.directories', None)
+    module_directory = settings.get('mako.module_directory', None)
+    cache_modules = settings.get('mako.cache_modules', 'true')
+    input_encoding = settings.get('mako.input_encoding', 'utf-8')
+    error_handler = settings.get('mako.error_handler', None)
+    default_filters = settings.get('mako.default_filters', None)
+    imports = settings.get('mako.imports', None)
+    strict_undefined = settings.get('mako.strict_undefined', 'false')
+    if directories is None:
+        raise ConfigurationError(
+            'Mako template used without a ``mako.directories`` setting')
+    if not hasattr(directories, '__iter__'):
+        directories = filter(None, directories.splitlines())
+    directories = [ abspath_from_asset_spec(d) for d in directories ]
+    if module_directory is not None:
+        module_directory = abspath_from_asset_spec(module_directory)
+    if error_handler is not None:
+        dotted = DottedNameResolver(package)
+        error_handler = dotted.maybe_resolve(error_handler)
+    if default_filters is not None:
+        if not hasattr(default_filters, '__iter__'):
+            default_filters = filter(None, default_filters.splitlines())
+    if imports is not None:
+        if not hasattr(imports, '__iter__'):
+            imports = filter(None, imports.splitlines())
+    strict_undefined = asbool(strict_undefined)
+
+    modulename_callable = None
+    if asbool(cache_modules):
+        # the compiled code depends on these options as well as on the
+        # template source
+        options = repr((mako.__version__, input_encoding, default_filters,
+                        imports, strict_undefined))
+        if module_directory is None:
+            modulename_callable = ModuleFilename(default_module_directory(),
+                                                 options, private=True)
+        else:
+            modulename_callable = ModuleFilename(module_directory, options)
+
+    return PkgResourceTemplateLookup(directories=directories,
+                                     module_directory=module_directory,
+                                     modulename_callable=modulename_callable,
+                                     input_encoding=input_encoding,
+                                     error_handler=error_handler,
+                                     default_filters=default_filters,
+                                     imports=imports,
+                                     filesystem_checks=reload_templates,
+                                     strict_undefined=strict_undefined)
+
+def precompile(lookup, extensions=('.mak', '.mako')):
+    """ Compile every template whose name ends with one of ``extensions``
+    found within the directories of ``lookup`` (a Mako template lookup), so
+    that the compiled modules are written to its module cache.  Return the
+    list of template uris compiled."""
+    compiled = []
+    for directory in lookup.directories:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            filenames.sort()
+            for filename in filenames:
+                if os.path.splitext(filename)[1] not in extensions:
+                    continue
+                path = os.path.join(dirpath, filename)
+                uri = path[len(directory):].lstrip(os.sep)
+                uri = uri.replace(os.sep, '/')
+                lookup.get_template(uri)
+                compiled.append(uri)
+    return compiled
+
 registry_lock = threading.Lock() 
 
 def renderer_factory(info):
@@ -61,41 +210,7 @@ def renderer_factory(info):
     settings = info.settings
     lookup = registry.queryUtility(IMakoLookup)
     if lookup is None:
-        reload_templates = settings.get('reload_templates', False)
-        directories = settings.get('mako.directories', None)
-        module_directory = settings.get('mako.module_directory', None)
-        input_encoding = settings.get('mako.input_encoding', 'utf-8')
-        error_handler = settings.get('mako.error_handler', None)
-        default_filters = settings.get('mako.default_filters', None)
-        imports = settings.get('mako.imports', None)
-        strict_undefined = settings.get('mako.strict_undefined', 'false')
-        if directories is None:
-            raise ConfigurationError(
-                'Mako template used without a ``mako.directories`` setting')
-        if not hasattr(directories, '__iter__'):
-            directories = filter(None, directories.splitlines())
-        directories = [ abspath_from_asset_spec(d) for d in directories ]
-        if module_directory is not None:
-            module_directory = abspath_from_asset_spec(module_directory)
-        if error_handler is not None:
-            dotted = DottedNameResolver(info.package)
-            error_handler = dotted.maybe_resolve(error_handler)
-        if default_filters is not None:
-            if not hasattr(default_filters, '__iter__'):
-                default_filters = filter(None, default_filters.splitlines())
-        if imports is not None:
-            if not hasattr(imports, '__iter__'):
-                imports = filter(None, imports.splitlines())
-        strict_undefined = asbool(strict_undefined)
-        
-        lookup = PkgResourceTemplateLookup(directories=directories,
-                                           module_directory=module_directory,
-                                           input_encoding=input_encoding,
-                                           error_handler=error_handler,
-                                           default_filters=default_filters,
-                                           imports=imports,
-                                           filesystem_checks=reload_templates,
-                                           strict_undefined=strict_undefined)
+        lookup = make_lookup(settings, info.package)
         registry_lock.acquire()
         try:
             registry.registerUtility(lookup, IMakoLookup)
@@ -412,3 +412,57 @@ class PViewsCommand(PCommand):
                 self.out("    Not found.")
         self.out('')
 
+
+class PMakoCompileCommand(PCommand):
+    """Compile every Mako template found in the ``mako.directories`` of a
+    Pyramid application into its compiled-module cache, so that processes
+    serving the application do not compile the templates on first use.
+
+    This command accepts two positional arguments:
+
+    ``config_file`` -- specifies the PasteDeploy config file to use
+    to load the application.
+
+    ``section_name`` -- specifies the section name in the PasteDeploy
+    config file that represents the application.
+
+    Example::
+
+        $ paster pmakocompile myapp.ini main
+
+    .. note:: You should use a ``section_name`` that refers to the
+              actual ``app`` section in the config file that points at
+              your Pyramid app without any middleware wrapping, or this
+              command will almost certainly fail.
+    """
+    summary = "Compile the Mako templates of a Pyramid application"
+    min_args = 2
+    max_args = 2
+    stdout = sys.stdout
+
+    parser = Command.standard_parser(simulate=True)
+
+    def out(self, msg): # pragma: no cover
+        print msg
+
+    def command(self):
+        from pyramid.mako_templating import IMakoLookup
+        from pyramid.mako_templating import make_lookup
+        from pyramid.mako_templating import precompile
+        config_file, section_name = self.args
+        app = self.get_app(config_file, section_name, loadapp=self.loadapp[0])
+        registry = app.registry
+        lookup = registry.queryUtility(IMakoLookup)
+        if lookup is None:
+            settings = registry.settings or {}
+            if settings.get('mako.directories') is None:
+                self.out('No mako.directories setting; nothing to compile.')
+                return
+            lookup = make_lookup(settings)
+        if lookup.modulename_callable is None and (
+            lookup.module_directory is None):
+            self.out('Compiled Mako templates are not cached (the '
+                     'mako.cache_modules setting is false); nothing to do.')
+            return
+        for uri in precompile(lookup):
+            self.out('compiled %s' % uri)
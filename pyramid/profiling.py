@@ -0,0 +1,174 @@
+""" Profiling of a sample of the requests handled by a :app:`Pyramid`
+application.
+
+When the ``profile_requests`` setting is set to a fraction greater than
+zero, the :term:`router` runs that fraction of the requests it receives
+under :mod:`cProfile` (or :mod:`profile` when :mod:`cProfile` is not
+available).  The profiles are aggregated per matched route and view name
+and written as :mod:`pstats` files to the directory named by the
+``profile_directory`` setting, where they can be inspected with e.g.
+``python -m pstats route-home.view-default.1234.pstats``.  Each process
+writes its own files (the process id is part of the file name), so the
+files of several processes can be combined by passing them all to
+:class:`pstats.Stats`.  The files are rewritten at most once every
+:attr:`RequestProfiler.write_interval` seconds, when the process exits and
+when :meth:`RequestProfiler.flush` is called."""
+
+import atexit
+import marshal
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+
+try:
+    from cProfile import Profile
+except ImportError: # pragma: no cover
+    from profile import Profile
+
+import pstats
+
+_unsafe = re.compile(r'[^A-Za-z0-9_-]')
+
+def request_tag(request):
+    """ Return the tag under which the profile of ``request`` is aggregated,
+    composed of the name of the matched route (if any) and the view name,
+    e.g. ``route-home.view-default``."""
+    view_name = getattr(request, 'view_name', '') or 'default'
+    tag = 'view-%s' % _unsafe.sub('_', view_name)
+    route = getattr(request, 'matched_route', None)
+    if route is not None:
+        tag = 'route-%s.%s' % (_unsafe.sub('_', route.name), tag)
+    return tag
+
+class RequestProfiler(object):
+    """ Profiles a fraction (``sample_rate``, a number between ``0`` and
+    ``1``) of the calls made to :meth:`profile` and writes the profiles,
+    aggregated per :func:`request_tag`, to ``directory``.  The directory is
+    created if it does not exist.  The aggregates changed since they were
+    last written are written by the first sampled request after
+    :attr:`write_interval` seconds have passed, and by :meth:`flush`, which
+    is also called when the process exits."""
+
+    random = random.random # for testing injection
+    profiler_factory = Profile # for testing injection
+    timer = time.time # for testing injection
+    write_interval = 10 # seconds
+
+    def __init__(self, directory, sample_rate):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.stats = {} # tag -> pstats.Stats
+        self.dirty = set() # tags changed since they were last written
+        self.last_write = 0
+        self.lock = threading.Lock() # guards stats and dirty
+        self.write_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def sample(self):
+        """ Return ``True`` if the next request should be profiled."""
+        return self.random() < self.sample_rate
+
+    def profile(self, func, request):
+        """ Return the result of calling ``func`` with ``request``, profiling
+        the call and adding the profile to the aggregate for ``request``.
+        The tag is computed after the call, so that the matched route and
+        view name are known."""
+        profiler = self.profiler_factory()
+        try:
+            return profiler.runcall(func, request)
+        finally:
+            self.add(request_tag(request), profiler)
+
+    def add(self, tag, profiler):
+        """ Add the profile recorded by ``profiler`` to the aggregate named
+        ``tag``, writing the changed aggregates if :attr:`write_interval`
+        seconds have passed since they were last written."""
+        self.lock.acquire()
+        try:
+            stats = self.stats.get(tag)
+            if stats is None:
+                stats = self.stats[tag] = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+            self.dirty.add(tag)
+        finally:
+            self.lock.release()
+        if self.timer() - self.last_write >= self.write_interval:
+            # requests arriving while another thread writes don't wait
+            self.flush(blocking=False)
+
+    def flush(self, blocking=True):
+        """ Write the aggregates changed since they were last written to
+        their files.  If ``blocking`` is false and another thread is
+        writing, return without writing."""
+        if not self.write_lock.acquire(blocking):
+            return
+        try:
+            self.last_write = self.timer()
+            self.lock.acquire()
+            try:
+                # the values of Stats.stats are replaced rather than
+                # mutated by Stats.add, so a shallow copy is a snapshot
+                snapshots = [ (tag, dict(self.stats[tag].stats))
+                              for tag in self.dirty ]
+                self.dirty = set()
+            finally:
+                self.lock.release()
+            for tag, stats in snapshots:
+                try:
+                    self.write(tag, stats)
+                except (IOError, OSError):
+                    # a failure to write a profile must not fail the
+                    # request; the aggregate is written again next time
+                    self.lock.acquire()
+                    try:
+                        self.dirty.add(tag)
+                    finally:
+                        self.lock.release()
+        finally:
+            self.write_lock.release()
+
+    def filename(self, tag):
+        """ Return the name of the file the aggregate ``tag`` is written
+        to."""
+        return os.path.join(self.directory,
+                            '%s.%d.pstats' % (tag, os.getpid()))
+
+    def write(self, tag, stats):
+        # ``stats`` is the ``stats`` dictionary of a pstats.Stats, written
+        # in the same format as pstats.Stats.dump_stats to a temporary file
+        # and renamed into place so that readers never see a partially
+        # written file
+        filename = self.filename(tag)
+        fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            f = os.fdopen(fd, 'wb')
+            try:
+                marshal.dump(stats, f)
+            finally:
+                f.close()
+            try:
+                os.rename(tmpname, filename)
+            except OSError: # pragma: no cover (windows)
+                os.remove(filename)
+                os.rename(tmpname, filename)
+        except:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            raise
+
+def make_request_profiler(settings):
+    """ Return a :class:`RequestProfiler` configured by the
+    ``profile_requests`` and ``profile_directory`` settings, or ``None`` if
+    request profiling is disabled."""
+    sample_rate = settings.get('profile_requests') or 0
+    if sample_rate <= 0:
+        return None
+    directory = settings.get('profile_directory') or os.path.join(
+        tempfile.gettempdir(), 'pyramid-profiles')
+    return RequestProfiler(directory, sample_rate)
@@ -1,6 +1,11 @@
 from zope.component.registry import Components
+from zope.interface import implementedBy
+from zope.interface import providedBy
+from zope.interface.interfaces import IInterface
 
+from pyramid.interfaces import IExceptionViewClassifier
 from pyramid.interfaces import ISettings
+from pyramid.interfaces import IView
 
 class Registry(Components, dict):
     """ A registry object is an :term:`application registry`.  The existence
@@ -22,6 +27,10 @@ class Registry(Components, dict):
     # to notify them
     has_listeners = False
     _settings = None
+    _handler_cache = None
+    _handler_cache_generation = None
+    _exception_view_cache = None
+    _exception_view_cache_generation = None
 
     def registerSubscriptionAdapter(self, *arg, **kw):
         result = Components.registerSubscriptionAdapter(self, *arg, **kw)
@@ -33,10 +42,69 @@ class Registry(Components, dict):
         self.has_listeners = True
         return result
 
+    def _handlers_for(self, specs):
+        # the handlers subscribed to events providing the interface
+        # specifications ``specs`` are looked up once and cached until the
+        # adapter registry changes; its generation is bumped by every
+        # registration, including ones made directly on ``self.adapters``
+        # or on a base registry
+        adapters = self.adapters
+        cache = self._handler_cache
+        if cache is None or (self._handler_cache_generation !=
+                             adapters._generation):
+            cache = self._handler_cache = {}
+            self._handler_cache_generation = adapters._generation
+        try:
+            return cache[specs]
+        except KeyError:
+            handlers = adapters.subscriptions(specs, None)
+            cache[specs] = handlers
+            return handlers
+
+    def _exception_view_for(self, request_iface, exc):
+        # the exception view for the exception ``exc`` raised while handling
+        # a request providing ``request_iface`` is looked up once per
+        # exception class and cached until the adapter registry (or one of
+        # its bases) changes; exceptions which directly provide interfaces
+        # are always looked up
+        adapters = self.adapters
+        if '__provides__' in getattr(exc, '__dict__', ()):
+            return adapters.lookup(
+                (IExceptionViewClassifier, request_iface.combined,
+                 providedBy(exc)), IView, default=None)
+        cache = self._exception_view_cache
+        if cache is None or (self._exception_view_cache_generation !=
+                             adapters._generation):
+            cache = self._exception_view_cache = {}
+            self._exception_view_cache_generation = adapters._generation
+        key = (request_iface, exc.__class__)
+        try:
+            return cache[key]
+        except KeyError:
+            view = adapters.lookup(
+                (IExceptionViewClassifier, request_iface.combined,
+                 implementedBy(exc.__class__)), IView, default=None)
+            cache[key] = view
+            return view
+
+    def has_listeners_for(self, event_type):
+        """ Return ``True`` if any subscriber would be called when an event
+        implementing ``event_type`` (an event class or an event interface)
+        is passed to :meth:`notify`, ``False`` otherwise.  This can be used
+        to avoid constructing an event object nobody listens to."""
+        if not self.has_listeners:
+            return False
+        if IInterface.providedBy(event_type):
+            spec = event_type
+        else:
+            spec = implementedBy(event_type)
+        return bool(self._handlers_for((spec,)))
+
     def notify(self, *events):
         if self.has_listeners:
-            # iterating over subscribers assures they get executed
-            [ _ for _ in self.subscribers(events, None) ]
+            specs = tuple([ providedBy(event) for event in events ])
+            for handler in self._handlers_for(specs):
+                handler(*events)
 
     # backwards compatibility for code that wants to look up a settings
     # object via ``registry.getUtility(ISettings)``
@@ -14,6 +14,7 @@ from pyramid.interfaces import ITemplateRenderer
 from pyramid.interfaces import IRendererInfo
 
 from pyramid.asset import asset_spec_from_abspath
+from pyramid.cache import FragmentCache
 from pyramid.compat import json
 from pyramid.decorator import reify
 from pyramid.events import BeforeRender
@@ -256,6 +257,29 @@ class ChameleonRendererLookup(object):
 
         return renderer
 
+def precompile_template(template):
+    """ Compile ``template`` (a Chameleon template object) to Python in the
+    same way Chameleon does when the template is first rendered, without
+    rendering it.  Templates which are compiled as they are loaded (such as
+    Mako templates, which have a compiled ``module``) need no compiling.
+    Return ``True`` if ``template`` is compiled, ``False`` if it does not
+    support being compiled ahead of rendering."""
+    registry = getattr(template, 'registry', None)
+    compiler = getattr(template, 'compiler', None)
+    signature = getattr(template, 'signature', None)
+    if registry is None or compiler is None or signature is None:
+        return getattr(template, 'module', None) is not None
+    # the key Chameleon uses for a full (non-macro) rendering
+    key = None, True, signature
+    if key not in registry:
+        template.acquire()
+        try:
+            source = compiler(None, True)
+        finally:
+            template.release()
+        registry.add(key, source, template.filename)
+    return True
+
 registry_lock = threading.Lock()
 
 def template_renderer_factory(info, impl, lock=registry_lock):
@@ -331,6 +355,12 @@ class RendererHelper(object):
                 'request':request,
                 }
 
+        if ITemplateRenderer.providedBy(renderer):
+            # only templates can make use of a fragment cache
+            system_values.setdefault(
+                'fragment_cache',
+                FragmentCache(self.registry, request, self.package))
+
         registry = self.registry
         globals_factory = registry.queryUtility(IRendererGlobalsFactory)
 
@@ -339,7 +369,9 @@ class RendererHelper(object):
             if renderer_globals:
                 system_values.update(renderer_globals)
 
-        registry.notify(BeforeRender(system_values))
+        has_listeners_for = getattr(registry, 'has_listeners_for', None)
+        if has_listeners_for is None or has_listeners_for(BeforeRender):
+            registry.notify(BeforeRender(system_values))
 
         result = renderer(value, system_values)
         return result
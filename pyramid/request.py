@@ -5,6 +5,7 @@ from zope.interface.interface import InterfaceClass
 from webob import BaseRequest
 
 from pyramid.interfaces import IRequest
+from pyramid.interfaces import IRouter
 from pyramid.interfaces import ISessionFactory
 from pyramid.interfaces import IResponseFactory
 
@@ -12,6 +13,7 @@ from pyramid.exceptions import ConfigurationError
 from pyramid.decorator import reify
 from pyramid.response import Response
 from pyramid.url import resource_url
+from pyramid.url import resource_urls
 from pyramid.url import route_url
 from pyramid.url import static_url
 from pyramid.url import route_path
@@ -157,6 +159,88 @@ class Request(BaseRequest):
             callback = callbacks.pop(0)
             callback(self)
 
+    def invoke_subrequest(self, path_or_request, share_credentials=False):
+        """
+        Process a subrequest within the current process and return its
+        :term:`response`.  The subrequest is routed by the :term:`router`
+        of this request's :term:`application registry` through the same
+        steps as a request received by the WSGI application (route
+        matching, traversal, security, view lookup, events, response and
+        finished callbacks), but it is not serialized through WSGI.
+
+        ``path_or_request`` is either a path (which may include a query
+        string), in which case a new ``GET`` request for that path relative
+        to this request's application URL is created, or a request object
+        created by the caller (e.g. via
+        :meth:`pyramid.request.Request.blank`).
+
+        If ``share_credentials`` is ``True``, the credentials which
+        :term:`authentication policy` implementations commonly use to
+        determine the authenticated user (the ``Cookie`` and
+        ``Authorization`` request headers, ``REMOTE_USER`` and the
+        ``repoze.who.*`` WSGI environment keys) are copied from this request
+        into the subrequest unless the subrequest already has them, so the
+        subrequest is processed with the same principals.
+
+        For example, a view which composes a page from the JSON output of
+        other views might do:
+
+        .. code-block:: python
+
+           response = request.invoke_subrequest('/api/news?limit=5',
+                                                share_credentials=True)
+        """
+        router, subrequest = self._make_subrequest(path_or_request,
+                                                   share_credentials)
+        return router.invoke_subrequest(subrequest)
+
+    def invoke_subrequests(self, paths_or_requests, share_credentials=False):
+        """
+        Process several subrequests concurrently on the fan-out
+        thread pool of this request's :term:`application registry`.
+        ``paths_or_requests`` is a sequence of paths or request objects, and
+        ``share_credentials`` has the same meaning as for
+        :meth:`pyramid.request.Request.invoke_subrequest`.
+
+        Returns a list containing a :class:`pyramid.fanout.FanoutResult`
+        per subrequest, in the same order; call the ``get`` method of a
+        result to wait for the subrequest's response (or for the exception
+        it raised to be reraised).  For example:
+
+        .. code-block:: python
+
+           results = request.invoke_subrequests(['/api/news', '/api/weather'])
+           news, weather = [ result.get() for result in results ]
+
+        See :mod:`pyramid.fanout` for more information.
+        """
+        from pyramid.fanout import get_fanout_pool # avoid circdep
+        pool = get_fanout_pool(self.registry)
+        results = []
+        for path_or_request in paths_or_requests:
+            router, subrequest = self._make_subrequest(path_or_request,
+                                                       share_credentials)
+            results.append(pool.submit(router.invoke_subrequest, subrequest))
+        return results
+
+    def _make_subrequest(self, path_or_request, share_credentials):
+        registry = self.registry
+        router = registry.queryUtility(IRouter)
+        if router is None:
+            from pyramid.router import Router # avoid circdep
+            router = Router(registry)
+        if isinstance(path_or_request, basestring):
+            subrequest = router.request_factory.blank(
+                path_or_request, base_url=self.application_url)
+        else:
+            subrequest = path_or_request
+        if share_credentials:
+            environ = subrequest.environ
+            for key, value in self.environ.items():
+                if key in _credential_keys or key.startswith('repoze.who.'):
+                    environ.setdefault(key, value)
+        return router, subrequest
+
     @reify
     def session(self):
         """ Obtain the :term:`session` object associated with this
@@ -230,6 +314,18 @@ class Request(BaseRequest):
 
     model_url = resource_url # b/w compat forever
 
+    def resource_urls(self, resources, *elements, **kw):
+        """ Return a list of the URLs of each :term:`resource` in the
+        sequence ``resources``, using ``*elements`` and ``**kw`` as
+        modifiers.
+
+        This is a convenience method.  The result of calling
+        :meth:`pyramid.request.Request.resource_urls` is the same as calling
+        :func:`pyramid.url.resource_urls` with an explicit ``request``
+        parameter.
+        """
+        return resource_urls(resources, self, *elements, **kw)
+
     def static_url(self, path, **kw):
         """
         Generates a fully qualified URL for a static :term:`asset`.  The
@@ -411,12 +507,25 @@ def add_global_response_headers(request, headerlist):
             response.headerlist.append((k, v))
     request.add_response_callback(add_headers)
 
-def call_app_with_subpath_as_path_info(request, app):
+# WSGI environment keys copied into a subrequest by
+# Request.invoke_subrequest when ``share_credentials`` is true (in addition to
+# any ``repoze.who.*`` keys)
+_credential_keys = ('HTTP_COOKIE', 'HTTP_AUTHORIZATION', 'REMOTE_USER')
+
+def call_app_with_subpath_as_path_info(request, app, stream=False):
     # Copy the request.  Use the source request's subpath (if it exists) as
     # the new request's PATH_INFO.  Set the request copy's SCRIPT_NAME to the
     # prefix before the subpath.  Call the application with the new request
     # and return a response.
     #
+    # If ``stream`` is false, the request is copied using ``request.copy()``,
+    # which reads the entire request body into memory (or a temporary file)
+    # so that both requests can read it.  If ``stream`` is true, only the
+    # WSGI environment is copied; the new request shares ``wsgi.input`` with
+    # the source request, so the application can read the body as it
+    # arrives, but the body can then no longer be read via the source
+    # request.
+    #
     # Postconditions:
     # - SCRIPT_NAME and PATH_INFO are empty or start with /
     # - At least one of SCRIPT_NAME or PATH_INFO are set.
@@ -428,8 +537,6 @@ def call_app_with_subpath_as_path_info(request, app):
     path_info = environ.get('PATH_INFO', '/')
     subpath = list(getattr(request, 'subpath', ()))
 
-    new_script_name = ''
-
     # compute new_path_info
     new_path_info = '/' + '/'.join([x.encode('utf-8') for x in subpath])
 
@@ -440,25 +547,37 @@ def call_app_with_subpath_as_path_info(request, app):
                 # conversion
                 new_path_info += '/'
 
-    # compute new_script_name
-    workback = (script_name + path_info).split('/')
-
-    tmp = []
-    while workback:
-        if tmp == subpath:
-            break
-        el = workback.pop()
-        if el:
-            tmp.insert(0, el.decode('utf-8'))
-
-    # strip all trailing slashes from workback to avoid appending undue slashes
-    # to end of script_name
-    while workback and (workback[-1] == ''):
-        workback = workback[:-1]
-            
-    new_script_name = '/'.join(workback)
-
-    new_request = request.copy()
-    new_request.environ['SCRIPT_NAME'] = new_script_name
-    new_request.environ['PATH_INFO'] = new_path_info
+    # compute new_script_name: everything preceding the last len(subpath)
+    # nonempty path elements, if those elements are the subpath
+    elements = (script_name + path_info).split('/')
+    pos = len(elements)
+    remaining = len(subpath)
+    while remaining and pos:
+        pos -= 1
+        if elements[pos]:
+            remaining -= 1
+    if remaining or (subpath and
+                     [ x.decode('utf-8') for x in elements[pos:] if x ] !=
+                     subpath):
+        pos = 0
+
+    # strip all trailing slashes from the script name elements to avoid
+    # appending undue slashes to end of script_name
+    while pos and not elements[pos-1]:
+        pos -= 1
+
+    new_script_name = '/'.join(elements[:pos])
+
+    if stream:
+        if environ.get('webob.is_body_seekable'):
+            # the body has already been buffered; let the app read it again
+            environ['wsgi.input'].seek(0)
+        new_environ = environ.copy()
+        new_environ['SCRIPT_NAME'] = new_script_name
+        new_environ['PATH_INFO'] = new_path_info
+        new_request = request.__class__(new_environ)
+    else:
+        new_request = request.copy()
+        new_request.environ['SCRIPT_NAME'] = new_script_name
+        new_request.environ['PATH_INFO'] = new_path_info
     return new_request.get_response(app)
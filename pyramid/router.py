@@ -1,8 +1,10 @@
+import time
+
 from zope.interface import implements
 from zope.interface import providedBy
 
 from pyramid.interfaces import IDebugLogger
-from pyramid.interfaces import IExceptionViewClassifier
+from pyramid.interfaces import IInstrumentationSink
 from pyramid.interfaces import IRequest
 from pyramid.interfaces import IRootFactory
 from pyramid.interfaces import IRouteRequest
@@ -13,22 +15,32 @@ from pyramid.interfaces import ITraverser
 from pyramid.interfaces import IView
 from pyramid.interfaces import IViewClassifier
 
+from pyramid.compression import make_response_compressor
 from pyramid.events import ContextFound
 from pyramid.events import NewRequest
 from pyramid.events import NewResponse
+from pyramid.exceptions import ExceptionResponse
 from pyramid.exceptions import NotFound
+from pyramid.instrumentation import record_timings
+from pyramid.instrumentation import request_key
+from pyramid.profiling import make_request_profiler
 from pyramid.request import Request
 from pyramid.threadlocal import manager
 from pyramid.traversal import DefaultRootFactory
 from pyramid.traversal import ResourceTreeTraverser
+from pyramid.view import default_exceptionresponse_view
 
 class Router(object):
     implements(IRouter)
 
     debug_notfound = False
     debug_routematch = False
+    lean = False
+    static_error_responses = False
+    _notify_flags_cache = (None, None)
 
     threadlocal_manager = manager
+    timer = time.time
 
     def __init__(self, registry):
         q = registry.queryUtility
@@ -36,6 +48,9 @@ class Router(object):
         self.root_factory = q(IRootFactory, default=DefaultRootFactory)
         self.routes_mapper = q(IRoutesMapper)
         self.request_factory = q(IRequestFactory, default=Request)
+        self.instrumentation_sink = q(IInstrumentationSink)
+        self.request_profiler = None
+        self.response_compressor = None
         self.root_policy = self.root_factory # b/w compat
         self.registry = registry
         settings = registry.settings
@@ -43,6 +58,252 @@ class Router(object):
         if settings is not None:
             self.debug_notfound = settings['debug_notfound']
             self.debug_routematch = settings['debug_routematch']
+            self.request_profiler = make_request_profiler(settings)
+            self.response_compressor = make_response_compressor(settings)
+            self.lean = settings.get('lean_router', False)
+            self.static_error_responses = settings.get(
+                'static_error_responses', False)
+
+        # the request processing steps the router performs (route matching,
+        # traverser lookup and event construction) are decided per request
+        # unless ``lean_router`` is enabled, in which case they are decided
+        # once, here, based on the registrations present at this time
+        self.match_routes = self.routes_mapper is not None
+        self.lookup_traverser = True
+        self.notify_flags = None
+        if self.lean:
+            self.match_routes = (self.match_routes and
+                                 self.routes_mapper.has_routes())
+            self.lookup_traverser = False
+            for reg in registry.registeredAdapters():
+                if reg.provided.isOrExtends(ITraverser):
+                    self.lookup_traverser = True
+                    break
+            self.notify_flags = self._notify_flags()
+
+    def _notify_flags(self):
+        # return flags indicating whether the NewRequest, ContextFound and
+        # NewResponse events have any subscribers; events nobody subscribes
+        # to are not constructed.  The flags are recomputed only when the
+        # adapter registry changes.
+        registry = self.registry
+        generation = registry.adapters._generation
+        cached_generation, flags = self._notify_flags_cache
+        if cached_generation == generation:
+            return flags
+        if not registry.has_listeners:
+            flags = (False, False, False)
+        else:
+            has_listeners_for = registry.has_listeners_for
+            flags = (has_listeners_for(NewRequest),
+                     has_listeners_for(ContextFound),
+                     has_listeners_for(NewResponse))
+        self._notify_flags_cache = (generation, flags)
+        return flags
+
+    def handle_request(self, request):
+        """
+        Route ``request`` (a :term:`request` object whose threadlocals have
+        already been pushed) to a :app:`Pyramid` view based on introspection
+        of :term:`view configuration` within the application registry, and
+        return the resulting :term:`response`.  The ``NewRequest``,
+        ``ContextFound`` and ``NewResponse`` events are sent and response
+        callbacks are called; finished callbacks are not.
+        """
+        sink = self.instrumentation_sink
+        if sink is None:
+            return self._handle_request(request, None)
+        checkpoints = [('start', self.timer())]
+        try:
+            return self._handle_request(request, checkpoints)
+        finally:
+            record_timings(sink, request_key(request), checkpoints,
+                           self.timer())
+
+    def _handle_request(self, request, checkpoints):
+        # ``checkpoints`` is a list to which the name and end time of each
+        # phase of request processing is appended if instrumentation is
+        # enabled, None otherwise
+        registry = self.registry
+        adapters = registry.adapters
+        notify_flags = self.notify_flags or self._notify_flags()
+        notify_new_request, notify_context_found, notify_new_response = (
+            notify_flags)
+        lean = self.lean
+        logger = self.logger
+        environ = request.environ
+        context = None
+        attrs = request.__dict__
+        attrs['registry'] = registry
+        request_iface = IRequest
+
+        try: # matches except Exception (exception view execution)
+            notify_new_request and registry.notify(NewRequest(request))
+            # find the root object
+            root_factory = self.root_factory
+            if self.match_routes:
+                info = self.routes_mapper(request)
+                match, route = info['match'], info['route']
+                if route is None:
+                    if self.debug_routematch:
+                        msg = ('no route matched for url %s' %
+                               request.url)
+                        logger and logger.debug(msg)
+                else:
+                    if not lean:
+                        # TODO: kill off bfg.routes.* environ keys when
+                        # traverser requires request arg, and cant cope
+                        # with environ anymore (they are docs-deprecated
+                        # as of BFG 1.3)
+                        environ['bfg.routes.route'] = route 
+                        environ['bfg.routes.matchdict'] = match
+                    attrs['matchdict'] = match
+                    attrs['matched_route'] = route
+
+                    if self.debug_routematch:
+                        msg = (
+                            'route matched for url %s; '
+                            'route_name: %r, '
+                            'path_info: %r, '
+                            'pattern: %r, '
+                            'matchdict: %r, '
+                            'predicates: %r' % (
+                                request.url,
+                                route.name,
+                                request.path_info,
+                                route.pattern, match,
+                                route.predicates)
+                            )
+                        logger and logger.debug(msg)
+
+                    request_iface = registry.queryUtility(
+                        IRouteRequest,
+                        name=route.name,
+                        default=IRequest)
+                    root_factory = route.factory or self.root_factory
+
+            if checkpoints is not None:
+                checkpoints.append(('route_match', self.timer()))
+
+            root = root_factory(request)
+            attrs['root'] = root
+
+            if checkpoints is not None:
+                checkpoints.append(('root_factory', self.timer()))
+
+            # find a context
+            traverser = None
+            if self.lookup_traverser:
+                traverser = adapters.queryAdapter(root, ITraverser)
+            if traverser is None:
+                traverser = ResourceTreeTraverser(root)
+            tdict = traverser(request)
+            context, view_name = tdict['context'], tdict['view_name']
+            attrs.update(tdict)
+            (notify_context_found and
+             registry.notify(ContextFound(request)))
+
+            if checkpoints is not None:
+                checkpoints.append(('traversal', self.timer()))
+
+            # find a view callable
+            context_iface = providedBy(context)
+            view_callable = adapters.lookup(
+                (IViewClassifier, request_iface, context_iface),
+                IView, name=view_name, default=None)
+
+            # invoke the view callable
+            if view_callable is None:
+                if self.debug_notfound:
+                    msg = (
+                        'debug_notfound of url %s; path_info: %r, '
+                        'context: %r, view_name: %r, subpath: %r, '
+                        'traversed: %r, root: %r, vroot: %r, '
+                        'vroot_path: %r' % (
+                            request.url, request.path_info, context,
+                            view_name, tdict['subpath'], tdict['traversed'],
+                            root, tdict['virtual_root'],
+                            tdict['virtual_root_path'])
+                        )
+                    logger and logger.debug(msg)
+                else:
+                    msg = request.path_info
+                raise NotFound(msg)
+            else:
+                response = view_callable(context, request)
+
+            if checkpoints is not None:
+                checkpoints.append(('view', self.timer()))
+
+        # handle exceptions raised during root finding and view-exec
+        except Exception, why:
+            attrs['exception'] = why
+
+            view_callable = registry._exception_view_for(request_iface, why)
+
+            if view_callable is None:
+                raise
+
+            if not lean:
+                try: 
+                    msg = why[0]
+                except:
+                    msg = ''
+
+                # repoze.bfg.message docs-deprecated in Pyramid 1.0
+                environ['repoze.bfg.message'] = msg
+
+            if (self.static_error_responses and
+                view_callable is default_exceptionresponse_view and
+                isinstance(why, ExceptionResponse)):
+                response = _static_error_response(why)
+            else:
+                response = view_callable(why, request)
+
+            if checkpoints is not None:
+                checkpoints.append(('view', self.timer()))
+
+        # process the response
+
+        (notify_new_response and
+         registry.notify(NewResponse(request, response)))
+
+        if request.response_callbacks:
+            request._process_response_callbacks(response)
+
+        if checkpoints is not None:
+            checkpoints.append(('response', self.timer()))
+
+        if not (hasattr(response, 'headerlist') and
+                hasattr(response, 'app_iter') and
+                hasattr(response, 'status')):
+            raise ValueError(
+                'Non-response object returned from view named %s '
+                '(and no renderer): %r' % (view_name, response))
+
+        return response
+
+    def invoke_subrequest(self, request):
+        """
+        Process ``request`` (a :term:`request` object, usually created by
+        the caller via e.g. :meth:`pyramid.request.Request.blank`) within
+        the current process, bypassing WSGI, and return the resulting
+        :term:`response`.  The request is routed exactly as if it had been
+        received by the WSGI application; the threadlocals of the current
+        request (if any) are restored when the subrequest has been
+        processed, and the subrequest's finished callbacks are called before
+        its response is returned.
+        """
+        manager = self.threadlocal_manager
+        manager.push({'registry':self.registry, 'request':request})
+        try:
+            try:
+                return self.handle_request(request)
+            finally:
+                if request.finished_callbacks:
+                    request._process_finished_callbacks()
+        finally:
+            manager.pop()
 
     def __call__(self, environ, start_response):
         """
@@ -53,9 +314,6 @@ class Router(object):
         return an iterable.
         """
         registry = self.registry
-        adapters = registry.adapters
-        has_listeners = registry.has_listeners
-        logger = self.logger
         manager = self.threadlocal_manager
         request = None
         threadlocals = {'registry':registry, 'request':request}
@@ -67,140 +325,43 @@ class Router(object):
                 
                 # create the request
                 request = self.request_factory(environ)
-                context = None
                 threadlocals['request'] = request
-                attrs = request.__dict__
-                attrs['registry'] = registry
-                request_iface = IRequest
-
-                try: # matches except Exception (exception view execution)
-                    has_listeners and registry.notify(NewRequest(request))
-                    # find the root object
-                    root_factory = self.root_factory
-                    if self.routes_mapper is not None:
-                        info = self.routes_mapper(request)
-                        match, route = info['match'], info['route']
-                        if route is None:
-                            if self.debug_routematch:
-                                msg = ('no route matched for url %s' %
-                                       request.url)
-                                logger and logger.debug(msg)
-                        else:
-                            # TODO: kill off bfg.routes.* environ keys when
-                            # traverser requires request arg, and cant cope
-                            # with environ anymore (they are docs-deprecated as
-                            # of BFG 1.3)
-                            environ['bfg.routes.route'] = route 
-                            environ['bfg.routes.matchdict'] = match
-                            attrs['matchdict'] = match
-                            attrs['matched_route'] = route
-
-                            if self.debug_routematch:
-                                msg = (
-                                    'route matched for url %s; '
-                                    'route_name: %r, '
-                                    'path_info: %r, '
-                                    'pattern: %r, '
-                                    'matchdict: %r, '
-                                    'predicates: %r' % (
-                                        request.url,
-                                        route.name,
-                                        request.path_info,
-                                        route.pattern, match,
-                                        route.predicates)
-                                    )
-                                logger and logger.debug(msg)
-
-                            request_iface = registry.queryUtility(
-                                IRouteRequest,
-                                name=route.name,
-                                default=IRequest)
-                            root_factory = route.factory or self.root_factory
-
-                    root = root_factory(request)
-                    attrs['root'] = root
-
-                    # find a context
-                    traverser = adapters.queryAdapter(root, ITraverser)
-                    if traverser is None:
-                        traverser = ResourceTreeTraverser(root)
-                    tdict = traverser(request)
-                    context, view_name, subpath, traversed, vroot, vroot_path =(
-                        tdict['context'], tdict['view_name'], tdict['subpath'],
-                        tdict['traversed'], tdict['virtual_root'],
-                        tdict['virtual_root_path'])
-                    attrs.update(tdict)
-                    has_listeners and registry.notify(ContextFound(request))
-
-                    # find a view callable
-                    context_iface = providedBy(context)
-                    view_callable = adapters.lookup(
-                        (IViewClassifier, request_iface, context_iface),
-                        IView, name=view_name, default=None)
-
-                    # invoke the view callable
-                    if view_callable is None:
-                        if self.debug_notfound:
-                            msg = (
-                                'debug_notfound of url %s; path_info: %r, '
-                                'context: %r, view_name: %r, subpath: %r, '
-                                'traversed: %r, root: %r, vroot: %r, '
-                                'vroot_path: %r' % (
-                                    request.url, request.path_info, context,
-                                    view_name,
-                                    subpath, traversed, root, vroot, vroot_path)
-                                )
-                            logger and logger.debug(msg)
-                        else:
-                            msg = request.path_info
-                        raise NotFound(msg)
-                    else:
-                        response = view_callable(context, request)
-
-                # handle exceptions raised during root finding and view-exec
-                except Exception, why:
-                    attrs['exception'] = why
-
-                    for_ = (IExceptionViewClassifier,
-                            request_iface.combined,
-                            providedBy(why))
-                    view_callable = adapters.lookup(for_, IView, default=None)
-
-                    if view_callable is None:
-                        raise
-
-                    try: 
-                        msg = why[0]
-                    except:
-                        msg = ''
-
-                    # repoze.bfg.message docs-deprecated in Pyramid 1.0
-                    environ['repoze.bfg.message'] = msg
-
-                    response = view_callable(why, request)
-
-                # process the response
-
-                has_listeners and registry.notify(NewResponse(request,response))
-
-                if request.response_callbacks:
-                    request._process_response_callbacks(response)
-
-                try:
-                    headers = response.headerlist
-                    app_iter = response.app_iter
-                    status = response.status
-                except AttributeError:
-                    raise ValueError(
-                        'Non-response object returned from view named %s '
-                        '(and no renderer): %r' % (view_name, response))
+                profiler = self.request_profiler
+                if profiler is not None and profiler.sample():
+                    response = profiler.profile(self.handle_request, request)
+                else:
+                    response = self.handle_request(request)
 
             finally:
                 if request is not None and request.finished_callbacks:
                     request._process_finished_callbacks()
 
-            start_response(status, headers)
-            return app_iter
+            compressor = self.response_compressor
+            if compressor is not None:
+                response = compressor(request, response)
+
+            start_response(response.status, response.headerlist)
+            return response.app_iter
             
         finally:
             manager.pop()
+
+# the preformatted bodies used by _static_error_response, by status
+_static_error_bodies = {}
+
+def _static_error_response(exc):
+    # make the exception response ``exc`` (which is its own response) use a
+    # body which depends only on its status rather than on its message
+    # (which usually contains the request path), formatted once per status
+    status = exc.status
+    try:
+        body, length = _static_error_bodies[status]
+    except KeyError:
+        body = ('<html>\n<title>%s</title>\n<body>\n<h1>%s</h1>\n'
+                '</body>\n</html>\n' % (status, status))
+        length = str(len(body))
+        _static_error_bodies[status] = body, length
+    exc.app_iter = [body]
+    exc.headerlist = [('Content-Length', length),
+                      ('Content-Type', 'text/html')]
+    return exc
@@ -0,0 +1,191 @@
+import inspect
+import os
+import sys
+import tempfile
+
+import venusian
+
+from pyramid.compat import json
+
+class ScanCache(object):
+    """ A persistent record of the names of the objects marked with
+    :term:`configuration decoration` found in each module of a scanned
+    package, stored as JSON in the file named by ``path``.  Each module is
+    recorded along with the modification time and size of its source file,
+    so that a later scan can tell whether the module has changed."""
+    version = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            data = None
+            try:
+                f = open(self.path, 'rb')
+                try:
+                    data = json.load(f)
+                finally:
+                    f.close()
+            except (IOError, OSError, ValueError):
+                pass
+            if not isinstance(data, dict) or (
+                data.get('version') != self.version):
+                data = {'version':self.version, 'scans':{}}
+            self._data = data
+        return self._data
+
+    def get(self, key):
+        """ Return the module records stored for the scan named ``key`` (a
+        dictionary mapping a module name to a ``[stamp, names]`` list) or
+        ``None`` if the scan has never been recorded."""
+        return self._load()['scans'].get(key)
+
+    def set(self, key, modules):
+        """ Store the module records for the scan named ``key`` and write
+        the cache file."""
+        self._load()['scans'][key] = modules
+        self.save()
+
+    def save(self):
+        # write to a temporary file and rename it into place so that
+        # concurrently starting processes never see a partially written file
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        fd, tmpname = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+        try:
+            f = os.fdopen(fd, 'wb')
+            try:
+                json.dump(self._data, f)
+            finally:
+                f.close()
+            try:
+                os.rename(tmpname, self.path)
+            except OSError: # pragma: no cover (windows)
+                os.remove(self.path)
+                os.rename(tmpname, self.path)
+        except:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            raise
+
+class CachingScanner(venusian.Scanner):
+    """ A :term:`Venusian` scanner which consults a :class:`ScanCache`
+    (passed as the ``cache`` keyword argument to the constructor) to avoid
+    importing and walking modules which did not contain any decorated
+    objects the last time they were scanned.  Modules whose source file is
+    unchanged since the last scan only have their recorded names replayed;
+    changed and new modules are scanned in full and the cache is updated.
+
+    Packages which are not stored as plain directories on the filesystem
+    (e.g. zipped eggs) are always scanned in full."""
+
+    def scan(self, package, categories=None):
+        modules = _find_modules(package)
+        if modules is None:
+            return venusian.Scanner.scan(self, package, categories=categories)
+
+        if categories is None:
+            key = '%s:*' % package.__name__
+        else:
+            key = '%s:%s' % (package.__name__,
+                             ','.join(sorted([str(c) for c in categories])))
+
+        cached = self.cache.get(key) or {}
+        found = {}
+        seen = set()
+
+        def invoke(name, ob):
+            # returns True if ``ob`` is decorated for ``categories``, even if
+            # it was already processed during this scan
+            try:
+                # see venusian.Scanner.scan for why this is a bare except
+                attached_categories = getattr(ob, venusian.ATTACH_ATTR)
+                if not attached_categories.attached_to(ob):
+                    return False
+            except:
+                return False
+            category_keys = categories
+            if category_keys is None:
+                category_keys = list(attached_categories.keys())
+                category_keys.sort()
+            callbacks = []
+            for category in category_keys:
+                callbacks.extend(attached_categories.get(category, []))
+            if not callbacks:
+                return False
+            if id(ob) not in seen:
+                seen.add(id(ob))
+                for callback in callbacks:
+                    callback(self, name, ob)
+            return True
+
+        for modname, filename in modules:
+            try:
+                st = os.stat(filename)
+                stamp = [st.st_mtime, st.st_size]
+            except OSError:
+                stamp = None
+            entry = cached.get(modname)
+            if stamp is not None and entry is not None and entry[0] == stamp:
+                names = entry[1]
+                if names:
+                    module = _import(modname)
+                    for name in names:
+                        invoke(name, getattr(module, name, None))
+            else:
+                module = _import(modname)
+                names = [ name for name, ob in inspect.getmembers(module)
+                          if invoke(name, ob) ]
+            found[modname] = [stamp, names]
+
+        if found != cached:
+            self.cache.set(key, found)
+
+def _import(modname):
+    __import__(modname)
+    return sys.modules[modname]
+
+def _source_file(filename):
+    if filename[-4:] in ('.pyc', '.pyo'):
+        source = filename[:-1]
+        if os.path.exists(source):
+            return source
+    return filename
+
+def _find_modules(package):
+    """ Return a list of ``(modname, filename)`` tuples for ``package`` and
+    each of its submodules and subpackages (in the order in which Venusian
+    would scan them) without importing any of them.  Return ``None`` if
+    the package cannot be inspected on the filesystem."""
+    filename = getattr(package, '__file__', None)
+    if filename is None or not os.path.exists(filename):
+        return None
+    result = [(package.__name__, _source_file(filename))]
+    path = getattr(package, '__path__', None)
+    if path is not None:
+        for dirname in path:
+            if not os.path.isdir(dirname):
+                return None
+            _walk(dirname, package.__name__ + '.', result)
+    return result
+
+def _walk(dirname, prefix, result):
+    yielded = set()
+    filenames = os.listdir(dirname)
+    filenames.sort()
+    for fn in filenames:
+        path = os.path.join(dirname, fn)
+        if os.path.isdir(path):
+            init = os.path.join(path, '__init__.py')
+            if '.' in fn or fn in yielded or not os.path.exists(init):
+                continue
+            yielded.add(fn)
+            result.append((prefix + fn, init))
+            _walk(path, prefix + fn + '.', result)
+        elif fn.endswith('.py'):
+            modname = fn[:-3]
+            if modname == '__init__' or '.' in modname or modname in yielded:
+                continue
+            yielded.add(modname)
+            result.append((prefix + modname, path))
@@ -119,6 +119,32 @@ def principals_allowed_by_permission(context, permission):
         return [Everyone]
     return policy.principals_allowed_by_permission(context, permission)
 
+def bulk_principals_allowed_by_permission(contexts, permission):
+    """ Provided a sequence of ``contexts`` (resource objects) and a
+    ``permission`` (a string or unicode object), return a list containing,
+    for each context (in the same order), the sequence of :term:`principal`
+    ids that :func:`pyramid.security.principals_allowed_by_permission`
+    would return for it.  This is useful when the principals of many
+    resources are needed at once, e.g. when indexing a resource tree for
+    searching.
+
+    If the :term:`authorization policy` in effect has a
+    ``bulk_principals_allowed_by_permission`` method (as
+    :class:`pyramid.authorization.ACLAuthorizationPolicy` does), it is used
+    to share the computation for common ancestors of the contexts;
+    otherwise the policy's ``principals_allowed_by_permission`` method is
+    called for each context.
+    """
+    reg = get_current_registry()
+    policy = reg.queryUtility(IAuthorizationPolicy)
+    if policy is None:
+        return [ [Everyone] for context in contexts ]
+    bulk = getattr(policy, 'bulk_principals_allowed_by_permission', None)
+    if bulk is not None:
+        return bulk(contexts, permission)
+    return [ policy.principals_allowed_by_permission(context, permission)
+             for context in contexts ]
+
 def view_execution_permitted(context, request, name=''):
     """ If the view specified by ``context`` and ``name`` is protected
     by a :term:`permission`, check the permission associated with the
@@ -48,6 +48,41 @@ class Settings(dict):
         eff_reload_assets = reload_assets or reload_resources
         locale_name = self.get('default_locale_name', 'en')
         eff_locale_name = eget('PYRAMID_DEFAULT_LOCALE_NAME', locale_name)
+        scan_cache = self.get('scan_cache', '')
+        eff_scan_cache = eget('PYRAMID_SCAN_CACHE', scan_cache)
+        config_profile_startup = self.get('profile_startup', '')
+        eff_profile_startup = asbool(eget('PYRAMID_PROFILE_STARTUP',
+                                          config_profile_startup))
+        config_profile_requests = self.get('profile_requests', 0)
+        eff_profile_requests = float(eget('PYRAMID_PROFILE_REQUESTS',
+                                          config_profile_requests) or 0)
+        config_profile_directory = self.get('profile_directory', '')
+        eff_profile_directory = eget('PYRAMID_PROFILE_DIRECTORY',
+                                     config_profile_directory)
+        config_lean_router = self.get('lean_router', '')
+        eff_lean_router = asbool(eget('PYRAMID_LEAN_ROUTER',
+                                      config_lean_router))
+        config_warm_templates = self.get('warm_templates', '')
+        eff_warm_templates = asbool(eget('PYRAMID_WARM_TEMPLATES',
+                                         config_warm_templates))
+        config_fanout_threads = self.get('fanout_threads', 4)
+        eff_fanout_threads = int(eget('PYRAMID_FANOUT_THREADS',
+                                      config_fanout_threads))
+        config_static_error_responses = self.get('static_error_responses', '')
+        eff_static_error_responses = asbool(eget(
+            'PYRAMID_STATIC_ERROR_RESPONSES', config_static_error_responses))
+        config_cache_resource_paths = self.get('cache_resource_paths', '')
+        eff_cache_resource_paths = asbool(eget('PYRAMID_CACHE_RESOURCE_PATHS',
+                                               config_cache_resource_paths))
+        config_compress_responses = self.get('compress_responses', '')
+        eff_compress_responses = asbool(eget('PYRAMID_COMPRESS_RESPONSES',
+                                             config_compress_responses))
+        config_compress_level = self.get('compress_level', 6)
+        eff_compress_level = int(eget('PYRAMID_COMPRESS_LEVEL',
+                                      config_compress_level))
+        config_compress_min_size = self.get('compress_min_size', 256)
+        eff_compress_min_size = int(eget('PYRAMID_COMPRESS_MIN_SIZE',
+                                         config_compress_min_size))
         
         update = {
             'debug_authorization': eff_debug_all or eff_debug_auth,
@@ -58,6 +93,18 @@ class Settings(dict):
             'reload_resources':eff_reload_all or eff_reload_assets,
             'reload_assets':eff_reload_all or eff_reload_assets,
             'default_locale_name':eff_locale_name,
+            'profile_startup':eff_profile_startup,
+            'profile_requests':eff_profile_requests,
+            'profile_directory':eff_profile_directory,
+            'lean_router':eff_lean_router,
+            'warm_templates':eff_warm_templates,
+            'fanout_threads':eff_fanout_threads,
+            'cache_resource_paths':eff_cache_resource_paths,
+            'static_error_responses':eff_static_error_responses,
+            'compress_responses':eff_compress_responses,
+            'compress_level':eff_compress_level,
+            'compress_min_size':eff_compress_min_size,
+            'scan_cache':eff_scan_cache,
             }
 
         self.update(update)
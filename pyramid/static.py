@@ -1,21 +1,93 @@
+import mimetypes
 import os
 import pkg_resources
+import re
 from urlparse import urljoin
 from urlparse import urlparse
 
 from paste import httpexceptions
 from paste import request
+from paste.fileapp import FileApp
 from paste.httpheaders import ETAG
-from paste.urlparser import StaticURLParser
+from paste.urlparser import StaticURLParser as _StaticURLParser
 
 from zope.interface import implements
 
 from pyramid.asset import resolve_asset_spec
+from pyramid.compression import negotiate_encoding
 from pyramid.interfaces import IStaticURLInfo
 from pyramid.path import caller_package
 from pyramid.request import call_app_with_subpath_as_path_info
 from pyramid.url import route_url
 
+_weak_etag_re = re.compile(r'(^|,)(\s*)W/')
+
+class PrecompressedFileApp(object):
+    """ A WSGI application which serves the file named ``filename``, or
+    the ``gzip`` compressed variant of it named ``filename + '.gz'`` to
+    clients which accept ``gzip``, if that variant exists and is not older
+    than ``filename``.  The ``Content-Type`` of the variant is that of
+    ``filename``.  Responses for a file with such a variant include a
+    ``Vary: Accept-Encoding`` header."""
+    file_app = FileApp # for testing injection
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.cache_control_kw = None
+
+    def cache_control(self, **kw):
+        self.cache_control_kw = kw
+        return self
+
+    def variant(self):
+        """ Return the name of the precompressed variant of the file, or
+        ``None`` if it does not exist or is older than the file."""
+        variant = self.filename + '.gz'
+        try:
+            if os.stat(variant).st_mtime >= os.stat(self.filename).st_mtime:
+                return variant
+        except OSError:
+            pass
+        return None
+
+    def __call__(self, environ, start_response):
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if isinstance(if_none_match, basestring) and 'W/' in if_none_match:
+            # If-None-Match uses the weak comparison function, but FileApp
+            # compares entity tags strongly; the response compressor weakens
+            # the ETag of the files it compresses, and clients send it back
+            # that way when they revalidate
+            environ = environ.copy()
+            environ['HTTP_IF_NONE_MATCH'] = _weak_etag_re.sub(r'\1\2',
+                                                              if_none_match)
+        variant = self.variant()
+        if variant is None:
+            app = self.file_app(self.filename)
+        elif negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING'),
+                                ('gzip',)) == 'gzip':
+            content_type = mimetypes.guess_type(self.filename)[0]
+            app = self.file_app(variant,
+                                content_type=content_type or
+                                'application/octet-stream',
+                                content_encoding='gzip')
+        else:
+            app = self.file_app(self.filename)
+        if self.cache_control_kw:
+            app.cache_control(**self.cache_control_kw)
+        if variant is None:
+            return app(environ, start_response)
+        def vary_start_response(status, headerlist, exc_info=None):
+            headerlist.append(('Vary', 'Accept-Encoding'))
+            return start_response(status, headerlist, exc_info)
+        return app(environ, vary_start_response)
+
+class StaticURLParser(_StaticURLParser):
+    """ Serves the static files in a directory on disk, serving their
+    precompressed variants when possible (see
+    :class:`PrecompressedFileApp`)."""
+    def make_app(self, filename):
+        return PrecompressedFileApp(filename)
+
 class PackageURLParser(StaticURLParser):
     """ This probably won't work with zipimported resources """
     def __init__(self, package_name, resource_name, root_resource=None,
@@ -222,4 +294,6 @@ class static_view(object):
         self.app = app
 
     def __call__(self, context, request):
-        return call_app_with_subpath_as_path_info(request, self.app)
+        # static assets never need the request body, so don't copy it
+        return call_app_with_subpath_as_path_info(request, self.app,
+                                                  stream=True)
@@ -0,0 +1,6 @@
+<%def name="nav()">\
+% for item in items:
+<li>${item}</li>
+% endfor
+</%def>\
+<ul>${fragment_cache('nav', lambda: capture(nav), 60) | n}</ul>
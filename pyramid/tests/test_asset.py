@@ -22,6 +22,26 @@ class TestOverrideProvider(unittest.TestCase):
         reg = get_current_registry()
         reg.registerUtility(overrides, IPackageOverrides, name=name)
 
+    def test__get_overrides_loader_of_current_registry(self):
+        from pyramid.threadlocal import get_current_registry
+        import pyramid.tests
+        provider = self._makeOne(pyramid.tests)
+        overrides = DummyOverrides(None)
+        overrides.registry = get_current_registry()
+        provider.loader = overrides
+        self._registerOverrides(DummyOverrides(None))
+        self.assertTrue(provider._get_overrides() is overrides)
+
+    def test__get_overrides_loader_of_other_registry(self):
+        import pyramid.tests
+        provider = self._makeOne(pyramid.tests)
+        loader = DummyOverrides(None)
+        loader.registry = object()
+        provider.loader = loader
+        overrides = DummyOverrides(None)
+        self._registerOverrides(overrides)
+        self.assertTrue(provider._get_overrides() is overrides)
+
     def test_get_resource_filename_no_overrides(self):
         import os
         resource_name = 'test_asset.py'
@@ -227,6 +247,14 @@ class TestPackageOverrides(unittest.TestCase):
         po = self._makeOne(package)
         self.assertEqual(po.overrides, [])
         self.assertEqual(po.overridden_package_name, 'package')
+        self.assertEqual(po.registry, None)
+        self.assertEqual(po.resolved, {})
+
+    def test_ctor_with_registry(self):
+        package = DummyPackage('package')
+        registry = object()
+        po = self._getTargetClass()(package, DummyPkgResources(), registry)
+        self.assertEqual(po.registry, registry)
 
     def test_insert_directory(self):
         from pyramid.resource import DirectoryOverride
@@ -248,6 +276,13 @@ class TestPackageOverrides(unittest.TestCase):
         override = po.overrides[0]
         self.assertEqual(override.__class__, FileOverride)
 
+    def test_insert_clears_resolved(self):
+        package = DummyPackage('package')
+        po = self._makeOne(package)
+        po.resolved['foo.pt'] = None
+        po.insert('foo.pt', 'package', 'bar.pt')
+        self.assertEqual(po.resolved, {})
+
     def test_insert_emptystring(self):
         # XXX is this a valid case for a directory?
         from pyramid.resource import DirectoryOverride
@@ -267,6 +302,54 @@ class TestPackageOverrides(unittest.TestCase):
         self.assertEqual(list(po.search_path('whatever')),
                          [('package', 'name')])
 
+    def test_resolve(self):
+        overrides = [ DummyOverride(('pyramid.tests', 'wont_exist')),
+                      DummyOverride(('pyramid.tests', 'test_asset.py'))]
+        package = DummyPackage('package')
+        po = self._makeOne(package)
+        po.overrides = overrides
+        self.assertEqual(po.resolve('whatever'),
+                         ('pyramid.tests', 'test_asset.py'))
+        self.assertEqual(po.resolved,
+                         {'whatever':('pyramid.tests', 'test_asset.py')})
+
+    def test_resolve_remembers_result(self):
+        override = DummyOverride(('pyramid.tests', 'test_asset.py'))
+        package = DummyPackage('package')
+        po = self._makeOne(package)
+        po.overrides = [override]
+        po.resolve('whatever')
+        override.result = ('pyramid.tests', 'wont_exist')
+        self.assertEqual(po.resolve('whatever'),
+                         ('pyramid.tests', 'test_asset.py'))
+
+    def test_resolve_not_overridden(self):
+        overrides = [ DummyOverride(None), DummyOverride(
+            ('pyramid.tests', 'wont_exist'))]
+        package = DummyPackage('package')
+        po = self._makeOne(package)
+        po.overrides = overrides
+        self.assertEqual(po.resolve('whatever'), None)
+        self.assertEqual(po.resolved, {'whatever':None})
+
+    def test_resolve_reload_assets(self):
+        package = DummyPackage('package')
+        po = self._makeOne(package)
+        po.registry = DummyRegistry({'reload_assets':True})
+        po.overrides = [DummyOverride(('pyramid.tests', 'test_asset.py'))]
+        self.assertEqual(po.resolve('whatever'),
+                         ('pyramid.tests', 'test_asset.py'))
+        self.assertEqual(po.resolved, {})
+
+    def test_resolve_resolved_max(self):
+        package = DummyPackage('package')
+        po = self._makeOne(package)
+        po.resolved_max = 2
+        po.resolve('a')
+        po.resolve('b')
+        po.resolve('c')
+        self.assertEqual(po.resolved, {'c':None})
+
     def test_get_filename(self):
         import os
         overrides = [ DummyOverride(None), DummyOverride(
@@ -524,6 +607,10 @@ class DummyOverrides:
 
     listdir = isdir = has_resource = get_stream = get_string = get_filename
     
+class DummyRegistry:
+    def __init__(self, settings):
+        self.settings = settings
+
 class DummyPkgResources:
     def __init__(self):
         self.registered = []
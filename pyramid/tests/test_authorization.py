@@ -190,7 +190,95 @@ class TestACLAuthorizationPolicy(unittest.TestCase):
         result = sorted(
             policy.principals_allowed_by_permission(context, 'read'))
         self.assertEqual(result, [])
-        
+
+    def _makeTree(self):
+        from pyramid.security import Allow
+        from pyramid.security import Deny
+        from pyramid.security import DENY_ALL
+        from pyramid.security import ALL_PERMISSIONS
+        root = DummyContext(__name__='', __parent__=None)
+        community = DummyContext(__name__='community', __parent__=root)
+        blog = DummyContext(__name__='blog', __parent__=community)
+        entry = DummyContext(__name__='entry', __parent__=blog)
+        other = DummyContext(__name__='other', __parent__=community)
+        root.__acl__ = [ (Allow, 'chrism', ('read', 'write')),
+                         (Allow, 'other', ('read',)),
+                         (Allow, 'jim', ALL_PERMISSIONS)]
+        community.__acl__ = [  (Deny, 'flooz', 'read'),
+                               (Allow, 'flooz', 'read'),
+                               (Allow, 'mork', 'read'),
+                               (Deny, 'jim', 'read'),
+                               (Allow, 'someguy', 'manage')]
+        blog.__acl__ = [ (Allow, 'fred', 'read'),
+                         DENY_ALL]
+        other.__acl__ = [ (Allow, 'bob', 'read'),
+                          (Deny, 'chrism', 'read')]
+        return [root, community, blog, entry, other]
+
+    def test_bulk_principals_allowed_by_permission(self):
+        contexts = self._makeTree()
+        policy = self._makeOne()
+        result = policy.bulk_principals_allowed_by_permission(
+            [contexts[3], contexts[4], contexts[1], contexts[0]], 'read')
+        self.assertEqual([ sorted(x) for x in result ],
+                         [['fred'],
+                          ['bob', 'mork', 'other'],
+                          ['chrism', 'mork', 'other'],
+                          ['chrism', 'jim', 'other']])
+
+    def test_bulk_principals_allowed_by_permission_same_as_single(self):
+        contexts = self._makeTree()
+        policy = self._makeOne()
+        for permission in ('read', 'write', 'manage'):
+            result = policy.bulk_principals_allowed_by_permission(
+                contexts, permission)
+            expected = [ policy.principals_allowed_by_permission(
+                context, permission) for context in contexts ]
+            self.assertEqual(result, expected)
+
+    def test_bulk_principals_allowed_by_permission_acl_applied_once(self):
+        from pyramid.security import Allow
+        class CountingACL(list):
+            iterated = 0
+            def __iter__(self):
+                self.iterated += 1
+                return list.__iter__(self)
+        root = DummyContext(__name__='', __parent__=None)
+        root.__acl__ = CountingACL([(Allow, 'fred', 'read')])
+        children = [ DummyContext(__name__=str(i), __parent__=root)
+                     for i in range(3) ]
+        policy = self._makeOne()
+        result = policy.bulk_principals_allowed_by_permission(children, 'read')
+        self.assertEqual(result, [set(['fred'])] * 3)
+        self.assertEqual(root.__acl__.iterated, 1)
+
+    def test_bulk_principals_allowed_by_permission_results_not_shared(self):
+        contexts = self._makeTree()
+        policy = self._makeOne()
+        result = policy.bulk_principals_allowed_by_permission(
+            [contexts[0], contexts[0]], 'read')
+        result[0].add('extra')
+        self.assertEqual(sorted(result[1]), ['chrism', 'jim', 'other'])
+
+    def test_bulk_principals_allowed_by_permission_lazy_contexts(self):
+        # contexts (and their parents) which are freed while the call runs
+        # must not be mistaken for the earlier contexts whose ids they reuse
+        from pyramid.security import Allow
+        def contexts():
+            for i in range(200):
+                parent = DummyContext(__name__='p%d' % i, __parent__=None)
+                parent.__acl__ = [(Allow, 'user%d' % i, 'read')]
+                yield DummyContext(__name__='item%d' % i, __parent__=parent)
+        policy = self._makeOne()
+        result = policy.bulk_principals_allowed_by_permission(contexts(),
+                                                              'read')
+        self.assertEqual(result,
+                         [ set(['user%d' % i]) for i in range(200) ])
+
+    def test_bulk_principals_allowed_by_permission_no_contexts(self):
+        policy = self._makeOne()
+        self.assertEqual(
+            policy.bulk_principals_allowed_by_permission([], 'read'), [])
 
 class DummyContext:
     def __init__(self, *arg, **kw):
@@ -0,0 +1,141 @@
+import unittest
+
+class Test_views(unittest.TestCase):
+    def setUp(self):
+        from pyramid.testing import cleanUp
+        cleanUp()
+
+    def tearDown(self):
+        from pyramid.testing import cleanUp
+        cleanUp()
+
+    def test_derive(self):
+        from pyramid.benchmarks.views import derive
+        from pyramid.benchmarks.views import data_view
+        from pyramid.benchmarks.views import Context
+        view, request = derive(data_view, renderer='string',
+                               permission='view')
+        self.assertEqual(view.func_code.co_name, '_secured_view')
+        self.assertEqual(view(Context(), request).body, 'OK')
+
+    def test_main(self):
+        from StringIO import StringIO
+        from pyramid.benchmarks.views import main
+        out = StringIO()
+        main(['views', '2'], out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0].split(), ['view', 'time'])
+        self.assertEqual([ line.split()[0] for line in lines[1:] ],
+                         ['plain', 'secured', 'rendered', 'combined'])
+
+class Test_run(unittest.TestCase):
+    def setUp(self):
+        from pyramid.testing import cleanUp
+        cleanUp()
+
+    def tearDown(self):
+        from pyramid.testing import cleanUp
+        cleanUp()
+
+    def test_run(self):
+        from pyramid.benchmarks.run import run
+        names = ['hello', 'routes_10', 'traversal', 'secured', 'json',
+                 'chameleon', 'mako', 'session', 'static']
+        results = run(1, names, {'mako.cache_modules':'false'})
+        self.assertEqual([ name for name, result in results ], names)
+        for name, result in results:
+            self.assertEqual(result['requests'], 1)
+            self.assertTrue(result['calls_per_request'] > 0)
+
+    def test_make_caller_not_ok(self):
+        from pyramid.benchmarks.run import make_caller
+        from pyramid.benchmarks.run import make_environ
+        def app(environ, start_response):
+            start_response('404 Not Found', [])
+            return []
+        call = make_caller(app, make_environ('/missing'))
+        self.assertRaises(RuntimeError, call)
+
+    def test_count_calls(self):
+        from pyramid.benchmarks.run import count_calls
+        def one():
+            pass
+        def call():
+            one()
+            one()
+        self.assertEqual(count_calls(call), 2)
+
+    def test_main_text(self):
+        from StringIO import StringIO
+        from pyramid.benchmarks.run import main
+        out = StringIO()
+        main(['run', '-n', '2', 'hello'], out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0].split(),
+                         ['scenario', 'req/s', 'usec/req', 'calls',
+                          'retained'])
+        self.assertEqual([ line.split()[0] for line in lines[1:] ],
+                         ['hello'])
+
+    def test_main_json(self):
+        from StringIO import StringIO
+        from pyramid.compat import json
+        from pyramid.benchmarks.run import main
+        out = StringIO()
+        main(['run', '-n', '2', '-o', '-', 'hello', 'json'], out)
+        data = json.loads(out.getvalue())
+        self.assertEqual(data['iterations'], 2)
+        self.assertEqual(data['settings'], {})
+        self.assertEqual(sorted(data['scenarios'].keys()), ['hello', 'json'])
+        self.assertEqual(data['scenarios']['hello']['requests'], 2)
+
+    def test_main_settings(self):
+        from StringIO import StringIO
+        from pyramid.compat import json
+        from pyramid.benchmarks.run import main
+        out = StringIO()
+        main(['run', '-n', '1', '-o', '-', '-s', 'lean_router=true',
+              '-s', 'warm_templates=true', 'hello'], out)
+        data = json.loads(out.getvalue())
+        self.assertEqual(data['settings'],
+                         {'lean_router':'true', 'warm_templates':'true'})
+
+    def test_main_bad_setting(self):
+        import sys
+        from StringIO import StringIO
+        from pyramid.benchmarks.run import main
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            self.assertRaises(SystemExit, main, ['run', '-s', 'lean', 'hello'])
+        finally:
+            sys.stderr = stderr
+
+    def test_main_json_file(self):
+        import os
+        import tempfile
+        from pyramid.compat import json
+        from pyramid.benchmarks.run import main
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            main(['run', '-n', '1', '-o', filename, 'hello'])
+            f = open(filename)
+            try:
+                data = json.load(f)
+            finally:
+                f.close()
+        finally:
+            os.remove(filename)
+        self.assertEqual(data['scenarios'].keys(), ['hello'])
+
+    def test_main_unknown_scenario(self):
+        import sys
+        from StringIO import StringIO
+        from pyramid.benchmarks.run import main
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            self.assertRaises(SystemExit, main, ['run', 'nonesuch'])
+        finally:
+            sys.stderr = stderr
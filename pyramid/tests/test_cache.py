@@ -0,0 +1,500 @@
+import unittest
+
+class TestMemoryCacheBackend(unittest.TestCase):
+    def _makeOne(self, **kw):
+        from pyramid.cache import MemoryCacheBackend
+        backend = MemoryCacheBackend(**kw)
+        backend.now = 1000.0
+        backend.timer = lambda: backend.now
+        return backend
+
+    def test_verifyObject(self):
+        from zope.interface.verify import verifyObject
+        from pyramid.interfaces import ICacheBackend
+        verifyObject(ICacheBackend, self._makeOne())
+
+    def test_get_missing(self):
+        backend = self._makeOne()
+        self.assertEqual(backend.get('a'), None)
+
+    def test_set_and_get(self):
+        backend = self._makeOne()
+        backend.set('a', 1)
+        self.assertEqual(backend.get('a'), 1)
+
+    def test_expires(self):
+        backend = self._makeOne()
+        backend.set('a', 1, 10)
+        backend.now = 1009.0
+        self.assertEqual(backend.get('a'), 1)
+        backend.now = 1010.0
+        self.assertEqual(backend.get('a'), None)
+
+    def test_evicts_beyond_max_entries(self):
+        backend = self._makeOne(max_entries=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.set('c', 3)
+        self.assertEqual(backend.get('c'), 3)
+        found = [ key for key in ('a', 'b') if backend.get(key) is not None ]
+        self.assertEqual(len(found), 1)
+
+    def test_delete(self):
+        backend = self._makeOne()
+        backend.set('a', 1)
+        backend.delete('a')
+        backend.delete('b')
+        self.assertEqual(backend.get('a'), None)
+
+class TestFileCacheBackend(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def _makeOne(self, directory=None):
+        from pyramid.cache import FileCacheBackend
+        backend = FileCacheBackend(directory or self.tempdir)
+        backend.now = 1000.0
+        backend.timer = lambda: backend.now
+        return backend
+
+    def test_verifyObject(self):
+        from zope.interface.verify import verifyObject
+        from pyramid.interfaces import ICacheBackend
+        verifyObject(ICacheBackend, self._makeOne())
+
+    def test_creates_directory(self):
+        import os
+        directory = os.path.join(self.tempdir, 'a', 'b')
+        self._makeOne(directory)
+        self.assertTrue(os.path.isdir(directory))
+
+    def test_set_and_get_across_instances(self):
+        import os
+        self._makeOne().set('a', ('200 OK', [], 'body'))
+        backend = self._makeOne()
+        self.assertEqual(backend.get('a'), ('200 OK', [], 'body'))
+        self.assertEqual(os.listdir(self.tempdir),
+                         [os.path.basename(backend.filename('a'))])
+
+    def test_get_missing(self):
+        self.assertEqual(self._makeOne().get('a'), None)
+
+    def test_get_corrupt(self):
+        backend = self._makeOne()
+        f = open(backend.filename('a'), 'wb')
+        f.write('garbage')
+        f.close()
+        self.assertEqual(backend.get('a'), None)
+
+    def test_get_other_key_same_file(self):
+        import shutil
+        backend = self._makeOne()
+        backend.set('a', 1)
+        shutil.move(backend.filename('a'), backend.filename('b'))
+        self.assertEqual(backend.get('b'), None)
+
+    def test_expires_and_removes_file(self):
+        import os
+        backend = self._makeOne()
+        backend.set('a', 1, 10)
+        backend.now = 1010.0
+        self.assertEqual(backend.get('a'), None)
+        self.assertFalse(os.path.exists(backend.filename('a')))
+
+    def test_delete(self):
+        backend = self._makeOne()
+        backend.set('a', 1)
+        backend.delete('a')
+        backend.delete('a')
+        self.assertEqual(backend.get('a'), None)
+
+class TestMemcachedCacheBackend(unittest.TestCase):
+    def setUp(self):
+        self.server = DummyMemcachedServer()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _makeOne(self, **kw):
+        from pyramid.cache import MemcachedCacheBackend
+        host, port = self.server.address
+        return MemcachedCacheBackend(host, port, **kw)
+
+    def test_verifyObject(self):
+        from zope.interface.verify import verifyObject
+        from pyramid.interfaces import ICacheBackend
+        verifyObject(ICacheBackend, self._makeOne())
+
+    def test_set_and_get(self):
+        backend = self._makeOne()
+        backend.set('a', ('200 OK', [('X', 'y')], 'body\r\nEND\r\n'), 60)
+        self.assertEqual(backend.get('a'),
+                         ('200 OK', [('X', 'y')], 'body\r\nEND\r\n'))
+        self.assertEqual(self.server.data.keys(), [backend.server_key('a')])
+        self.assertEqual(self.server.timeouts.values(), ['60'])
+
+    def test_server_key(self):
+        backend = self._makeOne(prefix='app:')
+        key = backend.server_key('a key with spaces ' * 50)
+        self.assertTrue(key.startswith('app:'))
+        self.assertEqual(len(key), 36)
+
+    def test_get_missing(self):
+        backend = self._makeOne()
+        self.assertEqual(backend.get('a'), None)
+
+    def test_delete(self):
+        backend = self._makeOne()
+        backend.set('a', 1)
+        backend.delete('a')
+        self.assertEqual(backend.get('a'), None)
+
+    def test_server_unavailable(self):
+        from pyramid.cache import MemcachedCacheBackend
+        import socket
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        backend = MemcachedCacheBackend('127.0.0.1', port)
+        backend.set('a', 1)
+        self.assertEqual(backend.get('a'), None)
+        backend.delete('a')
+
+    def test_reconnects_after_error(self):
+        backend = self._makeOne()
+        backend.set('a', 1)
+        self.server.stop()
+        self.assertEqual(backend.get('a'), None)
+        self.assertEqual(backend.local.connection, None)
+        self.server = DummyMemcachedServer()
+        backend.address = self.server.address
+        backend.set('a', 2)
+        self.assertEqual(backend.get('a'), 2)
+
+    def test_get_protocol_error(self):
+        backend = self._makeOne()
+        self.server.reply = 'SERVER_ERROR out of memory\r\n'
+        self.assertEqual(backend.get('a'), None)
+        self.assertEqual(backend.local.connection, None)
+
+class Test_get_or_create(unittest.TestCase):
+    def _callFUT(self, backend, key, creator, timeout=None):
+        from pyramid.cache import get_or_create
+        return get_or_create(backend, key, creator, timeout)
+
+    def _makeBackend(self):
+        from pyramid.cache import MemoryCacheBackend
+        return MemoryCacheBackend()
+
+    def test_miss_creates_and_stores(self):
+        backend = self._makeBackend()
+        self.assertEqual(self._callFUT(backend, 'a', lambda: 1, 10), 1)
+        self.assertEqual(backend.get('a'), 1)
+
+    def test_hit_does_not_create(self):
+        backend = self._makeBackend()
+        backend.set('a', 1)
+        def creator():
+            raise AssertionError('not called')
+        self.assertEqual(self._callFUT(backend, 'a', creator), 1)
+
+    def test_none_is_not_stored(self):
+        backend = self._makeBackend()
+        self.assertEqual(self._callFUT(backend, 'a', lambda: None), None)
+        self.assertEqual(backend.get('a'), None)
+
+    def test_creator_error_releases_lock(self):
+        from pyramid.cache import _key_locks
+        backend = self._makeBackend()
+        def creator():
+            raise ValueError
+        self.assertRaises(ValueError, self._callFUT, backend, 'a', creator)
+        self.assertEqual(_key_locks.locks, {})
+
+    def test_only_one_thread_creates(self):
+        import threading
+        import time
+        backend = self._makeBackend()
+        calls = []
+        def creator():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'value'
+        results = []
+        def run():
+            results.append(self._callFUT(backend, 'a', creator))
+        threads = [ threading.Thread(target=run) for i in range(5) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ['value'] * 5)
+
+class Test_get_cache_backend(unittest.TestCase):
+    def _callFUT(self, registry):
+        from pyramid.cache import get_cache_backend
+        return get_cache_backend(registry)
+
+    def test_registered(self):
+        from pyramid.registry import Registry
+        from pyramid.interfaces import ICacheBackend
+        registry = Registry()
+        backend = object()
+        registry.registerUtility(backend, ICacheBackend)
+        self.assertTrue(self._callFUT(registry) is backend)
+
+    def test_default(self):
+        from pyramid.registry import Registry
+        from pyramid.cache import MemoryCacheBackend
+        registry = Registry()
+        backend = self._callFUT(registry)
+        self.assertTrue(isinstance(backend, MemoryCacheBackend))
+        self.assertTrue(self._callFUT(registry) is backend)
+
+class Test_parse_cache_option(unittest.TestCase):
+    def _callFUT(self, cache):
+        from pyramid.cache import parse_cache_option
+        return parse_cache_option(cache)
+
+    def test_seconds(self):
+        from pyramid.cache import vary_functions
+        self.assertEqual(self._callFUT(60),
+                         (60, (vary_functions['path'],
+                               vary_functions['params'],
+                               vary_functions['principals'])))
+
+    def test_seconds_and_vary(self):
+        from pyramid.cache import vary_functions
+        def custom(context, request): pass
+        self.assertEqual(self._callFUT(('60', ['principals', custom])),
+                         (60, (vary_functions['principals'], custom)))
+
+    def test_bad_tuple(self):
+        from pyramid.exceptions import ConfigurationError
+        self.assertRaises(ConfigurationError, self._callFUT, (1, 2, 3))
+
+    def test_bad_timeout(self):
+        from pyramid.exceptions import ConfigurationError
+        self.assertRaises(ConfigurationError, self._callFUT, 'abc')
+        self.assertRaises(ConfigurationError, self._callFUT, 0)
+
+    def test_unknown_vary(self):
+        from pyramid.exceptions import ConfigurationError
+        self.assertRaises(ConfigurationError, self._callFUT, (1, ['cookies']))
+
+class TestVaryFunctions(unittest.TestCase):
+    def setUp(self):
+        from pyramid.testing import setUp
+        self.config = setUp()
+
+    def tearDown(self):
+        from pyramid.testing import tearDown
+        tearDown()
+
+    def _getFunction(self, name):
+        from pyramid.cache import vary_functions
+        return vary_functions[name]
+
+    def _makeRequest(self, path='/', **kw):
+        from pyramid.request import Request
+        request = Request.blank(path, **kw)
+        request.registry = self.config.registry
+        return request
+
+    def test_path(self):
+        request = self._makeRequest('/a/b?x=1')
+        self.assertEqual(self._getFunction('path')(None, request), '/a/b')
+
+    def test_matchdict(self):
+        request = self._makeRequest()
+        self.assertEqual(self._getFunction('matchdict')(None, request), [])
+        request.matchdict = {'b':'2', 'a':'1'}
+        self.assertEqual(self._getFunction('matchdict')(None, request),
+                         [('a', '1'), ('b', '2')])
+
+    def test_params(self):
+        request = self._makeRequest('/?b=2&a=1')
+        self.assertEqual(self._getFunction('params')(None, request),
+                         [('a', '1'), ('b', '2')])
+
+    def test_principals(self):
+        self.config.testing_securitypolicy(userid='fred', groupids=['g'])
+        request = self._makeRequest()
+        self.assertEqual(self._getFunction('principals')(None, request),
+                         ['fred', 'g', 'system.Authenticated',
+                          'system.Everyone'])
+
+    def test_locale(self):
+        request = self._makeRequest()
+        request._LOCALE_ = 'de'
+        self.assertEqual(self._getFunction('locale')(None, request), 'de')
+
+class TestFragmentCache(unittest.TestCase):
+    def setUp(self):
+        from pyramid.testing import setUp
+        self.config = setUp()
+
+    def tearDown(self):
+        from pyramid.testing import tearDown
+        tearDown()
+
+    def _makeOne(self, request=None, package=None):
+        from pyramid.cache import FragmentCache
+        return FragmentCache(self.config.registry, request, package)
+
+    def test_uses_registered_backend(self):
+        from pyramid.cache import MemoryCacheBackend
+        from pyramid.interfaces import ICacheBackend
+        backend = MemoryCacheBackend()
+        self.config.registry.registerUtility(backend, ICacheBackend)
+        self.assertTrue(self._makeOne().backend is backend)
+
+    def test_call_caches(self):
+        cache = self._makeOne()
+        calls = []
+        def creator():
+            calls.append(1)
+            return u'<ul/>'
+        self.assertEqual(cache('nav', creator), u'<ul/>')
+        self.assertEqual(self._makeOne()('nav', creator), u'<ul/>')
+        self.assertEqual(len(calls), 1)
+
+    def test_call_keys_are_distinct(self):
+        cache = self._makeOne()
+        cache(('nav', 'a'), lambda: 'a')
+        self.assertEqual(cache(('nav', 'b'), lambda: 'b'), 'b')
+
+    def test_call_timeout(self):
+        from pyramid.cache import MemoryCacheBackend
+        from pyramid.interfaces import ICacheBackend
+        backend = MemoryCacheBackend()
+        backend.now = 1000.0
+        backend.timer = lambda: backend.now
+        self.config.registry.registerUtility(backend, ICacheBackend)
+        cache = self._makeOne()
+        cache('a', lambda: 'a', 10)
+        cache('b', lambda: 'b')
+        backend.now = 1010.0
+        self.assertEqual(cache('a', lambda: 'new'), 'new')
+        self.assertEqual(cache('b', lambda: 'new'), 'b')
+        backend.now = 1000.0 + cache.default_timeout
+        self.assertEqual(cache('b', lambda: 'new'), 'new')
+
+    def test_invalidate(self):
+        cache = self._makeOne()
+        cache('nav', lambda: 'old')
+        cache.invalidate('nav')
+        self.assertEqual(cache('nav', lambda: 'new'), 'new')
+
+    def test_render(self):
+        import pyramid.tests
+        renderer = self.config.testing_add_renderer('templates/nav.pt')
+        request = object()
+        cache = self._makeOne(request, pyramid.tests)
+        self.assertEqual(cache.render('nav', 'templates/nav.pt', {'a':1}), '')
+        self.assertEqual(cache.render('nav', 'templates/nav.pt', {'a':2}), '')
+        renderer.assert_(a=1)
+        renderer.assert_(request=request)
+        self.assertRaises(AssertionError, renderer.assert_, a=2)
+
+class TestFragmentCacheIntegration(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        from pyramid.testing import setUp
+        from pyramid.chameleon_zpt import renderer_factory as zpt_factory
+        from pyramid.mako_templating import renderer_factory as mako_factory
+        self.config = setUp()
+        self.module_directory = tempfile.mkdtemp()
+        self.config.add_settings({'mako.directories':'pyramid.tests:fixtures',
+                                  'mako.module_directory':
+                                  self.module_directory})
+        self.config.add_renderer('.pt', zpt_factory)
+        self.config.add_renderer('.mak', mako_factory)
+
+    def tearDown(self):
+        import shutil
+        from pyramid.testing import tearDown
+        tearDown()
+        shutil.rmtree(self.module_directory)
+
+    def _render(self, name, items):
+        import pyramid.tests
+        from pyramid.renderers import render
+        result = render(name, {'items':items}, package=pyramid.tests)
+        return ''.join(result.split())
+
+    def test_chameleon(self):
+        self.assertEqual(self._render('fixtures/fragment.pt', ['a', 'b']),
+                         '<div><ul><li>a</li><li>b</li></ul></div>')
+        self.assertEqual(self._render('fixtures/fragment.pt', ['c']),
+                         '<div><ul><li>a</li><li>b</li></ul></div>')
+
+    def test_mako(self):
+        self.assertEqual(self._render('fragment.mak', ['a', 'b']),
+                         '<ul><li>a</li><li>b</li></ul>')
+        self.assertEqual(self._render('fragment.mak', ['c']),
+                         '<ul><li>a</li><li>b</li></ul>')
+
+class DummyMemcachedServer(object):
+    # a memcached text protocol server supporting get, set and delete
+    def __init__(self):
+        import SocketServer
+        import threading
+        self.data = {}
+        self.timeouts = {}
+        self.reply = None
+        self.connections = []
+        server = self
+        class Handler(SocketServer.StreamRequestHandler):
+            def handle(self):
+                server.connections.append(self.connection)
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    parts = line.split()
+                    if server.reply is not None:
+                        self.wfile.write(server.reply)
+                    elif parts[0] == 'get':
+                        value = server.data.get(parts[1])
+                        if value is not None:
+                            self.wfile.write('VALUE %s 0 %d\r\n%s\r\n' % (
+                                parts[1], len(value), value))
+                        self.wfile.write('END\r\n')
+                    elif parts[0] == 'set':
+                        value = self.rfile.read(int(parts[4]) + 2)[:-2]
+                        server.data[parts[1]] = value
+                        server.timeouts[parts[1]] = parts[3]
+                        self.wfile.write('STORED\r\n')
+                    elif parts[0] == 'delete':
+                        server.data.pop(parts[1], None)
+                        self.wfile.write('DELETED\r\n')
+                    self.wfile.flush()
+        class Server(SocketServer.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.address = self.server.server_address
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       kwargs={'poll_interval':0.01})
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+    def stop(self):
+        import socket
+        if self.server is not None:
+            for connection in self.connections:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except socket.error:
+                    pass
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
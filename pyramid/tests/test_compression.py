@@ -0,0 +1,280 @@
+import unittest
+
+class Test_compressible(unittest.TestCase):
+    def _callFUT(self, content_type):
+        from pyramid.compression import compressible
+        return compressible(content_type)
+
+    def test_none(self):
+        self.assertEqual(self._callFUT(None), False)
+
+    def test_text(self):
+        self.assertEqual(self._callFUT('text/html; charset=UTF-8'), True)
+
+    def test_json(self):
+        self.assertEqual(self._callFUT('application/json'), True)
+
+    def test_xml_suffix(self):
+        self.assertEqual(self._callFUT('application/atom+xml'), True)
+
+    def test_image(self):
+        self.assertEqual(self._callFUT('image/png'), False)
+
+    def test_archive(self):
+        self.assertEqual(self._callFUT('application/zip'), False)
+
+class Test_negotiate_encoding(unittest.TestCase):
+    def _callFUT(self, accept_encoding, *arg):
+        from pyramid.compression import negotiate_encoding
+        return negotiate_encoding(accept_encoding, *arg)
+
+    def test_empty(self):
+        self.assertEqual(self._callFUT(None), None)
+        self.assertEqual(self._callFUT(''), None)
+
+    def test_gzip(self):
+        self.assertEqual(self._callFUT('gzip'), 'gzip')
+
+    def test_x_gzip(self):
+        self.assertEqual(self._callFUT('x-gzip'), 'gzip')
+
+    def test_equal_quality_prefers_first(self):
+        self.assertEqual(self._callFUT('deflate, gzip'), 'gzip')
+
+    def test_quality(self):
+        self.assertEqual(self._callFUT('gzip;q=0.5, deflate'), 'deflate')
+
+    def test_refused(self):
+        self.assertEqual(self._callFUT('gzip;q=0, identity'), None)
+
+    def test_wildcard(self):
+        self.assertEqual(self._callFUT('*'), 'gzip')
+        self.assertEqual(self._callFUT('gzip;q=0, *'), 'deflate')
+
+    def test_bad_quality(self):
+        self.assertEqual(self._callFUT('gzip;q=bad'), None)
+
+    def test_encodings(self):
+        self.assertEqual(self._callFUT('deflate', ('gzip',)), None)
+
+class TestResponseCompressor(unittest.TestCase):
+    def _makeOne(self, level=6, min_size=0):
+        from pyramid.compression import ResponseCompressor
+        return ResponseCompressor(level=level, min_size=min_size)
+
+    def _makeRequest(self, accept_encoding='gzip'):
+        request = DummyRequest()
+        if accept_encoding is not None:
+            request.environ['HTTP_ACCEPT_ENCODING'] = accept_encoding
+        return request
+
+    def _makeResponse(self, body='Hello world ' * 50, **kw):
+        from pyramid.response import Response
+        if 'app_iter' in kw:
+            body = None
+        return Response(body, **kw)
+
+    def _gunzip(self, data):
+        import gzip
+        from StringIO import StringIO
+        return gzip.GzipFile(fileobj=StringIO(data)).read()
+
+    def test_gzip(self):
+        compressor = self._makeOne()
+        response = self._makeResponse()
+        result = compressor(self._makeRequest(), response)
+        self.assertEqual(result, response)
+        body = ''.join(response.app_iter)
+        self.assertEqual(self._gunzip(body), 'Hello world ' * 50)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Content-Length'], str(len(body)))
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+
+    def test_deflate(self):
+        import zlib
+        compressor = self._makeOne()
+        response = self._makeResponse()
+        compressor(self._makeRequest('deflate'), response)
+        body = ''.join(response.app_iter)
+        self.assertEqual(zlib.decompress(body), 'Hello world ' * 50)
+        self.assertEqual(response.headers['Content-Encoding'], 'deflate')
+
+    def test_not_accepted(self):
+        compressor = self._makeOne()
+        response = self._makeResponse()
+        compressor(self._makeRequest(None), response)
+        self.assertEqual(response.body, 'Hello world ' * 50)
+        self.assertFalse('Content-Encoding' in response.headers)
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+
+    def test_not_successful(self):
+        compressor = self._makeOne()
+        response = self._makeResponse(status='404 Not Found')
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.body, 'Hello world ' * 50)
+        self.assertFalse('Vary' in response.headers)
+
+    def test_partial_content(self):
+        compressor = self._makeOne()
+        response = self._makeResponse(status='206 Partial Content')
+        compressor(self._makeRequest(), response)
+        self.assertFalse('Content-Encoding' in response.headers)
+
+    def test_bad_status(self):
+        compressor = self._makeOne()
+        response = DummyResponse('OK')
+        self.assertEqual(compressor(self._makeRequest(), response), response)
+
+    def test_already_encoded(self):
+        compressor = self._makeOne()
+        response = self._makeResponse(content_encoding='gzip')
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.body, 'Hello world ' * 50)
+        self.assertFalse('Vary' in response.headers)
+
+    def test_not_compressible(self):
+        compressor = self._makeOne()
+        response = self._makeResponse(content_type='image/png')
+        compressor(self._makeRequest(), response)
+        self.assertFalse('Content-Encoding' in response.headers)
+
+    def test_no_transform(self):
+        compressor = self._makeOne()
+        response = self._makeResponse()
+        response.headers['Cache-Control'] = 'public, no-transform'
+        compressor(self._makeRequest(), response)
+        self.assertFalse('Content-Encoding' in response.headers)
+
+    def test_below_min_size(self):
+        compressor = self._makeOne(min_size=1000)
+        response = self._makeResponse('Hello world')
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.body, 'Hello world')
+        self.assertFalse('Vary' in response.headers)
+
+    def test_below_min_size_content_length(self):
+        compressor = self._makeOne(min_size=1000)
+        response = self._makeResponse(app_iter=iter(['Hello world']),
+                                      content_length=11)
+        compressor(self._makeRequest(), response)
+        self.assertFalse('Content-Encoding' in response.headers)
+
+    def test_streaming(self):
+        compressor = self._makeOne(min_size=1000)
+        app_iter = DummyAppIter(['Hello ', 'world'])
+        response = self._makeResponse(app_iter=app_iter)
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertFalse('Content-Length' in response.headers)
+        body = ''.join(response.app_iter)
+        self.assertEqual(self._gunzip(body), 'Hello world')
+        response.app_iter.close()
+        self.assertEqual(app_iter.closed, True)
+
+    def test_streaming_bad_content_length(self):
+        compressor = self._makeOne(min_size=1000)
+        response = self._makeResponse(app_iter=iter(['Hello world']))
+        response.headerlist.append(('Content-Length', 'bad'))
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertFalse('Content-Length' in response.headers)
+
+    def test_weakens_etag(self):
+        compressor = self._makeOne()
+        response = self._makeResponse()
+        response.headers['ETag'] = '"abc"'
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.headers['ETag'], 'W/"abc"')
+
+    def test_keeps_weak_etag(self):
+        compressor = self._makeOne()
+        response = self._makeResponse()
+        response.headers['ETag'] = 'W/"abc"'
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.headers['ETag'], 'W/"abc"')
+
+    def test_extends_vary(self):
+        compressor = self._makeOne()
+        response = self._makeResponse()
+        response.headers['Vary'] = 'Cookie'
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.headers['Vary'], 'Cookie, Accept-Encoding')
+
+    def test_vary_already_present(self):
+        compressor = self._makeOne()
+        response = self._makeResponse()
+        response.headers['Vary'] = 'accept-encoding'
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.headers['Vary'], 'accept-encoding')
+
+    def test_vary_wildcard(self):
+        compressor = self._makeOne()
+        response = self._makeResponse()
+        response.headers['Vary'] = '*'
+        compressor(self._makeRequest(), response)
+        self.assertEqual(response.headers['Vary'], '*')
+
+class TestCompressingIterable(unittest.TestCase):
+    def _makeOne(self, app_iter):
+        import zlib
+        from pyramid.compression import CompressingIterable
+        return CompressingIterable(app_iter, zlib.compressobj())
+
+    def test_iter(self):
+        import zlib
+        inst = self._makeOne(['Hello ', 'world'])
+        self.assertEqual(zlib.decompress(''.join(inst)), 'Hello world')
+
+    def test_close_without_close(self):
+        inst = self._makeOne(['Hello world'])
+        inst.close() # doesn't raise
+
+    def test_close(self):
+        app_iter = DummyAppIter(['Hello world'])
+        inst = self._makeOne(app_iter)
+        inst.close()
+        self.assertEqual(app_iter.closed, True)
+
+class Test_make_response_compressor(unittest.TestCase):
+    def _callFUT(self, settings):
+        from pyramid.compression import make_response_compressor
+        return make_response_compressor(settings)
+
+    def test_disabled(self):
+        self.assertEqual(self._callFUT({}), None)
+        self.assertEqual(self._callFUT({'compress_responses':False}), None)
+
+    def test_enabled(self):
+        from pyramid.compression import ResponseCompressor
+        result = self._callFUT({'compress_responses':True,
+                                'compress_level':9,
+                                'compress_min_size':100})
+        self.assertEqual(result.__class__, ResponseCompressor)
+        self.assertEqual(result.level, 9)
+        self.assertEqual(result.min_size, 100)
+
+    def test_enabled_defaults(self):
+        result = self._callFUT({'compress_responses':True})
+        self.assertEqual(result.level, 6)
+        self.assertEqual(result.min_size, 256)
+
+class DummyRequest:
+    def __init__(self):
+        self.environ = {}
+
+class DummyResponse:
+    headerlist = ()
+    app_iter = ()
+    def __init__(self, status):
+        self.status = status
+
+class DummyAppIter:
+    closed = False
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
@@ -272,6 +272,7 @@ class ConfiguratorTests(unittest.TestCase):
         config.add_view = lambda *arg, **kw: False
         config.setup_registry()
         self.assertEqual(reg.has_listeners, True)
+        self.assertEqual(reg.has_listeners_for(object), True)
         self.assertEqual(reg.notify(1), None)
         self.assertEqual(reg.events, (1,))
 
@@ -588,6 +589,7 @@ class ConfiguratorTests(unittest.TestCase):
 
     def test_make_wsgi_app(self):
         from pyramid.router import Router
+        from pyramid.interfaces import IRouter
         from pyramid.interfaces import IApplicationCreated
         manager = DummyThreadLocalManager()
         config = self._makeOne()
@@ -595,12 +597,113 @@ class ConfiguratorTests(unittest.TestCase):
         config.manager = manager
         app = config.make_wsgi_app()
         self.assertEqual(app.__class__, Router)
+        self.assertEqual(config.registry.queryUtility(IRouter), app)
         self.assertEqual(manager.pushed['registry'], config.registry)
         self.assertEqual(manager.pushed['request'], None)
         self.assertTrue(manager.popped)
         self.assertEqual(len(subscriber), 1)
         self.assertTrue(IApplicationCreated.providedBy(subscriber[0]))
 
+    def test_make_wsgi_app_profile_startup(self):
+        from pyramid.interfaces import IDebugLogger
+        logger = DummyLogger()
+        config = self._makeOne(settings={'profile_startup':'true'},
+                               debug_logger=logger)
+        config.manager = DummyThreadLocalManager()
+        config.add_view(lambda *arg: 'OK', name='foo')
+        config.make_wsgi_app()
+        self.assertEqual(len(logger.messages), 1)
+        report = logger.messages[0]
+        self.assertTrue(report.startswith('Startup profile'))
+        self.assertTrue('add_view' in report)
+        self.assertTrue('add_view (action)' in report)
+        self.assertTrue('commit' in report)
+        profiler = config.registry._startup_profiler
+        self.assertEqual(profiler.stats['add_view'][0], 2)
+
+    def test_startup_profiler_inactive_by_default(self):
+        config = self._makeOne()
+        self.failIf(hasattr(config.registry, '_startup_profiler'))
+
+    def test_warm_templates(self):
+        from pyramid.interfaces import ITemplateRenderer
+        config = self._makeOne(
+            autocommit=True,
+            settings={'mako.directories':'pyramid.tests:fixtures',
+                      'mako.cache_modules':'false',
+                      'warm_templates':'true'})
+        config.add_view(lambda *arg: {}, name='zpt',
+                        renderer='pyramid.tests:fixtures/minimal.pt')
+        config.add_view(lambda *arg: {}, name='zpt2',
+                        renderer='pyramid.tests:fixtures/minimal.pt')
+        config.add_view(lambda *arg: {}, name='mako',
+                        renderer='helloworld.mak')
+        config.add_view(lambda *arg: {}, name='json', renderer='json')
+        config.add_view(lambda *arg: {}, name='plain')
+        warmed = config.warm_templates()
+        self.assertEqual(warmed, ['pyramid.tests:fixtures/minimal.pt',
+                                  'helloworld.mak'])
+        renderer = config.registry.getUtility(
+            ITemplateRenderer, name='pyramid.tests:fixtures/minimal.pt')
+        template = renderer.implementation()
+        self.assertTrue((None, True, template.signature) in template.registry)
+
+    def test_warm_templates_missing_template(self):
+        config = self._makeOne(autocommit=True,
+                               settings={'warm_templates':'true'})
+        config.add_view(lambda *arg: {}, name='zpt',
+                        renderer='pyramid.tests:fixtures/nonexistent.pt')
+        self.assertRaises(ValueError, config.warm_templates)
+
+    def test_warm_templates_not_compiled(self):
+        from pyramid.interfaces import IDebugLogger
+        from pyramid.interfaces import IRendererFactory
+        logger = DummyLogger()
+        config = self._makeOne(autocommit=True,
+                               settings={'warm_templates':'true'})
+        config.registry.registerUtility(logger, IDebugLogger)
+        class Renderer(object):
+            def __init__(self, info):
+                pass
+            def implementation(self):
+                return object()
+        config.registry.registerUtility(Renderer, IRendererFactory,
+                                        name='.dummy')
+        config.add_view(lambda *arg: {}, renderer='foo.dummy')
+        self.assertEqual(config.warm_templates(), [])
+        self.assertEqual(len(logger.messages), 1)
+        self.assertTrue("'foo.dummy'" in logger.messages[0])
+
+    def test_warm_templates_setting_off_collects_nothing(self):
+        config = self._makeOne(autocommit=True)
+        config.add_view(lambda *arg: {}, name='zpt',
+                        renderer='pyramid.tests:fixtures/minimal.pt')
+        self.assertFalse(hasattr(config.registry, '_view_renderers'))
+        self.assertEqual(config.warm_templates(), [])
+
+    def test_warm_templates_nothing_registered(self):
+        config = self._makeOne(autocommit=True)
+        self.assertEqual(config.warm_templates(), [])
+
+    def test_make_wsgi_app_warm_templates(self):
+        config = self._makeOne(settings={'warm_templates':'true'})
+        config.manager = DummyThreadLocalManager()
+        config.add_view(lambda *arg: {}, name='zpt',
+                        renderer='pyramid.tests:fixtures/nonexistent.pt')
+        self.assertRaises(ValueError, config.make_wsgi_app)
+
+    def test_include_profile_startup(self):
+        config = self._makeOne(settings={'profile_startup':'true'})
+        config.include(dummy_include)
+        profiler = config.registry._startup_profiler
+        self.assertEqual(profiler.stats['include'][0], 1)
+
+    def test_make_context_defers_zcml_bootstrap(self):
+        config = self._makeOne()
+        context = config._make_context()
+        self.assertEqual(context._bootstrapped, False)
+        self.assertEqual(context.stack[0].context, context)
+
     def test_include_with_dotted_name(self):
         from pyramid import tests
         config = self._makeOne()
@@ -740,6 +843,62 @@ class ConfiguratorTests(unittest.TestCase):
         result = wrapper(None, None)
         self.assertEqual(result, 'OK')
 
+    def test_add_view_with_etag(self):
+        from pyramid.request import Request
+        def view(request):
+            return 'OK'
+        config = self._makeOne(autocommit=True)
+        config.add_view(view=view, renderer='string',
+                        etag=lambda context, request: 'abc')
+        wrapper = self._getViewCallable(config)
+        request = Request.blank('/', headers={'If-None-Match':'"abc"'})
+        request.registry = config.registry
+        response = wrapper(None, request)
+        self.assertEqual(response.status_int, 304)
+        request = Request.blank('/')
+        request.registry = config.registry
+        response = wrapper(None, request)
+        self.assertEqual(response.body, 'OK')
+        self.assertEqual(response.etag, 'abc')
+
+    def test_add_view_with_last_modified_dottedname(self):
+        from pyramid.request import Request
+        def view(request):
+            return 'OK'
+        config = self._makeOne(autocommit=True)
+        config.add_view(
+            view=view, renderer='string',
+            last_modified='pyramid.tests.test_config.dummy_last_modified')
+        wrapper = self._getViewCallable(config)
+        request = Request.blank(
+            '/', headers={'If-Modified-Since':'Sat, 01 Jan 2011 12:00:00 GMT'})
+        request.registry = config.registry
+        response = wrapper(None, request)
+        self.assertEqual(response.status_int, 304)
+        self.assertEqual(response.headers['Last-Modified'],
+                         'Thu, 01 Jan 1970 00:00:00 GMT')
+
+    def test_add_view_with_cache(self):
+        from pyramid.request import Request
+        calls = []
+        def view(request):
+            calls.append(1)
+            return 'OK'
+        config = self._makeOne(autocommit=True)
+        config.add_view(view=view, renderer='string', cache=60)
+        wrapper = self._getViewCallable(config)
+        for i in range(2):
+            request = Request.blank('/')
+            request.registry = config.registry
+            self.assertEqual(wrapper(None, request).body, 'OK')
+        self.assertEqual(len(calls), 1)
+
+    def test_add_view_with_invalid_cache(self):
+        from pyramid.exceptions import ConfigurationError
+        config = self._makeOne(autocommit=True)
+        self.assertRaises(ConfigurationError, config.add_view,
+                          view=lambda *arg: 'OK', cache=(60, ['nope']))
+
     def test_add_view_as_instance(self):
         class AView:
             def __call__(self, context, request):
@@ -1518,6 +1677,22 @@ class ConfiguratorTests(unittest.TestCase):
         self.assertEqual(info['route_name'], 'foo')
         self.assertEqual(info['custom_predicates'], ('123',))
 
+    def test_deferred_route_views_retains_decorator(self):
+        def view(request):
+            return 'OK'
+        def view_wrapper(fn):
+            def inner(context, request):
+                return 'decorated ' + fn(context, request)
+            return inner
+        config = self._makeOne(autocommit=True)
+        config.add_view(view=view, route_name='foo', decorator=view_wrapper)
+        infos = config.registry.deferred_route_views['foo']
+        self.assertEqual(infos[0]['decorator'], view_wrapper)
+        config.add_route('foo', '/a/b')
+        request_iface = self._getRouteRequestIface(config, 'foo')
+        wrapper = self._getViewCallable(config, request_iface=request_iface)
+        self.assertEqual(wrapper(None, None), 'decorated OK')
+
     def test_add_view_with_route_name_exception(self):
         from zope.interface import implementedBy
         from zope.component import ComponentLookupError
@@ -2106,6 +2281,7 @@ class ConfiguratorTests(unittest.TestCase):
                                                  name='package')
         self.assertEqual(overrides.inserted, [('path', 'opackage', 'oprefix')])
         self.assertEqual(overrides.package, package)
+        self.assertEqual(overrides.registry, config.registry)
 
     def test__override_already_registered(self):
         from pyramid.interfaces import IPackageOverrides
@@ -2360,6 +2536,36 @@ class ConfiguratorTests(unittest.TestCase):
         self.assertEqual(config.registry.getUtility(IDefaultPermission),
                          'view')
 
+    def test_set_instrumentation_sink(self):
+        from pyramid.interfaces import IInstrumentationSink
+        config = self._makeOne(autocommit=True)
+        sink = DummyInstrumentationSink()
+        config.set_instrumentation_sink(sink)
+        self.assertEqual(config.registry.getUtility(IInstrumentationSink),
+                         sink)
+
+    def test_set_instrumentation_sink_dottedname(self):
+        from pyramid.interfaces import IInstrumentationSink
+        config = self._makeOne(autocommit=True)
+        config.set_instrumentation_sink(
+            'pyramid.tests.test_config.dummyfactory')
+        self.assertEqual(config.registry.getUtility(IInstrumentationSink),
+                         dummyfactory)
+
+    def test_set_cache_backend(self):
+        from pyramid.interfaces import ICacheBackend
+        config = self._makeOne(autocommit=True)
+        backend = object()
+        config.set_cache_backend(backend)
+        self.assertEqual(config.registry.getUtility(ICacheBackend), backend)
+
+    def test_set_cache_backend_dottedname(self):
+        from pyramid.interfaces import ICacheBackend
+        config = self._makeOne(autocommit=True)
+        config.set_cache_backend('pyramid.tests.test_config.dummyfactory')
+        self.assertEqual(config.registry.getUtility(ICacheBackend),
+                         dummyfactory)
+
     def test_add_view_mapper(self):
         from pyramid.interfaces import IViewMapperFactory
         config = self._makeOne(autocommit=True)
@@ -2554,6 +2760,30 @@ class ConfiguratorTests(unittest.TestCase):
         self.assertEqual(config.registry.getUtility(IRendererFactory, 'name'),
                          pyramid.tests)
 
+    def test_scan_with_scan_cache(self):
+        import os
+        import shutil
+        import tempfile
+        from zope.interface import alsoProvides
+        from pyramid.interfaces import IRequest
+        from pyramid.view import render_view_to_response
+        import pyramid.tests.grokkedapp as package
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempdir, 'scan.json')
+            config = self._makeOne(autocommit=True,
+                                   settings={'scan_cache':path})
+            config.scan(package)
+            self.assertTrue(os.path.exists(path))
+            req = DummyRequest()
+            alsoProvides(req, IRequest)
+            req.registry = config.registry
+            req.method = 'GET'
+            result = render_view_to_response(None, req, 'another')
+            self.assertEqual(result, 'another_grokked')
+        finally:
+            shutil.rmtree(tempdir)
+
     def test_scan_integration(self):
         import os
         from zope.interface import alsoProvides
@@ -4022,6 +4252,473 @@ class TestViewDeriver(unittest.TestCase):
         result = deriver(view)
         self.assertNotEqual(result, view)
 
+    def _registerInstrumentationSink(self):
+        from pyramid.interfaces import IInstrumentationSink
+        sink = DummyInstrumentationSink()
+        self.config.registry.registerUtility(sink, IInstrumentationSink)
+        return sink
+
+    def test_instrumentation_secured_rendered_view(self):
+        class renderer(object):
+            def render_view(inself, req, resp, view_inst, ctx):
+                return resp + '!'
+        def view(context, request):
+            return 'OK'
+        self.config.registry.settings = {}
+        self._registerSecurityPolicy(True)
+        sink = self._registerInstrumentationSink()
+        deriver = self._makeOne(renderer=renderer(), permission='view')
+        result = deriver(view)
+        request = self._makeRequest()
+        request.view_name = 'edit'
+        self.assertEqual(result(None, request), 'OK!')
+        phases = [ (key, phase) for key, phase, elapsed in sink.records ]
+        self.assertEqual(phases, [('view:edit', 'security'),
+                                  ('view:edit', 'view_execution'),
+                                  ('view:edit', 'render')])
+
+    def test_instrumentation_records_on_error(self):
+        def view(context, request):
+            raise RuntimeError
+        sink = self._registerInstrumentationSink()
+        deriver = self._makeOne()
+        result = deriver(view)
+        request = self._makeRequest()
+        request.matched_route = DummyRoute('home')
+        self.assertRaises(RuntimeError, result, None, request)
+        self.assertEqual(len(sink.records), 1)
+        self.assertEqual(sink.records[0][:2], ('route:home', 'view_execution'))
+
+    def test_instrumentation_disabled(self):
+        def view(context, request):
+            return 'OK'
+        deriver = self._makeOne()
+        self.assertEqual(deriver.timed_view(view), view)
+
+    def _makeWebRequest(self, method='GET', **headers):
+        from pyramid.request import Request
+        request = Request.blank('/', headers=headers)
+        request.method = method
+        request.registry = self.config.registry
+        return request
+
+    def _makeCountingView(self, calls):
+        from pyramid.response import Response
+        class renderer(object):
+            def render_view(inself, req, resp, view_inst, ctx):
+                calls.append('render')
+                return Response(resp)
+        def view(context, request):
+            calls.append('view')
+            return 'OK'
+        return renderer(), view
+
+    def test_conditional_etag_matches(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        deriver = self._makeOne(renderer=renderer,
+                                etag=lambda context, request: 'abc')
+        result = deriver(view)
+        request = self._makeWebRequest(If_None_Match='"abc"')
+        response = result(None, request)
+        self.assertEqual(response.status_int, 304)
+        self.assertEqual(response.etag, 'abc')
+        self.assertEqual(response.body, '')
+        self.assertEqual(calls, [])
+
+    def test_conditional_etag_does_not_match(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        deriver = self._makeOne(renderer=renderer,
+                                etag=lambda context, request: 'abc')
+        result = deriver(view)
+        request = self._makeWebRequest(If_None_Match='"def"')
+        response = result(None, request)
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(response.etag, 'abc')
+        self.assertEqual(response.body, 'OK')
+        self.assertEqual(calls, ['view', 'render'])
+
+    def test_conditional_etag_not_for_post(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        deriver = self._makeOne(renderer=renderer,
+                                etag=lambda context, request: 'abc')
+        result = deriver(view)
+        request = self._makeWebRequest('POST', If_None_Match='"abc"')
+        response = result(None, request)
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(calls, ['view', 'render'])
+
+    def test_conditional_etag_none(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        deriver = self._makeOne(renderer=renderer,
+                                etag=lambda context, request: None)
+        result = deriver(view)
+        request = self._makeWebRequest(If_None_Match='*')
+        response = result(None, request)
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(response.etag, None)
+        self.assertEqual(calls, ['view', 'render'])
+
+    def test_conditional_etag_set_by_view_is_kept(self):
+        from pyramid.response import Response
+        def view(context, request):
+            response = Response('OK')
+            response.etag = 'fromview'
+            return response
+        deriver = self._makeOne(etag=lambda context, request: 'abc')
+        result = deriver(view)
+        response = result(None, self._makeWebRequest())
+        self.assertEqual(response.etag, 'fromview')
+
+    def test_conditional_etag_not_set_on_error_response(self):
+        from pyramid.response import Response
+        def view(context, request):
+            return Response('Gone', status=410)
+        deriver = self._makeOne(etag=lambda context, request: 'abc')
+        result = deriver(view)
+        response = result(None, self._makeWebRequest())
+        self.assertEqual(response.etag, None)
+
+    def test_conditional_last_modified_not_modified(self):
+        import datetime
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        modified = datetime.datetime(2011, 1, 1, 12, 0, 0, 500)
+        deriver = self._makeOne(renderer=renderer,
+                                last_modified=lambda context, request: modified)
+        result = deriver(view)
+        request = self._makeWebRequest(
+            If_Modified_Since='Sat, 01 Jan 2011 12:00:00 GMT')
+        response = result(None, request)
+        self.assertEqual(response.status_int, 304)
+        self.assertEqual(response.headers['Last-Modified'],
+                         'Sat, 01 Jan 2011 12:00:00 GMT')
+        self.assertEqual(calls, [])
+
+    def test_conditional_last_modified_modified(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        # 2011-01-01 12:00:01 GMT as seconds since the epoch
+        deriver = self._makeOne(
+            renderer=renderer,
+            last_modified=lambda context, request: 1293883201)
+        result = deriver(view)
+        request = self._makeWebRequest(
+            If_Modified_Since='Sat, 01 Jan 2011 12:00:00 GMT')
+        response = result(None, request)
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(response.headers['Last-Modified'],
+                         'Sat, 01 Jan 2011 12:00:01 GMT')
+        self.assertEqual(calls, ['view', 'render'])
+
+    def test_conditional_if_none_match_overrides_if_modified_since(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        deriver = self._makeOne(
+            renderer=renderer,
+            etag=lambda context, request: 'abc',
+            last_modified=lambda context, request: 0)
+        result = deriver(view)
+        request = self._makeWebRequest(
+            If_None_Match='"def"',
+            If_Modified_Since='Sat, 01 Jan 2011 12:00:00 GMT')
+        response = result(None, request)
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(calls, ['view', 'render'])
+
+    def test_conditional_secured_checks_permission_first(self):
+        from pyramid.exceptions import Forbidden
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        self.config.registry.settings = {}
+        self._registerSecurityPolicy(False)
+        deriver = self._makeOne(renderer=renderer, permission='view',
+                                etag=lambda context, request: 'abc')
+        result = deriver(view)
+        request = self._makeWebRequest(If_None_Match='"abc"')
+        self.assertRaises(Forbidden, result, None, request)
+        response = result.__call_permissive__(None, request)
+        self.assertEqual(response.status_int, 304)
+        self.assertEqual(calls, [])
+
+    def test_conditional_disabled(self):
+        def view(context, request):
+            return 'OK'
+        deriver = self._makeOne()
+        self.assertEqual(deriver.conditional_view(view), view)
+
+    def _registerCacheBackend(self):
+        from pyramid.cache import MemoryCacheBackend
+        from pyramid.interfaces import ICacheBackend
+        backend = MemoryCacheBackend()
+        self.config.registry.registerUtility(backend, ICacheBackend)
+        return backend
+
+    def test_cached_hit_skips_view_and_renderer(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        self._registerCacheBackend()
+        deriver = self._makeOne(renderer=renderer, cache=60)
+        result = deriver(view)
+        first = result(None, self._makeWebRequest())
+        second = result(None, self._makeWebRequest())
+        self.assertEqual(calls, ['view', 'render'])
+        self.assertFalse(first is second)
+        self.assertEqual(second.body, 'OK')
+        self.assertEqual(second.status, first.status)
+        self.assertEqual(second.headerlist, first.headerlist)
+
+    def test_cached_varies_by_params(self):
+        from pyramid.request import Request
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        self._registerCacheBackend()
+        deriver = self._makeOne(renderer=renderer, cache=60)
+        result = deriver(view)
+        for path in ('/?a=1', '/?a=2', '/?a=1'):
+            request = Request.blank(path)
+            request.registry = self.config.registry
+            result(None, request)
+        self.assertEqual(calls, ['view', 'render'] * 2)
+
+    def test_cached_custom_vary(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        self._registerCacheBackend()
+        def vary(context, request):
+            return context
+        deriver = self._makeOne(renderer=renderer, cache=(60, [vary]))
+        result = deriver(view)
+        result('a', self._makeWebRequest())
+        result('b', self._makeWebRequest())
+        result('b', self._makeWebRequest())
+        self.assertEqual(calls, ['view', 'render'] * 2)
+
+    def test_cached_not_for_post(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        self._registerCacheBackend()
+        deriver = self._makeOne(renderer=renderer, cache=60)
+        result = deriver(view)
+        result(None, self._makeWebRequest('POST'))
+        result(None, self._makeWebRequest('POST'))
+        self.assertEqual(calls, ['view', 'render'] * 2)
+
+    def test_cached_not_for_error_or_cookie_responses(self):
+        from pyramid.response import Response
+        calls = []
+        def view(context, request):
+            calls.append(1)
+            if len(calls) == 1:
+                return Response('Gone', status=410)
+            response = Response('OK')
+            response.set_cookie('a', 'b')
+            return response
+        self._registerCacheBackend()
+        deriver = self._makeOne(cache=60)
+        result = deriver(view)
+        self.assertEqual(result(None, self._makeWebRequest()).status_int, 410)
+        self.assertEqual(result(None, self._makeWebRequest()).body, 'OK')
+        self.assertEqual(result(None, self._makeWebRequest()).body, 'OK')
+        self.assertEqual(len(calls), 3)
+
+    def test_cached_not_for_private_responses(self):
+        from pyramid.response import Response
+        for cache_control in ('private', 'no-store', 'private="Set-Cookie"',
+                              'max-age=60, no-store'):
+            calls = []
+            def view(context, request):
+                calls.append(1)
+                response = Response('OK')
+                response.headers['Cache-Control'] = cache_control
+                return response
+            self._registerCacheBackend()
+            deriver = self._makeOne(cache=60)
+            result = deriver(view)
+            result(None, self._makeWebRequest())
+            result(None, self._makeWebRequest())
+            self.assertEqual(len(calls), 2)
+
+    def test_cached_public_response(self):
+        from pyramid.response import Response
+        calls = []
+        def view(context, request):
+            calls.append(1)
+            response = Response('OK')
+            response.headers['Cache-Control'] = 'public, max-age=60'
+            return response
+        self._registerCacheBackend()
+        deriver = self._makeOne(cache=60)
+        result = deriver(view)
+        result(None, self._makeWebRequest())
+        response = result(None, self._makeWebRequest())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(response.headers['Cache-Control'],
+                         'public, max-age=60')
+
+    def test_cached_not_when_view_adds_response_callback(self):
+        from pyramid.response import Response
+        calls = []
+        def callback(request, response):
+            response.headers['X-Callback'] = '1'
+        def view(context, request):
+            calls.append(1)
+            request.add_response_callback(callback)
+            return Response('OK')
+        self._registerCacheBackend()
+        deriver = self._makeOne(cache=60)
+        result = deriver(view)
+        result(None, self._makeWebRequest())
+        request = self._makeWebRequest()
+        result(None, request)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(request.response_callbacks, [callback])
+
+    def test_cached_with_response_callback_added_before_view(self):
+        from pyramid.response import Response
+        calls = []
+        def view(context, request):
+            calls.append(1)
+            return Response('OK')
+        self._registerCacheBackend()
+        deriver = self._makeOne(cache=60)
+        result = deriver(view)
+        for i in range(2):
+            request = self._makeWebRequest()
+            request.add_response_callback(lambda request, response: None)
+            result(None, request)
+        self.assertEqual(len(calls), 1)
+
+    def test_cached_varies_by_principals_by_default(self):
+        from pyramid.interfaces import IAuthenticationPolicy
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        self._registerCacheBackend()
+        policy = DummySecurityPolicy()
+        self.config.registry.registerUtility(policy, IAuthenticationPolicy)
+        deriver = self._makeOne(renderer=renderer, cache=60)
+        result = deriver(view)
+        policy.effective_principals = lambda request: ['fred']
+        result(None, self._makeWebRequest())
+        policy.effective_principals = lambda request: ['bob']
+        result(None, self._makeWebRequest())
+        result(None, self._makeWebRequest())
+        self.assertEqual(calls, ['view', 'render'] * 2)
+
+    def test_cached_varies_by_view_configuration(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        self._registerCacheBackend()
+        results = [
+            self._makeOne(renderer=renderer, cache=60, route_name='a')(view),
+            self._makeOne(renderer=renderer, cache=60, route_name='b')(view),
+            self._makeOne(renderer=renderer, cache=60, phash='x')(view),
+            self._makeOne(renderer=renderer, cache=60,
+                          context=Exception)(view),
+            ]
+        for result in results:
+            result(None, self._makeWebRequest())
+        self.assertEqual(calls, ['view', 'render'] * 4)
+
+    def test_cached_varies_by_host_and_script_name(self):
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        self._registerCacheBackend()
+        deriver = self._makeOne(renderer=renderer, cache=60)
+        result = deriver(view)
+        request = self._makeWebRequest()
+        result(None, request)
+        request = self._makeWebRequest(Host='example.com')
+        result(None, request)
+        request = self._makeWebRequest()
+        request.script_name = '/app'
+        result(None, request)
+        self.assertEqual(calls, ['view', 'render'] * 3)
+
+    def test_cached_not_cacheable_skips_lock(self):
+        import pyramid.cache
+        from pyramid.cache import NOT_CACHEABLE
+        from pyramid.response import Response
+        calls = []
+        def view(context, request):
+            calls.append(1)
+            return Response('Gone', status=410)
+        from pyramid.interfaces import ICacheBackend
+        backend = DummyCacheBackend()
+        self.config.registry.registerUtility(backend, ICacheBackend)
+        deriver = self._makeOne(cache=60)
+        result = deriver(view)
+        result(None, self._makeWebRequest())
+        self.assertEqual(backend.data.values(), [NOT_CACHEABLE])
+        locks = DummyKeyLocks()
+        saved = pyramid.cache._key_locks
+        pyramid.cache._key_locks = locks
+        try:
+            response = result(None, self._makeWebRequest())
+        finally:
+            pyramid.cache._key_locks = saved
+        self.assertEqual(response.status_int, 410)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(locks.acquired, [])
+
+    def test_cached_uses_response_factory(self):
+        from pyramid.interfaces import IResponseFactory
+        from pyramid.response import Response
+        class MyResponse(Response):
+            pass
+        self.config.registry.registerUtility(lambda *arg: MyResponse(*arg),
+                                             IResponseFactory)
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        self._registerCacheBackend()
+        deriver = self._makeOne(renderer=renderer, cache=60)
+        result = deriver(view)
+        result(None, self._makeWebRequest())
+        response = result(None, self._makeWebRequest())
+        self.assertEqual(response.__class__, MyResponse)
+        self.assertEqual(response.body, 'OK')
+
+    def test_predicates_checked_once_by_multiview(self):
+        from pyramid.config import MultiView
+        checked = []
+        def predicate(context, request):
+            checked.append(True)
+            return True
+        def view(context, request):
+            return 'OK'
+        deriver = self._makeOne(predicates=(predicate,), phash='x')
+        result = deriver(view)
+        self.assertEqual(result.__predicated_view__(None, None), 'OK')
+        self.assertEqual(checked, [])
+        mv = MultiView('name')
+        mv.add(result, 100)
+        self.assertEqual(mv(None, None), 'OK')
+        self.assertEqual(checked, [True])
+        self.assertEqual(result(None, None), 'OK')
+        self.assertEqual(checked, [True, True])
+
+    def test_cached_uses_default_backend(self):
+        from pyramid.cache import MemoryCacheBackend
+        from pyramid.interfaces import ICacheBackend
+        calls = []
+        renderer, view = self._makeCountingView(calls)
+        deriver = self._makeOne(renderer=renderer, cache=60)
+        result = deriver(view)
+        backend = self.config.registry.getUtility(ICacheBackend)
+        self.assertTrue(isinstance(backend, MemoryCacheBackend))
+        result(None, self._makeWebRequest())
+        result(None, self._makeWebRequest())
+        self.assertEqual(calls, ['view', 'render'])
+
+    def test_cached_disabled(self):
+        def view(context, request):
+            return 'OK'
+        deriver = self._makeOne()
+        self.assertEqual(deriver.cached_view(view), view)
+
 class TestDefaultViewMapper(unittest.TestCase):
     def setUp(self):
         self.config = testing.setUp()
@@ -4507,6 +5204,59 @@ class Test__make_predicates(unittest.TestCase):
         self.assertEqual(predicates[7].__text__, 'request_type = request_type')
         self.assertEqual(predicates[8].__text__, 'custom predicate')
 
+class Test__make_predicates_sharing(unittest.TestCase):
+    def _callFUT(self, **kw):
+        from pyramid.config import _make_predicates
+        return _make_predicates(**kw)
+
+    def test_identical_predicates_are_shared(self):
+        kw = dict(xhr=True, request_method='GET', path_info='/foo',
+                  request_param='abc=1', header='X-Foo:bar', accept='text/*',
+                  containment=IDummy, request_type=IDummy)
+        _, predicates1, phash1 = self._callFUT(**kw)
+        _, predicates2, phash2 = self._callFUT(**kw)
+        self.assertEqual(phash1, phash2)
+        self.assertEqual(len(predicates1), 8)
+        for p1, p2 in zip(predicates1, predicates2):
+            self.assertTrue(p1 is p2)
+
+    def test_different_predicates_are_not_shared(self):
+        _, predicates1, _ = self._callFUT(request_method='GET')
+        _, predicates2, _ = self._callFUT(request_method='POST')
+        self.assertFalse(predicates1[0] is predicates2[0])
+        self.assertEqual(predicates2[0].__text__, 'request method = POST')
+
+    def test_unused_predicates_are_not_retained(self):
+        import gc
+        from pyramid.config import _predicates
+        key = 'request_method:%r' % 'UNUSED'
+        _, predicates, _ = self._callFUT(request_method='UNUSED')
+        self.assertTrue(_predicates.get(key) is predicates[0])
+        del predicates
+        gc.collect()
+        self.assertEqual(_predicates.get(key), None)
+
+    def test_request_predicate_memoized_per_request(self):
+        _, predicates, _ = self._callFUT(request_param='memoized')
+        predicate = predicates[0]
+        self.assertEqual(predicate.__text__, 'request_param memoized')
+        request = DummyRequest()
+        request.params = {'memoized':'1'}
+        self.assertEqual(predicate(None, request), True)
+        request.params = {}
+        self.assertEqual(predicate(None, request), True)
+        self.assertEqual(predicate(None, DummyRequest()), False)
+
+    def test_memoized_predicate_request_without_dict(self):
+        _, predicates, _ = self._callFUT(accept='text/memoized')
+        class Request(object):
+            __slots__ = ('accept',)
+        request = Request()
+        request.accept = ['text/memoized']
+        self.assertEqual(predicates[0](None, request), True)
+        request.accept = []
+        self.assertEqual(predicates[0](None, request), False)
+
 class TestMultiView(unittest.TestCase):
     def _getTargetClass(self):
         from pyramid.config import MultiView
@@ -4588,6 +5338,45 @@ class TestMultiView(unittest.TestCase):
         mv.views = [(99, lambda *arg: None)]
         self.assertEqual(mv.get_views(request), mv.views)
 
+    def test_get_views_memoized_per_accept_header(self):
+        from webob.acceptparse import MIMEAccept
+        request = DummyRequest()
+        request.accept = MIMEAccept('text/html')
+        mv = self._makeOne()
+        mv.add('view', 99)
+        mv.add('html_view', 98, 'text/html')
+        mv.add('xml_view', 97, 'text/xml')
+        views = mv.get_views(request)
+        self.assertEqual([ v for o, v, p in views ],
+                         ['html_view', 'view'])
+        self.assertTrue(mv.get_views(request) is views)
+        request.accept = MIMEAccept('text/xml')
+        self.assertEqual([ v for o, v, p in mv.get_views(request) ],
+                         ['xml_view', 'view'])
+        self.assertTrue(mv.accept_views.get('text/html') is views)
+
+    def test_get_views_memoized_nil_accept(self):
+        from webob.acceptparse import MIMENilAccept
+        request = DummyRequest()
+        request.accept = MIMENilAccept()
+        mv = self._makeOne()
+        mv.add('view', 99)
+        mv.add('html_view', 98, 'text/html')
+        views = mv.get_views(request)
+        self.assertEqual([ v for o, v, p in views ], ['html_view', 'view'])
+        self.assertTrue(mv.accept_views.get('') is views)
+
+    def test_add_clears_accept_memo(self):
+        from webob.acceptparse import MIMEAccept
+        request = DummyRequest()
+        request.accept = MIMEAccept('text/html')
+        mv = self._makeOne()
+        mv.add('html_view', 98, 'text/html')
+        mv.get_views(request)
+        mv.add('view', 99)
+        self.assertEqual([ v for o, v, p in mv.get_views(request) ],
+                         ['html_view', 'view'])
+
     def test_match_not_found(self):
         from pyramid.exceptions import NotFound
         mv = self._makeOne()
@@ -4691,6 +5480,40 @@ class TestMultiView(unittest.TestCase):
         response = mv(context, request)
         self.assertEqual(response, expected_response)
 
+    def test___call__skips_view_when_predicates_fail(self):
+        mv = self._makeOne()
+        context = DummyContext()
+        request = DummyRequest()
+        request.view_name = ''
+        expected_response = DummyResponse()
+        called = []
+        def view1(context, request):
+            called.append(True) # pragma: no cover
+        view1.__predicated__ = lambda *arg: False
+        def view2(context, request):
+            return expected_response
+        view2.__predicated__ = lambda *arg: True
+        mv.views = [(100, view1, None), (101, view2, None)]
+        response = mv(context, request)
+        self.assertEqual(response, expected_response)
+        self.assertEqual(called, [])
+
+    def test___call__calls_predicated_view_when_predicates_pass(self):
+        mv = self._makeOne()
+        context = DummyContext()
+        request = DummyRequest()
+        request.view_name = ''
+        expected_response = DummyResponse()
+        def view(context, request):
+            raise AssertionError('predicates checked twice') # pragma: no cover
+        def predicated_view(context, request):
+            return expected_response
+        view.__predicated__ = lambda *arg: True
+        view.__predicated_view__ = predicated_view
+        mv.views = [(100, view, None)]
+        response = mv(context, request)
+        self.assertEqual(response, expected_response)
+
     def test__call_permissive__not_found(self):
         from pyramid.exceptions import NotFound
         mv = self._makeOne()
@@ -4958,6 +5781,107 @@ class Test_isexception(unittest.TestCase):
             pass
         self.assertEqual(self._callFUT(ISubException), True)
 
+class TestStartupProfiler(unittest.TestCase):
+    def _makeOne(self):
+        from pyramid.config import StartupProfiler
+        profiler = StartupProfiler()
+        times = [0.0]
+        def timer():
+            times[0] += 1.0
+            return times[0]
+        profiler.timer = timer
+        return profiler
+
+    def test_begin_end(self):
+        profiler = self._makeOne()
+        profiler.begin('scan')
+        profiler.begin('add_view')
+        profiler.end(('file.py', 10, 'func', 'text'))
+        profiler.end('pkg')
+        self.assertEqual(profiler.stats['add_view'], [1, 1.0, 1.0])
+        self.assertEqual(profiler.stats['scan'], [1, 3.0, 2.0])
+        self.assertEqual(profiler.calls,
+                         [(1.0, 'add_view', ('file.py', 10, 'func', 'text')),
+                          (3.0, 'scan', 'pkg')])
+
+    def test_wrap_attributes_action_to_directive(self):
+        profiler = self._makeOne()
+        L = []
+        profiler.begin('add_route')
+        wrapped = profiler.wrap(lambda *arg, **kw: L.append((arg, kw)))
+        profiler.end()
+        wrapped(1, a=2)
+        self.assertEqual(L, [((1,), {'a':2})])
+        self.assertEqual(profiler.stats['add_route (action)'][0], 1)
+
+    def test_wrap_outside_directive(self):
+        profiler = self._makeOne()
+        profiler.wrap(lambda: None)()
+        self.assertEqual(profiler.stats['action'][0], 1)
+
+    def test_report(self):
+        profiler = self._makeOne()
+        profiler.begin('scan')
+        profiler.begin('add_view')
+        profiler.end(('file.py', 10, 'func', 'text'))
+        profiler.end('pkg')
+        profiler.begin('commit')
+        profiler.end()
+        lines = profiler.report(limit=2).split('\n')
+        self.assertEqual(lines[0], 'Startup profile (seconds):')
+        self.assertTrue(lines[2].endswith('scan'))
+        self.assertEqual(lines[5], 'Slowest calls:')
+        self.assertEqual(lines[6], '    3.0000  scan (pkg)')
+        self.assertEqual(lines[7],
+                         '    1.0000  add_view (file.py:10)')
+        self.assertEqual(len(lines), 8)
+
+    def test_report_empty(self):
+        profiler = self._makeOne()
+        self.assertEqual(len(profiler.report().split('\n')), 2)
+
+class TestPyramidConfigurationMachine(unittest.TestCase):
+    def _makeOne(self):
+        from pyramid.config import PyramidConfigurationMachine
+        return PyramidConfigurationMachine()
+
+    def test_ctor_does_not_bootstrap(self):
+        context = self._makeOne()
+        self.assertEqual(context._bootstrapped, False)
+        self.assertEqual(context.actions, [])
+        self.assertEqual(context._registry, {})
+
+    def test_factory_bootstraps(self):
+        context = self._makeOne()
+        context.info = 'info'
+        factory = context.factory(context, ('', 'include'))
+        self.assertTrue(factory is not None)
+        self.assertEqual(context._bootstrapped, True)
+        self.assertEqual(context.info, 'info')
+
+    def test_register_bootstraps_first(self):
+        from zope.configuration.config import defineSimpleDirective
+        from zope.interface import Interface
+        context = self._makeOne()
+        handler = lambda *arg: None
+        defineSimpleDirective(context, 'include', Interface, handler,
+                              namespace='*')
+        self.assertEqual(context._bootstrapped, True)
+        factory = context.factory(context, ('', 'include'))
+        self.assertEqual(factory.schema, Interface)
+
+    def test_zcml_directive_execution(self):
+        from zope.configuration.xmlconfig import string
+        context = self._makeOne()
+        string('<configure xmlns="http://namespaces.zope.org/zope"/>',
+               context=context)
+        self.assertEqual(context._bootstrapped, True)
+
+    def test_processSpec(self):
+        context = self._makeOne()
+        self.assertEqual(context.processSpec('spec'), True)
+        self.assertEqual(context.processSpec('spec'), False)
+
 class DummyRequest:
     subpath = ()
     matchdict = None
@@ -4980,8 +5904,9 @@ class DummyPackage:
         self.__name__ = name
 
 class DummyOverrides:
-    def __init__(self, package):
+    def __init__(self, package, registry=None):
         self.package = package
+        self.registry = registry
         self.inserted = []
 
     def insert(self, path, package, prefix):
@@ -5016,6 +5941,29 @@ class DummyLogger:
     warn = info
     debug = info
 
+class DummyCacheBackend:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.data[key] = value
+
+    def delete(self, key): # pragma: no cover
+        self.data.pop(key, None)
+
+class DummyKeyLocks:
+    def __init__(self):
+        self.acquired = []
+
+    def acquire(self, key): # pragma: no cover
+        self.acquired.append(key)
+
+    def release(self, key): # pragma: no cover
+        pass
+
 class DummySecurityPolicy:
     def __init__(self, permitted=True):
         self.permitted = permitted
@@ -5086,6 +6034,9 @@ class DummyCustomPredicate(object):
 def dummy_view(request):
     return 'OK'
 
+def dummy_last_modified(context, request):
+    return 0
+
 def dummyfactory(request):
     """ """
 
@@ -5100,3 +6051,14 @@ def dummy_extend(config, discrim):
 def dummy_extend2(config, discrim):
     config.action(discrim, None, config.registry)
     
+
+class DummyInstrumentationSink:
+    def __init__(self):
+        self.records = []
+
+    def record(self, key, phase, elapsed):
+        self.records.append((key, phase, elapsed))
+
+class DummyRoute:
+    def __init__(self, name):
+        self.name = name
@@ -0,0 +1,231 @@
+import unittest
+from pyramid import testing
+
+class TestFanoutResult(unittest.TestCase):
+    def _makeOne(self):
+        from pyramid.fanout import FanoutResult
+        return FanoutResult()
+
+    def test_run_value(self):
+        result = self._makeOne()
+        self.assertFalse(result.ready())
+        result._run(lambda a, b: a + b, (1, 2))
+        self.assertTrue(result.ready())
+        self.assertEqual(result.get(), 3)
+        self.assertEqual(result.exception, None)
+
+    def test_run_exception(self):
+        result = self._makeOne()
+        def raiser():
+            raise KeyError('a')
+        result._run(raiser, ())
+        self.assertTrue(result.ready())
+        self.assertEqual(result.exception.__class__, KeyError)
+        self.assertRaises(KeyError, result.get)
+
+class TestFanoutPool(unittest.TestCase):
+    def _makeOne(self, size):
+        from pyramid.fanout import FanoutPool
+        return FanoutPool(size)
+
+    def test_submit_runs_concurrently(self):
+        import threading
+        pool = self._makeOne(3)
+        barrier = Barrier(3)
+        try:
+            results = [ pool.submit(barrier.wait, i) for i in range(3) ]
+            values = [ result.get() for result in results ]
+        finally:
+            pool.shutdown()
+        self.assertEqual(values, [0, 1, 2])
+        self.assertEqual(len(barrier.threads), 3)
+        self.assertFalse(threading.currentThread() in barrier.threads)
+
+    def test_submit_exception(self):
+        pool = self._makeOne(1)
+        def raiser():
+            raise KeyError('a')
+        try:
+            result = pool.submit(raiser)
+            self.assertRaises(KeyError, result.get)
+        finally:
+            pool.shutdown()
+
+    def test_submit_size_zero_runs_inline(self):
+        import threading
+        pool = self._makeOne(0)
+        result = pool.submit(threading.currentThread)
+        self.assertTrue(result.ready())
+        self.assertEqual(result.get(), threading.currentThread())
+        self.assertEqual(pool.workers, [])
+
+    def test_submit_from_worker_runs_inline(self):
+        pool = self._makeOne(1)
+        def outer():
+            return pool.submit(lambda: 'inner').get()
+        try:
+            self.assertEqual(pool.submit(outer).get(), 'inner')
+        finally:
+            pool.shutdown()
+
+    def test_shutdown_and_restart(self):
+        pool = self._makeOne(2)
+        pool.submit(lambda: None).get()
+        self.assertEqual(len(pool.workers), 2)
+        pool.shutdown()
+        self.assertEqual(pool.workers, [])
+        self.assertEqual(pool.submit(lambda: 1).get(), 1)
+        self.assertEqual(len(pool.workers), 2)
+        pool.shutdown()
+
+class Test_get_fanout_pool(unittest.TestCase):
+    def _callFUT(self, registry):
+        from pyramid.fanout import get_fanout_pool
+        return get_fanout_pool(registry)
+
+    def test_default_size(self):
+        from pyramid.registry import Registry
+        registry = Registry()
+        pool = self._callFUT(registry)
+        self.assertEqual(pool.size, 4)
+        self.assertTrue(self._callFUT(registry) is pool)
+
+    def test_size_from_settings(self):
+        from pyramid.registry import Registry
+        registry = Registry()
+        registry.settings = {'fanout_threads':2}
+        self.assertEqual(self._callFUT(registry).size, 2)
+
+class Test_clone_request(unittest.TestCase):
+    def _callFUT(self, request):
+        from pyramid.fanout import clone_request
+        return clone_request(request)
+
+    def test_it(self):
+        from pyramid.request import Request
+        request = Request.blank('/')
+        request.registry = 'registry'
+        request.context = 'context'
+        request.response = 'response'
+        request.add_finished_callback(None)
+        clone = self._callFUT(request)
+        self.assertEqual(clone.__class__, Request)
+        self.assertEqual(clone.environ, request.environ)
+        self.assertFalse(clone.environ is request.environ)
+        self.assertEqual(clone.registry, 'registry')
+        self.assertEqual(clone.context, 'context')
+        self.assertEqual(clone.finished_callbacks, ())
+        self.assertFalse('response' in clone.__dict__)
+        self.assertEqual(request.response, 'response')
+
+class Test_render_views_to_responses(unittest.TestCase):
+    def setUp(self):
+        self.config = testing.setUp(settings={'fanout_threads':2})
+
+    def tearDown(self):
+        self.config.registry._fanout_pool.shutdown()
+        testing.tearDown()
+
+    def _callFUT(self, context, request, names, secure=True):
+        from pyramid.fanout import render_views_to_responses
+        return render_views_to_responses(context, request, names,
+                                         secure=secure)
+
+    def _registerView(self, view, name):
+        from zope.interface import Interface
+        from pyramid.interfaces import IRequest
+        from pyramid.interfaces import IView
+        from pyramid.interfaces import IViewClassifier
+        self.config.registry.registerAdapter(
+            view, (IViewClassifier, IRequest, Interface), IView, name=name)
+
+    def test_it(self):
+        import threading
+        from pyramid.request import Request
+        from pyramid.threadlocal import get_current_request
+        from pyramid.threadlocal import get_current_registry
+        barrier = Barrier(2)
+        seen = []
+        def view(context, request):
+            barrier.wait(None)
+            seen.append((context, request, get_current_request(),
+                         get_current_registry()))
+            return request.view_name
+        self._registerView(view, 'a')
+        self._registerView(view, 'b')
+        request = Request.blank('/')
+        request.registry = self.config.registry
+        request.view_name = 'parent'
+        context = testing.DummyResource()
+        results = self._callFUT(context, request, ['a', 'b', 'c'])
+        self.assertEqual([ r.get() for r in results ],
+                         ['parent', 'parent', None])
+        self.assertEqual(len(seen), 2)
+        for ctx, req, current_request, current_registry in seen:
+            self.assertTrue(ctx is context)
+            self.assertFalse(req is request)
+            self.assertTrue(current_request is req)
+            self.assertTrue(current_registry is self.config.registry)
+        self.assertFalse(threading.currentThread() in barrier.threads)
+
+    def test_exception(self):
+        from pyramid.request import Request
+        def view(context, request):
+            raise KeyError('a')
+        self._registerView(view, 'a')
+        request = Request.blank('/')
+        request.registry = self.config.registry
+        results = self._callFUT(None, request, ['a'])
+        self.assertRaises(KeyError, results[0].get)
+
+class Test_invoke_subrequests(unittest.TestCase):
+    def setUp(self):
+        self.config = testing.setUp(settings={'fanout_threads':2})
+
+    def tearDown(self):
+        self.config.registry._fanout_pool.shutdown()
+        testing.tearDown()
+
+    def test_it(self):
+        from pyramid.request import Request
+        from pyramid.response import Response
+        barrier = Barrier(2)
+        def view(request):
+            barrier.wait(None)
+            return Response(request.path_info)
+        config = self.config
+        config.add_route('sub', '/sub/{name}')
+        config.add_view(view, route_name='sub')
+        config.make_wsgi_app()
+        request = Request.blank('/page')
+        request.registry = config.registry
+        results = request.invoke_subrequests(['/sub/a', '/sub/b'])
+        self.assertEqual([ r.get().body for r in results ],
+                         ['/sub/a', '/sub/b'])
+        self.assertEqual(len(barrier.threads), 2)
+
+class Barrier(object):
+    # returns only once ``count`` threads are waiting, so that the test
+    # fails (by timing out) unless jobs run concurrently
+    def __init__(self, count):
+        import threading
+        self.count = count
+        self.threads = []
+        self.condition = threading.Condition()
+
+    def wait(self, value):
+        import threading
+        import time
+        deadline = time.time() + 5
+        self.condition.acquire()
+        try:
+            self.threads.append(threading.currentThread())
+            self.condition.notifyAll()
+            while len(self.threads) < self.count:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise AssertionError('jobs did not run concurrently')
+                self.condition.wait(remaining)
+        finally:
+            self.condition.release()
+        return value
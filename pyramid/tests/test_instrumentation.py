@@ -0,0 +1,174 @@
+import unittest
+
+class Test_request_key(unittest.TestCase):
+    def _callFUT(self, request):
+        from pyramid.instrumentation import request_key
+        return request_key(request)
+
+    def test_route(self):
+        request = DummyRequest()
+        request.matched_route = DummyRoute('home')
+        request.view_name = 'edit'
+        self.assertEqual(self._callFUT(request), 'route:home')
+
+    def test_view_name(self):
+        request = DummyRequest()
+        request.view_name = 'edit'
+        self.assertEqual(self._callFUT(request), 'view:edit')
+
+    def test_default_view(self):
+        request = DummyRequest()
+        request.view_name = ''
+        self.assertEqual(self._callFUT(request), 'view:default')
+
+    def test_not_traversed(self):
+        self.assertEqual(self._callFUT(DummyRequest()), 'view:default')
+
+class Test_record_timings(unittest.TestCase):
+    def _callFUT(self, sink, key, checkpoints, end):
+        from pyramid.instrumentation import record_timings
+        return record_timings(sink, key, checkpoints, end)
+
+    def test_it(self):
+        sink = DummySink()
+        self._callFUT(sink, 'route:home',
+                      [('start', 1.0), ('route_match', 1.5), ('view', 3.0)],
+                      3.25)
+        self.assertEqual(sink.records,
+                         [('route:home', 'route_match', 0.5),
+                          ('route:home', 'view', 1.5),
+                          ('route:home', 'total', 2.25)])
+
+    def test_no_phases(self):
+        sink = DummySink()
+        self._callFUT(sink, 'view:default', [('start', 1.0)], 2.0)
+        self.assertEqual(sink.records, [('view:default', 'total', 1.0)])
+
+class TestHistogram(unittest.TestCase):
+    def _makeOne(self, bounds):
+        from pyramid.instrumentation import Histogram
+        return Histogram(bounds)
+
+    def test_add(self):
+        histogram = self._makeOne((0.1, 1.0))
+        self.assertEqual(histogram.mean(), 0.0)
+        histogram.add(0.05)
+        histogram.add(0.1)
+        histogram.add(0.5)
+        histogram.add(2.0)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.min, 0.05)
+        self.assertEqual(histogram.max, 2.0)
+        self.assertEqual(histogram.mean(), 2.65 / 4)
+
+class TestMemorySink(unittest.TestCase):
+    def _makeOne(self, bounds=None):
+        from pyramid.instrumentation import MemorySink
+        return MemorySink(bounds)
+
+    def test_verifyObject(self):
+        from zope.interface.verify import verifyObject
+        from pyramid.interfaces import IInstrumentationSink
+        verifyObject(IInstrumentationSink, self._makeOne())
+
+    def test_record(self):
+        sink = self._makeOne((1.0,))
+        sink.record('route:home', 'view', 0.5)
+        sink.record('route:home', 'view', 1.5)
+        sink.record('route:home', 'total', 2.0)
+        histogram = sink.histograms[('route:home', 'view')]
+        self.assertEqual(histogram.counts, [1, 1])
+        self.assertEqual(histogram.total, 2.0)
+        self.assertEqual(sink.histograms[('route:home', 'total')].count, 1)
+
+    def test_report(self):
+        sink = self._makeOne()
+        sink.record('view:edit', 'view', 0.002)
+        sink.record('route:home', 'view', 0.001)
+        lines = sink.report().splitlines()
+        self.assertEqual(lines[0].split(),
+                         ['key', 'phase', 'count', 'mean', 'ms', 'min', 'ms',
+                          'max', 'ms'])
+        self.assertEqual(lines[1].split(),
+                         ['route:home', 'view', '1', '1.000', '1.000',
+                          '1.000'])
+        self.assertEqual(lines[2].split()[0], 'view:edit')
+
+    def test_clear(self):
+        sink = self._makeOne()
+        sink.record('route:home', 'view', 0.001)
+        sink.clear()
+        self.assertEqual(sink.histograms, {})
+
+class TestLogSink(unittest.TestCase):
+    def _makeOne(self, logger=None):
+        from pyramid.instrumentation import LogSink
+        return LogSink(logger)
+
+    def test_default_logger(self):
+        sink = self._makeOne()
+        self.assertEqual(sink.logger.name, 'pyramid.instrumentation')
+
+    def test_record(self):
+        logger = DummyLogger()
+        sink = self._makeOne(logger)
+        sink.record('route:home', 'render', 0.25)
+        self.assertEqual(logger.messages, ['route:home render 0.250000'])
+
+class TestStatsdSink(unittest.TestCase):
+    def setUp(self):
+        import socket
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.settimeout(5)
+
+    def tearDown(self):
+        self.server.close()
+
+    def _makeOne(self, **kw):
+        from pyramid.instrumentation import StatsdSink
+        port = self.server.getsockname()[1]
+        return StatsdSink(port=port, **kw)
+
+    def test_record(self):
+        sink = self._makeOne()
+        sink.record('route:home page', 'view', 0.0125)
+        data = self.server.recv(1024)
+        self.assertEqual(data, 'pyramid.route_home_page.view:12.500|ms')
+
+    def test_record_prefix(self):
+        sink = self._makeOne(prefix='myapp')
+        sink.record('view:default', 'total', 1)
+        data = self.server.recv(1024)
+        self.assertEqual(data, 'myapp.view_default.total:1000.000|ms')
+
+    def test_record_socket_error_ignored(self):
+        import socket
+        sink = self._makeOne()
+        class DummySocket:
+            def sendto(self, data, address):
+                raise socket.error('refused')
+        sink.socket = DummySocket()
+        sink.record('view:default', 'total', 1)
+
+class DummyRequest:
+    pass
+
+class DummyRoute:
+    def __init__(self, name):
+        self.name = name
+
+class DummySink:
+    def __init__(self):
+        self.records = []
+
+    def record(self, key, phase, elapsed):
+        self.records.append((key, phase, elapsed))
+
+class DummyLogger:
+    def __init__(self):
+        self.messages = []
+
+    def info(self, msg):
+        self.messages.append(msg)
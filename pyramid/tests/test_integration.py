@@ -271,6 +271,7 @@ class TestViewDecoratorApp(IntegrationBase):
         tmpldir = os.path.join(os.path.dirname(__file__), 'viewdecoratorapp',
                                'views')
         self.config.registry.settings['mako.directories'] = tmpldir
+        self.config.registry.settings['mako.cache_modules'] = 'false'
 
     def test_first(self):
         # we use mako here instead of chameleon because it works on Jython
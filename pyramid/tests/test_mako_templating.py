@@ -223,6 +223,54 @@ class Test_renderer_factory(Base, unittest.TestCase):
         lookup = self.config.registry.getUtility(IMakoLookup)
         self.assertEqual(lookup.template_args['strict_undefined'], False)
 
+    def test_cache_modules_default(self):
+        from pyramid.mako_templating import IMakoLookup
+        from pyramid.mako_templating import default_module_directory
+        settings = {'mako.directories':self.templates_dir}
+        info = DummyRendererInfo({
+            'name':'helloworld.mak',
+            'package':None,
+            'registry':self.config.registry,
+            'settings':settings,
+            })
+        self._callFUT(info)
+        lookup = self.config.registry.getUtility(IMakoLookup)
+        self.assertEqual(lookup.module_directory, None)
+        modulename = lookup.modulename_callable
+        self.assertEqual(modulename.directory, default_module_directory())
+        self.assertEqual(modulename.private, True)
+
+    def test_cache_modules_with_module_directory(self):
+        from pyramid.mako_templating import IMakoLookup
+        settings = {'mako.directories':self.templates_dir,
+                    'mako.module_directory':self.templates_dir}
+        info = DummyRendererInfo({
+            'name':'helloworld.mak',
+            'package':None,
+            'registry':self.config.registry,
+            'settings':settings,
+            })
+        self._callFUT(info)
+        lookup = self.config.registry.getUtility(IMakoLookup)
+        modulename = lookup.modulename_callable
+        self.assertEqual(modulename.directory, self.templates_dir)
+        self.assertEqual(modulename.private, False)
+
+    def test_cache_modules_false(self):
+        from pyramid.mako_templating import IMakoLookup
+        settings = {'mako.directories':self.templates_dir,
+                    'mako.cache_modules':'false'}
+        info = DummyRendererInfo({
+            'name':'helloworld.mak',
+            'package':None,
+            'registry':self.config.registry,
+            'settings':settings,
+            })
+        self._callFUT(info)
+        lookup = self.config.registry.getUtility(IMakoLookup)
+        self.assertEqual(lookup.modulename_callable, None)
+        self.assertEqual(lookup.module_directory, None)
+
     def test_with_lookup(self):
         from pyramid.mako_templating import IMakoLookup
         lookup = dict()
@@ -294,16 +342,22 @@ class MakoLookupTemplateRendererTests(Base, unittest.TestCase):
         
 class TestIntegration(unittest.TestCase):
     def setUp(self):
+        import tempfile
         import pyramid.mako_templating
         self.config = testing.setUp()
         self.config.begin()
+        self.module_directory = tempfile.mkdtemp()
         self.config.add_settings({'mako.directories':
-                                  'pyramid.tests:fixtures'})
+                                  'pyramid.tests:fixtures',
+                                  'mako.module_directory':
+                                  self.module_directory})
         self.config.add_renderer('.mak',
                                  pyramid.mako_templating.renderer_factory)
 
     def tearDown(self):
+        import shutil
         self.config.end()
+        shutil.rmtree(self.module_directory)
 
     def test_render(self):
         from pyramid.renderers import render
@@ -348,12 +402,135 @@ class TestIntegration(unittest.TestCase):
         self.assertEqual(result.implementation().render_unicode().replace('\r',''),
                          u'\nHello föö\n')
     
+    def test_render_caches_module(self):
+        import os
+        from pyramid.renderers import render
+        render('helloworld.mak', {'a':1})
+        names = [ name for name in os.listdir(self.module_directory)
+                  if name.endswith('.py') ]
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names[0].startswith('helloworld.mak-'))
+
     def test_template_not_found(self):
         from pyramid.renderers import render
         from mako.exceptions import TemplateLookupException
         self.assertRaises(TemplateLookupException, render,
                           'helloworld_not_here.mak', {})
 
+class TestModuleFilename(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def _makeOne(self, directory=None, options='', private=False):
+        import os
+        from pyramid.mako_templating import ModuleFilename
+        if directory is None:
+            directory = os.path.join(self.tempdir, 'modules')
+        return ModuleFilename(directory, options, private)
+
+    def _makeTemplate(self, name='a template.mak', text='Hello'):
+        import os
+        filename = os.path.join(self.tempdir, name)
+        f = open(filename, 'wb')
+        f.write(text)
+        f.close()
+        return filename
+
+    def test_name(self):
+        import os
+        inst = self._makeOne()
+        filename = self._makeTemplate()
+        result = inst(filename, 'a template.mak')
+        self.assertEqual(os.path.dirname(result), inst.directory)
+        self.assertTrue(os.path.basename(result).startswith(
+            'a_template.mak-'))
+        self.assertTrue(result.endswith('.py'))
+        self.assertEqual(inst(filename, 'a template.mak'), result)
+
+    def test_name_depends_on_source_uri_and_options(self):
+        filename = self._makeTemplate()
+        inst = self._makeOne()
+        first = inst(filename, 'a.mak')
+        self.assertNotEqual(inst(filename, '/a.mak'), first)
+        self.assertNotEqual(self._makeOne(options='x')(filename, 'a.mak'),
+                            first)
+        self._makeTemplate(text='Goodbye')
+        self.assertNotEqual(inst(filename, 'a.mak'), first)
+
+    def test_private_directory_created(self):
+        import os
+        import stat
+        inst = self._makeOne(private=True)
+        inst(self._makeTemplate(), 'a.mak')
+        mode = stat.S_IMODE(os.stat(inst.directory).st_mode)
+        self.assertEqual(mode, 0700)
+
+    def test_private_directory_owned_by_other_user(self):
+        import os
+        inst = self._makeOne(directory=self.tempdir, private=True)
+        getuid = os.getuid
+        os.getuid = lambda: getuid() + 1
+        try:
+            self.assertEqual(inst(self._makeTemplate(), 'a.mak'), None)
+        finally:
+            os.getuid = getuid
+
+    def test_unusable_directory(self):
+        inst = self._makeOne(directory=self._makeTemplate('file'))
+        self.assertEqual(inst(self._makeTemplate(), 'a.mak'), None)
+        self.assertEqual(inst.usable, False)
+
+    def test_missing_template(self):
+        import os
+        inst = self._makeOne()
+        missing = os.path.join(self.tempdir, 'missing.mak')
+        self.assertEqual(inst(missing, 'missing.mak'), None)
+
+class Test_precompile(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def _callFUT(self, lookup, **kw):
+        from pyramid.mako_templating import precompile
+        return precompile(lookup, **kw)
+
+    def test_it(self):
+        import os
+        from pyramid.mako_templating import make_lookup
+        lookup = make_lookup({'mako.directories':'pyramid.tests:fixtures',
+                              'mako.module_directory':self.tempdir})
+        result = self._callFUT(lookup)
+        self.assertEqual(result, ['fragment.mak', 'hello_inherit_pkg.mak',
+                                  'helloinherit.mak', 'helloworld.mak',
+                                  'helloworld.mako', 'layout.mak'])
+        modules = [ name for name in os.listdir(self.tempdir)
+                    if name.endswith('.py') ]
+        self.assertEqual(len(modules), 6)
+
+    def test_subdirectories_and_extensions(self):
+        import os
+        from pyramid.mako_templating import make_lookup
+        templates = os.path.join(self.tempdir, 'templates')
+        os.makedirs(os.path.join(templates, 'sub'))
+        for name in ('sub/a.mak', 'b.html', 'c.txt'):
+            f = open(os.path.join(templates, name), 'w')
+            f.write('Hello')
+            f.close()
+        lookup = make_lookup({'mako.directories':templates,
+                              'mako.cache_modules':'false'})
+        result = self._callFUT(lookup, extensions=('.mak', '.html'))
+        self.assertEqual(result, ['b.html', 'sub/a.mak'])
+
 class TestPkgResourceTemplateLookup(unittest.TestCase):
     def _makeOne(self, **kw):
         from pyramid.mako_templating import PkgResourceTemplateLookup
@@ -801,6 +801,73 @@ class TestGetApp(unittest.TestCase):
         
         
 
+class TestPMakoCompileCommand(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def _getTargetClass(self):
+        from pyramid.paster import PMakoCompileCommand
+        return PMakoCompileCommand
+
+    def _makeOne(self, registry):
+        command = self._getTargetClass()('pmakocompile')
+        app = DummyApp()
+        app.registry = registry
+        command.loadapp = (DummyLoadApp(app),)
+        command.args = ('/foo/bar/myapp.ini', 'myapp')
+        L = command.output = []
+        command.out = L.append
+        return command
+
+    def _makeRegistry(self, **settings):
+        from pyramid.registry import Registry
+        registry = Registry()
+        registry.settings = settings
+        return registry
+
+    def test_compiles_templates(self):
+        import os
+        registry = self._makeRegistry(**{
+            'mako.directories':'pyramid.tests:fixtures',
+            'mako.module_directory':self.tempdir})
+        command = self._makeOne(registry)
+        command.command()
+        self.assertTrue('compiled helloworld.mak' in command.output)
+        self.assertTrue('compiled helloworld.mako' in command.output)
+        self.assertTrue(os.listdir(self.tempdir))
+
+    def test_uses_registered_lookup(self):
+        from pyramid.mako_templating import IMakoLookup
+        from pyramid.mako_templating import make_lookup
+        registry = self._makeRegistry()
+        lookup = make_lookup({'mako.directories':'pyramid.tests:fixtures',
+                              'mako.module_directory':self.tempdir})
+        registry.registerUtility(lookup, IMakoLookup)
+        command = self._makeOne(registry)
+        command.command()
+        self.assertTrue('compiled layout.mak' in command.output)
+
+    def test_no_directories(self):
+        command = self._makeOne(self._makeRegistry())
+        command.command()
+        self.assertEqual(command.output,
+                         ['No mako.directories setting; nothing to compile.'])
+
+    def test_cache_disabled(self):
+        registry = self._makeRegistry(**{
+            'mako.directories':'pyramid.tests:fixtures',
+            'mako.cache_modules':'false'})
+        command = self._makeOne(registry)
+        command.command()
+        self.assertEqual(len(command.output), 1)
+        self.assertTrue(command.output[0].startswith(
+            'Compiled Mako templates are not cached'))
+
 class Dummy:
     pass
 
@@ -0,0 +1,178 @@
+import unittest
+
+class Test_request_tag(unittest.TestCase):
+    def _callFUT(self, request):
+        from pyramid.profiling import request_tag
+        return request_tag(request)
+
+    def test_route_and_view(self):
+        request = DummyRequest()
+        request.matched_route = DummyRoute('blog entry')
+        request.view_name = 'edit'
+        self.assertEqual(self._callFUT(request), 'route-blog_entry.view-edit')
+
+    def test_view_only(self):
+        request = DummyRequest()
+        request.view_name = '../edit'
+        self.assertEqual(self._callFUT(request), 'view-___edit')
+
+    def test_default_view(self):
+        self.assertEqual(self._callFUT(DummyRequest()), 'view-default')
+
+class TestRequestProfiler(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def _makeOne(self, sample_rate=1, directory=None):
+        from pyramid.profiling import RequestProfiler
+        if directory is None:
+            directory = self.tempdir
+        return RequestProfiler(directory, sample_rate)
+
+    def test_ctor_creates_directory(self):
+        import os
+        directory = os.path.join(self.tempdir, 'a', 'b')
+        profiler = self._makeOne(directory=directory)
+        self.assertTrue(os.path.isdir(directory))
+        self.assertEqual(profiler.directory, directory)
+
+    def test_sample(self):
+        profiler = self._makeOne(0.25)
+        profiler.random = lambda: 0.1
+        self.assertTrue(profiler.sample())
+        profiler.random = lambda: 0.25
+        self.assertFalse(profiler.sample())
+
+    def test_profile_aggregates_per_tag(self):
+        import os
+        import pstats
+        profiler = self._makeOne()
+        request = DummyRequest()
+        request.view_name = 'edit'
+        def handle(request):
+            return profiled_function(request)
+        self.assertEqual(profiler.profile(handle, request), 'edit')
+        self.assertEqual(profiler.profile(handle, request), 'edit')
+        other = DummyRequest()
+        profiler.profile(handle, other)
+        profiler.flush()
+        filename = profiler.filename('view-edit')
+        self.assertEqual(
+            sorted(os.listdir(self.tempdir)),
+            sorted([os.path.basename(filename),
+                    os.path.basename(profiler.filename('view-default'))]))
+        stats = pstats.Stats(filename)
+        calls = [ value[0] for key, value in stats.stats.items()
+                  if key[2] == 'profiled_function' ]
+        self.assertEqual(calls, [2])
+
+    def test_profile_records_on_error(self):
+        profiler = self._makeOne()
+        request = DummyRequest()
+        def handle(request):
+            raise RuntimeError
+        self.assertRaises(RuntimeError, profiler.profile, handle, request)
+        self.assertEqual(profiler.stats.keys(), ['view-default'])
+
+    def test_add_write_error_ignored(self):
+        import os
+        profiler = self._makeOne()
+        def handle(request):
+            return 'OK'
+        profiler.directory = os.path.join(self.tempdir, 'missing')
+        self.assertEqual(profiler.profile(handle, DummyRequest()), 'OK')
+        self.assertEqual(os.listdir(self.tempdir), [])
+        self.assertEqual(profiler.dirty, set(['view-default']))
+
+    def test_add_writes_once_per_interval(self):
+        import os
+        profiler = self._makeOne()
+        now = [1000]
+        profiler.timer = lambda: now[0]
+        profiler.write_interval = 10
+        written = []
+        def write(tag, stats):
+            written.append(tag)
+        profiler.write = write
+        def handle(request):
+            return 'OK'
+        profiler.profile(handle, DummyRequest())
+        self.assertEqual(written, ['view-default'])
+        now[0] = 1005
+        profiler.profile(handle, DummyRequest())
+        self.assertEqual(written, ['view-default'])
+        self.assertEqual(profiler.dirty, set(['view-default']))
+        now[0] = 1010
+        profiler.profile(handle, DummyRequest())
+        self.assertEqual(written, ['view-default'] * 2)
+        self.assertEqual(profiler.dirty, set())
+
+    def test_flush_nonblocking_while_writing(self):
+        profiler = self._makeOne()
+        profiler.dirty.add('view-default')
+        profiler.write_lock.acquire()
+        try:
+            profiler.flush(blocking=False)
+        finally:
+            profiler.write_lock.release()
+        self.assertEqual(profiler.dirty, set(['view-default']))
+        profiler.dirty.clear()
+
+    def test_flush_writes_snapshot(self):
+        import pstats
+        profiler = self._makeOne()
+        profiler.write_interval = 1e9
+        profiler.last_write = profiler.timer()
+        def handle(request):
+            return profiled_function(request)
+        profiler.profile(handle, DummyRequest())
+        profiler.flush()
+        stats = pstats.Stats(profiler.filename('view-default'))
+        self.assertEqual(sorted(stats.stats.keys()),
+                         sorted(profiler.stats['view-default'].stats.keys()))
+        self.assertEqual(profiler.dirty, set())
+
+    def test_filename(self):
+        import os
+        profiler = self._makeOne()
+        self.assertEqual(profiler.filename('view-edit'),
+                         os.path.join(self.tempdir,
+                                      'view-edit.%d.pstats' % os.getpid()))
+
+class Test_make_request_profiler(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def _callFUT(self, settings):
+        from pyramid.profiling import make_request_profiler
+        return make_request_profiler(settings)
+
+    def test_disabled(self):
+        self.assertEqual(self._callFUT({}), None)
+        self.assertEqual(self._callFUT({'profile_requests':0}), None)
+
+    def test_enabled(self):
+        profiler = self._callFUT({'profile_requests':0.5,
+                                  'profile_directory':self.tempdir})
+        self.assertEqual(profiler.sample_rate, 0.5)
+        self.assertEqual(profiler.directory, self.tempdir)
+
+def profiled_function(request):
+    return getattr(request, 'view_name', None)
+
+class DummyRequest:
+    pass
+
+class DummyRoute:
+    def __init__(self, name):
+        self.name = name
@@ -28,6 +28,192 @@ class TestRegistry(unittest.TestCase):
                                              [IDummyEvent], Interface)
         self.assertEqual(registry.has_listeners, True)
 
+    def test_notify_multiple_events(self):
+        registry = self._makeOne()
+        L = []
+        def f(event, other):
+            L.append((event, other))
+        registry.registerHandler(f, [IDummyEvent, None])
+        event = DummyEvent()
+        registry.notify(event, 'other')
+        self.assertEqual(L, [(event, 'other')])
+
+    def test_notify_caches_handlers(self):
+        registry = self._makeOne()
+        L = []
+        def f(event):
+            L.append(event)
+        registry.registerHandler(f, [IDummyEvent])
+        event = DummyEvent()
+        registry.notify(event)
+        self.assertEqual(len(registry._handler_cache), 1)
+        registry.notify(event)
+        self.assertEqual(len(registry._handler_cache), 1)
+        self.assertEqual(L, [event, event])
+
+    def test_registerHandler_invalidates_cache(self):
+        registry = self._makeOne()
+        L = []
+        def f(event):
+            L.append(('f', event))
+        def g(event):
+            L.append(('g', event))
+        registry.registerHandler(f, [IDummyEvent])
+        event = DummyEvent()
+        registry.notify(event)
+        registry.registerHandler(g, [IDummyEvent])
+        registry.notify(event)
+        self.assertEqual(L, [('f', event), ('f', event), ('g', event)])
+
+    def test_unregisterHandler_invalidates_cache(self):
+        registry = self._makeOne()
+        L = []
+        def f(event):
+            L.append(event)
+        registry.registerHandler(f, [IDummyEvent])
+        event = DummyEvent()
+        registry.notify(event)
+        registry.unregisterHandler(f, [IDummyEvent])
+        registry.notify(event)
+        self.assertEqual(L, [event])
+
+    def test_registerSubscriptionAdapter_invalidates_cache(self):
+        from zope.interface import Interface
+        registry = self._makeOne()
+        registry.registerHandler(lambda event: None, [IDummyEvent])
+        self.assertEqual(registry.has_listeners_for(IDummyEvent), True)
+        cache = registry._handler_cache
+        registry.registerSubscriptionAdapter(DummyEvent,
+                                             [IDummyEvent], Interface)
+        self.assertEqual(registry.has_listeners_for(IDummyEvent), True)
+        self.assertFalse(registry._handler_cache is cache)
+        cache = registry._handler_cache
+        registry.unregisterSubscriptionAdapter(DummyEvent,
+                                               [IDummyEvent], Interface)
+        self.assertEqual(registry.has_listeners_for(IDummyEvent), True)
+        self.assertFalse(registry._handler_cache is cache)
+
+    def test_adapters_subscribe_invalidates_cache(self):
+        registry = self._makeOne()
+        L = []
+        registry.registerHandler(lambda event: None, [IDummyEvent])
+        event = DummyEvent()
+        registry.notify(event)
+        registry.adapters.subscribe([IDummyEvent], None, L.append)
+        registry.notify(event)
+        self.assertEqual(L, [event])
+
+    def test_base_registry_change_invalidates_cache(self):
+        base = self._makeOne()
+        registry = self._getTargetClass()('sub', (base,))
+        L = []
+        registry.registerHandler(lambda event: None, [IDummyEvent])
+        event = DummyEvent()
+        registry.notify(event)
+        base.registerHandler(L.append, [IDummyEvent])
+        registry.notify(event)
+        self.assertEqual(L, [event])
+
+    def test_has_listeners_for_no_listeners(self):
+        registry = self._makeOne()
+        self.assertEqual(registry.has_listeners_for(DummyEvent), False)
+
+    def test_has_listeners_for_class(self):
+        registry = self._makeOne()
+        registry.registerHandler(lambda event: None, [IDummyEvent])
+        self.assertEqual(registry.has_listeners_for(DummyEvent), True)
+        self.assertEqual(registry.has_listeners_for(object), False)
+
+    def test_has_listeners_for_interface(self):
+        from zope.interface import Interface
+        registry = self._makeOne()
+        registry.registerHandler(lambda event: None, [IDummyEvent])
+        self.assertEqual(registry.has_listeners_for(IDummyEvent), True)
+        self.assertEqual(registry.has_listeners_for(Interface), False)
+
+    def _registerExceptionView(self, registry, view, context):
+        from pyramid.interfaces import IExceptionViewClassifier
+        from pyramid.interfaces import IRequest
+        from pyramid.interfaces import IView
+        registry.registerAdapter(view, (IExceptionViewClassifier, IRequest,
+                                        context), IView)
+
+    def test__exception_view_for(self):
+        from pyramid.interfaces import IRequest
+        registry = self._makeOne()
+        view = lambda *arg: None
+        self._registerExceptionView(registry, view, DummyException)
+        self.assertTrue(
+            registry._exception_view_for(IRequest, DummyException()) is view)
+        self.assertEqual(registry._exception_view_for(IRequest, ValueError()),
+                         None)
+        self.assertEqual(sorted(registry._exception_view_cache.values()),
+                         sorted([None, view]))
+
+    def test__exception_view_for_cached(self):
+        from pyramid.interfaces import IRequest
+        registry = self._makeOne()
+        view = lambda *arg: None
+        self._registerExceptionView(registry, view, DummyException)
+        registry._exception_view_for(IRequest, DummyException())
+        other = lambda *arg: None
+        registry._exception_view_cache[(IRequest, DummyException)] = other
+        self.assertTrue(
+            registry._exception_view_for(IRequest, DummyException()) is other)
+
+    def test__exception_view_for_cache_cleared_by_registrations(self):
+        from pyramid.interfaces import IExceptionViewClassifier
+        from pyramid.interfaces import IRequest
+        from pyramid.interfaces import IView
+        registry = self._makeOne()
+        registry._exception_view_for(IRequest, DummyException())
+        view = lambda *arg: None
+        self._registerExceptionView(registry, view, DummyException)
+        self.assertTrue(
+            registry._exception_view_for(IRequest, DummyException()) is view)
+        registry.unregisterAdapter(view, (IExceptionViewClassifier, IRequest,
+                                          DummyException), IView)
+        self.assertEqual(
+            registry._exception_view_for(IRequest, DummyException()), None)
+
+    def test__exception_view_for_cache_cleared_by_adapters_register(self):
+        from zope.interface import implementedBy
+        from pyramid.interfaces import IExceptionViewClassifier
+        from pyramid.interfaces import IRequest
+        from pyramid.interfaces import IView
+        registry = self._makeOne()
+        registry._exception_view_for(IRequest, DummyException())
+        view = lambda *arg: None
+        registry.adapters.register(
+            (IExceptionViewClassifier, IRequest,
+             implementedBy(DummyException)), IView, '', view)
+        self.assertTrue(
+            registry._exception_view_for(IRequest, DummyException()) is view)
+
+    def test__exception_view_for_cache_cleared_by_base_registry(self):
+        from pyramid.interfaces import IRequest
+        base = self._makeOne()
+        registry = self._getTargetClass()('sub', (base,))
+        registry._exception_view_for(IRequest, DummyException())
+        view = lambda *arg: None
+        self._registerExceptionView(base, view, DummyException)
+        self.assertTrue(
+            registry._exception_view_for(IRequest, DummyException()) is view)
+
+    def test__exception_view_for_directly_provided(self):
+        from zope.interface import Interface
+        from zope.interface import directlyProvides
+        from pyramid.interfaces import IRequest
+        class IMarker(Interface):
+            pass
+        registry = self._makeOne()
+        view = lambda *arg: None
+        self._registerExceptionView(registry, view, IMarker)
+        exc = DummyException()
+        directlyProvides(exc, IMarker)
+        self.assertTrue(registry._exception_view_for(IRequest, exc) is view)
+        self.assertEqual(registry._exception_view_cache, None)
+
     def test__get_settings(self):
         registry = self._makeOne()
         registry._settings = 'foo'
@@ -38,6 +224,9 @@ class TestRegistry(unittest.TestCase):
         registry.settings = 'foo'
         self.assertEqual(registry._settings, 'foo')
 
+class DummyException(Exception):
+    pass
+
 class DummyModule:
     __path__ = "foo"
     __name__ = "dummy"
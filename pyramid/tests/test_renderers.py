@@ -60,6 +60,36 @@ class TestTemplateRendererFactory(unittest.TestCase):
         result = self._callFUT(info, None)
         self.assertTrue(result is renderer)
 
+class Test_precompile_template(unittest.TestCase):
+    def _callFUT(self, template):
+        from pyramid.renderers import precompile_template
+        return precompile_template(template)
+
+    def test_not_chameleon(self):
+        self.assertEqual(self._callFUT(object()), False)
+
+    def test_compiled_when_loaded(self):
+        from mako.template import Template
+        self.assertEqual(self._callFUT(Template('hello')), True)
+
+    def test_compiles_once(self):
+        template = DummyChameleonTemplate()
+        self.assertEqual(self._callFUT(template), True)
+        self.assertEqual(template.registry,
+                         {(None, True, 'sig'):('source', 'file.pt')})
+        self.assertEqual(template.locks, ['acquire', 'release'])
+        self.assertEqual(self._callFUT(template), True)
+        self.assertEqual(template.compiled, 1)
+
+    def test_real_template(self):
+        import os
+        from pyramid.chameleon_text import PageTextTemplateFile
+        here = os.path.dirname(__file__)
+        template = PageTextTemplateFile(
+            os.path.join(here, 'fixtures', 'minimal.txt'))
+        self.assertEqual(self._callFUT(template), True)
+        self.assertTrue((None, True, template.signature) in template.registry)
+
 class TestChameleonRendererLookup(unittest.TestCase):
     def setUp(self):
         self.config = testing.setUp()
@@ -562,6 +592,26 @@ class TestRendererHelper(unittest.TestCase):
         self.assertEqual(reg.event._system, {})
         self.assertEqual(reg.event.__class__.__name__, 'BeforeRender')
 
+    def test_render_explicit_registry_no_listeners(self):
+        factory = self._registerRendererFactory()
+        class DummyRegistry(object):
+            event = None
+            def __init__(self):
+                self.responses = [factory, lambda *arg: {}, None]
+            def queryUtility(self, iface, name=None):
+                return self.responses.pop(0)
+            def has_listeners_for(self, event_type):
+                self.event_type = event_type
+                return False
+            def notify(self, event):
+                self.event = event
+        reg = DummyRegistry()
+        helper = self._makeOne('loo.foo', registry=reg)
+        result = helper.render('value', {})
+        self.assertEqual(result, ('value', {}))
+        self.assertEqual(reg.event_type.__name__, 'BeforeRender')
+        self.assertEqual(reg.event, None)
+
     def test_render_system_values_is_None(self):
         self._registerRendererFactory()
         request = Dummy()
@@ -577,6 +627,31 @@ class TestRendererHelper(unittest.TestCase):
                   }
         self.assertEqual(result, ('values', system))
 
+    def test_render_template_gets_fragment_cache(self):
+        from zope.interface import implements
+        from pyramid.interfaces import IRendererFactory
+        from pyramid.interfaces import ITemplateRenderer
+        class Renderer(object):
+            implements(ITemplateRenderer)
+            def __call__(self, *arg):
+                return arg
+        def factory(info):
+            return Renderer()
+        self.config.registry.registerUtility(factory, IRendererFactory,
+                                             name='.foo')
+        request = Dummy()
+        helper = self._makeOne('loo.foo')
+        result = helper.render('values', None, request=request)
+        fragment_cache = result[1]['fragment_cache']
+        self.assertEqual(fragment_cache.request, request)
+        self.assertEqual(fragment_cache.registry, self.config.registry)
+
+    def test_render_not_template_no_fragment_cache(self):
+        self._registerRendererFactory()
+        helper = self._makeOne('loo.foo')
+        result = helper.render('values', {}, request=Dummy())
+        self.assertFalse('fragment_cache' in result[1])
+
     def test_render_renderer_globals_factory_active(self):
         self._registerRendererFactory()
         from pyramid.interfaces import IRendererGlobalsFactory
@@ -838,3 +913,25 @@ class DummyRendererInfo(object):
     def __init__(self, kw):
         self.__dict__.update(kw)
         
+
+class DummyTemplateRegistry(dict):
+    def add(self, key, source, filename):
+        self[key] = (source, filename)
+
+class DummyChameleonTemplate:
+    signature = 'sig'
+    filename = 'file.pt'
+    compiled = 0
+    def __init__(self):
+        self.registry = DummyTemplateRegistry()
+        self.locks = []
+
+    def acquire(self):
+        self.locks.append('acquire')
+
+    def release(self):
+        self.locks.append('release')
+
+    def compiler(self, macro, global_scope):
+        self.compiled += 1
+        return 'source'
@@ -152,6 +152,100 @@ class TestRequest(unittest.TestCase):
         result = inst.resource_url(root)
         self.assertEqual(result, 'http://example.com/context/')
 
+    def test_resource_urls(self):
+        self._registerContextURL()
+        inst = self._makeOne({})
+        result = inst.resource_urls([DummyContext(), DummyContext()], 'a')
+        self.assertEqual(result, ['http://example.com/context/a',
+                                  'http://example.com/context/a'])
+
+    def _registerRouter(self):
+        from pyramid.interfaces import IRouter
+        router = DummyRouter()
+        self.config.registry.registerUtility(router, IRouter)
+        return router
+
+    def test_invoke_subrequest_path(self):
+        router = self._registerRouter()
+        inst = self._makeOne({'wsgi.url_scheme':'https',
+                              'SERVER_NAME':'example.com',
+                              'SERVER_PORT':'443',
+                              'SCRIPT_NAME':'/app',
+                              'PATH_INFO':'/page',
+                              'HTTP_COOKIE':'auth=1'})
+        inst.registry = self.config.registry
+        result = inst.invoke_subrequest('/api/news?limit=5')
+        self.assertEqual(result, 'response')
+        subrequest = router.request
+        self.assertEqual(subrequest.url,
+                         'https://example.com/app/api/news?limit=5')
+        self.assertEqual(subrequest.script_name, '/app')
+        self.assertEqual(subrequest.path_info, '/api/news')
+        self.assertEqual(subrequest.method, 'GET')
+        self.assertFalse('HTTP_COOKIE' in subrequest.environ)
+
+    def test_invoke_subrequest_request(self):
+        router = self._registerRouter()
+        inst = self._makeOne({'PATH_INFO':'/page', 'REMOTE_USER':'fred'})
+        inst.registry = self.config.registry
+        subrequest = self._getTargetClass().blank('/api', POST={'a':'1'})
+        result = inst.invoke_subrequest(subrequest)
+        self.assertEqual(result, 'response')
+        self.assertTrue(router.request is subrequest)
+        self.assertFalse('REMOTE_USER' in subrequest.environ)
+
+    def test_invoke_subrequest_share_credentials(self):
+        router = self._registerRouter()
+        inst = self._makeOne({'PATH_INFO':'/page',
+                              'SERVER_NAME':'example.com',
+                              'SERVER_PORT':'80',
+                              'HTTP_COOKIE':'auth=1',
+                              'HTTP_AUTHORIZATION':'Basic Zm9vOmJhcg==',
+                              'REMOTE_USER':'fred',
+                              'repoze.who.identity':{'login':'fred'},
+                              'HTTP_ACCEPT':'text/html'})
+        inst.registry = self.config.registry
+        subrequest = self._getTargetClass().blank(
+            '/api', headers={'Authorization':'Basic other'})
+        inst.invoke_subrequest(subrequest, share_credentials=True)
+        environ = router.request.environ
+        self.assertEqual(environ['HTTP_COOKIE'], 'auth=1')
+        self.assertEqual(environ['HTTP_AUTHORIZATION'], 'Basic other')
+        self.assertEqual(environ['REMOTE_USER'], 'fred')
+        self.assertEqual(environ['repoze.who.identity'], {'login':'fred'})
+        self.assertFalse('HTTP_ACCEPT' in environ)
+
+    def test_invoke_subrequests(self):
+        router = self._registerRouter()
+        self.config.registry.settings = {'fanout_threads':0}
+        inst = self._makeOne({'PATH_INFO':'/page', 'REMOTE_USER':'fred'})
+        inst.registry = self.config.registry
+        subrequest = self._getTargetClass().blank('/api')
+        results = inst.invoke_subrequests([subrequest],
+                                          share_credentials=True)
+        self.assertEqual([ result.get() for result in results ],
+                         ['response'])
+        self.assertTrue(router.request is subrequest)
+        self.assertEqual(subrequest.environ['REMOTE_USER'], 'fred')
+
+    def test_invoke_subrequest_no_router_registered(self):
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.interfaces import IView
+        from pyramid.interfaces import IRequest
+        from zope.interface import Interface
+        from pyramid.response import Response
+        def view(context, request):
+            return Response(request.path_info)
+        self.config.registry.registerAdapter(
+            view, (IViewClassifier, IRequest, Interface), IView, name='sub')
+        inst = self._makeOne({'PATH_INFO':'/page',
+                              'wsgi.url_scheme':'http',
+                              'SERVER_NAME':'example.com',
+                              'SERVER_PORT':'80'})
+        inst.registry = self.config.registry
+        response = inst.invoke_subrequest('/sub')
+        self.assertEqual(response.body, '/sub')
+
     def test_route_url(self):
         environ = {
             'PATH_INFO':'/',
@@ -405,6 +499,47 @@ class Test_call_app_with_subpath_as_path_info(unittest.TestCase):
         self.assertEqual(request.environ['SCRIPT_NAME'], '/' + la)
         self.assertEqual(request.environ['PATH_INFO'], '/' + la)
 
+class Test_call_app_with_subpath_as_path_info_stream(unittest.TestCase):
+    def _callFUT(self, request, app):
+        from pyramid.request import call_app_with_subpath_as_path_info
+        return call_app_with_subpath_as_path_info(request, app, stream=True)
+
+    def _makeRequest(self, path, body):
+        from pyramid.request import Request
+        request = Request.blank(path, POST=body)
+        request.subpath = (u'upload',)
+        return request
+
+    def _makeApp(self):
+        def app(environ, start_response):
+            app.environ = environ
+            app.body = environ['wsgi.input'].read(
+                int(environ['CONTENT_LENGTH']))
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return ['OK']
+        return app
+
+    def test_it_shares_wsgi_input(self):
+        request = self._makeRequest('/script/upload', 'abc')
+        body_file = request.environ['wsgi.input']
+        app = self._makeApp()
+        response = self._callFUT(request, app)
+        self.assertEqual(response.body, 'OK')
+        self.assertTrue(app.environ['wsgi.input'] is body_file)
+        self.assertEqual(app.body, 'abc')
+        self.assertEqual(app.environ['SCRIPT_NAME'], '/script')
+        self.assertEqual(app.environ['PATH_INFO'], '/upload')
+        self.assertEqual(request.environ['SCRIPT_NAME'], '')
+        self.assertEqual(request.environ['PATH_INFO'], '/script/upload')
+
+    def test_it_rewinds_seekable_body(self):
+        request = self._makeRequest('/script/upload', 'abc')
+        self.assertEqual(request.body, 'abc')
+        self.assertTrue(request.is_body_seekable)
+        app = self._makeApp()
+        self._callFUT(request, app)
+        self.assertEqual(app.body, 'abc')
+
 class DummyRequest:
     def __init__(self, environ=None):
         if environ is None:
@@ -425,6 +560,13 @@ class DummyResponse:
     def __init__(self):
         self.headerlist = []
 
+class DummyRouter:
+    from pyramid.request import Request as request_factory
+    def invoke_subrequest(self, request):
+        self.request = request
+        return 'response'
+
+
 
 class DummyContext:
     pass
@@ -197,6 +197,81 @@ class TestRouter(unittest.TestCase):
         self.assertFalse('debug_notfound' in why[0])
         self.assertEqual(len(logger.messages), 0)
 
+    def _registerDefaultExceptionView(self):
+        from pyramid.interfaces import IExceptionResponse
+        from pyramid.interfaces import IExceptionViewClassifier
+        from pyramid.interfaces import IRequest
+        from pyramid.view import default_exceptionresponse_view
+        self._registerView(default_exceptionresponse_view, '',
+                           IExceptionViewClassifier, IRequest,
+                           IExceptionResponse)
+
+    def test_call_no_view_registered_static_error_responses(self):
+        environ = self._makeEnviron(PATH_INFO='/<script>')
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        self._registerDefaultExceptionView()
+        self._registerSettings(static_error_responses=True)
+        router = self._makeOne()
+        start_response = DummyStartResponse()
+        result = router(environ, start_response)
+        body = ''.join(result)
+        self.assertEqual(start_response.status, '404 Not Found')
+        self.assertFalse('script' in body)
+        self.assertTrue('<h1>404 Not Found</h1>' in body)
+        self.assertEqual(start_response.headers,
+                         [('Content-Length', str(len(body))),
+                          ('Content-Type', 'text/html')])
+        result = router(environ, start_response)
+        self.assertEqual(''.join(result), body)
+
+    def test_call_view_raises_forbidden_static_error_responses(self):
+        from pyramid.interfaces import IRequest
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.exceptions import Forbidden
+        environ = self._makeEnviron()
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        view = DummyView(DummyResponse(),
+                         raise_exception=Forbidden('no way'))
+        self._registerView(view, '', IViewClassifier, IRequest, None)
+        self._registerDefaultExceptionView()
+        self._registerSettings(static_error_responses=True)
+        router = self._makeOne()
+        start_response = DummyStartResponse()
+        result = router(environ, start_response)
+        self.assertEqual(start_response.status, '403 Forbidden')
+        self.assertFalse('no way' in ''.join(result))
+
+    def test_call_no_view_registered_static_error_responses_false(self):
+        environ = self._makeEnviron(PATH_INFO='/missing')
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        self._registerDefaultExceptionView()
+        self._registerSettings()
+        router = self._makeOne()
+        start_response = DummyStartResponse()
+        result = router(environ, start_response)
+        self.assertEqual(start_response.status, '404 Not Found')
+        self.assertTrue('/missing' in ''.join(result))
+
+    def test_call_no_view_registered_static_error_responses_custom_view(self):
+        from pyramid.interfaces import IExceptionViewClassifier
+        from pyramid.interfaces import IRequest
+        from pyramid.exceptions import NotFound
+        environ = self._makeEnviron()
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        self._registerDefaultExceptionView()
+        response = DummyResponse()
+        self._registerView(DummyView(response), '', IExceptionViewClassifier,
+                           IRequest, NotFound)
+        self._registerSettings(static_error_responses=True)
+        router = self._makeOne()
+        start_response = DummyStartResponse()
+        result = router(environ, start_response)
+        self.assertEqual(result, response.app_iter)
+
     def test_call_no_view_registered_debug_notfound_false(self):
         from pyramid.exceptions import NotFound
         environ = self._makeEnviron()
@@ -485,6 +560,56 @@ class TestRouter(unittest.TestCase):
         self.assertEqual(response_events[0].response, response)
         self.assertEqual(result, response.app_iter)
 
+    def test_call_eventsends_only_subscribed_events(self):
+        from pyramid.interfaces import INewResponse
+        from pyramid.interfaces import IViewClassifier
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        response = DummyResponse()
+        response.app_iter = ['Hello world']
+        view = DummyView(response)
+        environ = self._makeEnviron()
+        self._registerView(view, '', IViewClassifier, None, None)
+        response_events = self._registerEventListener(INewResponse)
+        notified = []
+        def notify(*events):
+            notified.extend(events)
+        self.registry.notify = notify
+        router = self._makeOne()
+        start_response = DummyStartResponse()
+        result = router(environ, start_response)
+        self.assertEqual(len(notified), 1)
+        self.assertEqual(notified[0].__class__.__name__, 'NewResponse')
+        self.assertEqual(result, response.app_iter)
+
+    def test_call_eventsends_flags_recomputed_on_registration(self):
+        from pyramid.interfaces import INewRequest
+        from pyramid.interfaces import INewResponse
+        from pyramid.interfaces import IViewClassifier
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        response = DummyResponse()
+        response.app_iter = ['Hello world']
+        view = DummyView(response)
+        self._registerView(view, '', IViewClassifier, None, None)
+        response_events = self._registerEventListener(INewResponse)
+        router = self._makeOne()
+        self.assertEqual(router.notify_flags, None)
+        calls = []
+        has_listeners_for = self.registry.has_listeners_for
+        def wrapper(event_type):
+            calls.append(event_type)
+            return has_listeners_for(event_type)
+        self.registry.has_listeners_for = wrapper
+        router(self._makeEnviron(), DummyStartResponse())
+        router(self._makeEnviron(), DummyStartResponse())
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len(response_events), 2)
+        request_events = self._registerEventListener(INewRequest)
+        router(self._makeEnviron(), DummyStartResponse())
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(len(request_events), 1)
+
     def test_call_newrequest_evllist_exc_can_be_caught_by_exceptionview(self):
         from pyramid.interfaces import INewRequest
         from pyramid.interfaces import IExceptionViewClassifier
@@ -522,6 +647,70 @@ class TestRouter(unittest.TestCase):
         self.assertEqual(len(router.threadlocal_manager.pushed), 1)
         self.assertEqual(len(router.threadlocal_manager.popped), 1)
 
+    def test_handle_request(self):
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.request import Request
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        response = DummyResponse()
+        view = DummyView(response)
+        self._registerView(view, '', IViewClassifier, None, None)
+        router = self._makeOne()
+        router.threadlocal_manager = DummyThreadLocalManager()
+        request = Request(self._makeEnviron())
+        result = router.handle_request(request)
+        self.assertEqual(result, response)
+        self.assertEqual(request.registry, self.registry)
+        self.assertEqual(view.request, request)
+        self.assertEqual(router.threadlocal_manager.pushed, [])
+
+    def test_handle_request_nonresponse(self):
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.request import Request
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        view = DummyView('abc')
+        self._registerView(view, '', IViewClassifier, None, None)
+        router = self._makeOne()
+        request = Request(self._makeEnviron())
+        self.assertRaises(ValueError, router.handle_request, request)
+
+    def test_invoke_subrequest(self):
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.request import Request
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        response = DummyResponse()
+        view = DummyView(response)
+        self._registerView(view, '', IViewClassifier, None, None)
+        router = self._makeOne()
+        router.threadlocal_manager = DummyThreadLocalManager()
+        request = Request(self._makeEnviron())
+        finished = []
+        request.add_finished_callback(finished.append)
+        result = router.invoke_subrequest(request)
+        self.assertEqual(result, response)
+        self.assertEqual(finished, [request])
+        self.assertEqual(router.threadlocal_manager.pushed,
+                         [{'registry':self.registry, 'request':request}])
+        self.assertEqual(len(router.threadlocal_manager.popped), 1)
+
+    def test_invoke_subrequest_exception_pops_threadlocals(self):
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.request import Request
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        view = DummyView(DummyResponse(), raise_exception=RuntimeError)
+        self._registerView(view, '', IViewClassifier, None, None)
+        router = self._makeOne()
+        router.threadlocal_manager = DummyThreadLocalManager()
+        request = Request(self._makeEnviron())
+        finished = []
+        request.add_finished_callback(finished.append)
+        self.assertRaises(RuntimeError, router.invoke_subrequest, request)
+        self.assertEqual(finished, [request])
+        self.assertEqual(len(router.threadlocal_manager.popped), 1)
+
     def test_call_route_matches_and_has_factory(self):
         from pyramid.interfaces import IViewClassifier
         logger = self._registerLogger()
@@ -1026,6 +1215,293 @@ class TestRouter(unittest.TestCase):
         start_response = DummyStartResponse()
         self.assertRaises(RuntimeError, router, environ, start_response)
 
+    def _registerInstrumentationSink(self):
+        from pyramid.interfaces import IInstrumentationSink
+        sink = DummyInstrumentationSink()
+        self.registry.registerUtility(sink, IInstrumentationSink)
+        return sink
+
+    def _makeTimedOne(self):
+        router = self._makeOne()
+        ticks = iter(range(100))
+        router.timer = lambda: float(ticks.next())
+        return router
+
+    def test_call_instrumentation_route(self):
+        from pyramid.interfaces import IViewClassifier
+        sink = self._registerInstrumentationSink()
+        self._registerRouteRequest('foo')
+        self._connectRoute('foo', 'archives/:action/:article')
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        response = DummyResponse()
+        response.app_iter = ['Hello world']
+        view = DummyView(response)
+        environ = self._makeEnviron(PATH_INFO='/archives/action1/article1')
+        self._registerView(view, '', IViewClassifier, None, None)
+        router = self._makeTimedOne()
+        start_response = DummyStartResponse()
+        result = router(environ, start_response)
+        self.assertEqual(result, ['Hello world'])
+        self.assertEqual(sink.records,
+                         [('route:foo', 'route_match', 1.0),
+                          ('route:foo', 'root_factory', 1.0),
+                          ('route:foo', 'traversal', 1.0),
+                          ('route:foo', 'view', 1.0),
+                          ('route:foo', 'response', 1.0),
+                          ('route:foo', 'total', 6.0)])
+
+    def test_call_instrumentation_traversal_exception_view(self):
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.interfaces import IExceptionViewClassifier
+        from pyramid.interfaces import IRequest
+        sink = self._registerInstrumentationSink()
+        context = DummyContext()
+        self._registerTraverserFactory(context, view_name='edit')
+        response = DummyResponse()
+        exception_response = DummyResponse()
+        view = DummyView(response, raise_exception=RuntimeError)
+        exception_view = DummyView(exception_response)
+        environ = self._makeEnviron()
+        self._registerView(view, 'edit', IViewClassifier, IRequest, None)
+        self._registerView(exception_view, '', IExceptionViewClassifier,
+                           IRequest, RuntimeError)
+        router = self._makeTimedOne()
+        start_response = DummyStartResponse()
+        router(environ, start_response)
+        phases = [ (key, phase) for key, phase, elapsed in sink.records ]
+        self.assertEqual(phases,
+                         [('view:edit', 'route_match'),
+                          ('view:edit', 'root_factory'),
+                          ('view:edit', 'traversal'),
+                          ('view:edit', 'view'),
+                          ('view:edit', 'response'),
+                          ('view:edit', 'total')])
+
+    def test_call_instrumentation_records_on_error(self):
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.interfaces import IRequest
+        sink = self._registerInstrumentationSink()
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        view = DummyView(DummyResponse(), raise_exception=RuntimeError)
+        environ = self._makeEnviron()
+        self._registerView(view, '', IViewClassifier, IRequest, None)
+        router = self._makeTimedOne()
+        start_response = DummyStartResponse()
+        self.assertRaises(RuntimeError, router, environ, start_response)
+        phases = [ phase for key, phase, elapsed in sink.records ]
+        self.assertEqual(phases,
+                         ['route_match', 'root_factory', 'traversal', 'total'])
+
+    def test_call_lean_route_matches(self):
+        from pyramid.interfaces import IViewClassifier
+        self._registerSettings(lean_router=True)
+        req_iface = self._registerRouteRequest('foo')
+        self._connectRoute('foo', 'archives/:action/*traverse')
+        context = DummyContext()
+        root = {'article1':context}
+        self._registerRootFactory(root)
+        response = DummyResponse()
+        response.app_iter = ['Hello world']
+        view = DummyView(response)
+        environ = self._makeEnviron(PATH_INFO='/archives/action1/article1')
+        self._registerView(view, '', IViewClassifier, req_iface, None)
+        router = self._makeOne()
+        self.assertFalse(router.lookup_traverser)
+        start_response = DummyStartResponse()
+        result = router(environ, start_response)
+        self.assertEqual(result, ['Hello world'])
+        request = view.request
+        self.assertEqual(request.context, context)
+        self.assertEqual(request.matchdict,
+                         {'action':'action1', 'traverse':('article1',)})
+        self.assertEqual(request.matched_route.name, 'foo')
+        self.assertFalse('bfg.routes.route' in environ)
+        self.assertFalse('bfg.routes.matchdict' in environ)
+
+    def test_call_lean_no_routes_skips_mapper(self):
+        from pyramid.interfaces import IRoutesMapper
+        from pyramid.interfaces import IViewClassifier
+        self._registerSettings(lean_router=True)
+        mapper = DummyRoutesMapper()
+        self.registry.registerUtility(mapper, IRoutesMapper)
+        response = DummyResponse()
+        response.app_iter = ['Hello world']
+        view = DummyView(response)
+        self._registerView(view, '', IViewClassifier, None, None)
+        self._registerRootFactory(None)
+        router = self._makeOne()
+        self.assertFalse(router.match_routes)
+        start_response = DummyStartResponse()
+        result = router(self._makeEnviron(), start_response)
+        self.assertEqual(result, ['Hello world'])
+        self.assertEqual(mapper.called, 0)
+
+    def test_call_lean_custom_traverser(self):
+        from pyramid.interfaces import IViewClassifier
+        self._registerSettings(lean_router=True)
+        context = DummyContext()
+        self._registerTraverserFactory(context, view_name='edit')
+        response = DummyResponse()
+        response.app_iter = ['Hello world']
+        view = DummyView(response)
+        self._registerView(view, 'edit', IViewClassifier, None, None)
+        router = self._makeOne()
+        self.assertTrue(router.lookup_traverser)
+        start_response = DummyStartResponse()
+        result = router(self._makeEnviron(), start_response)
+        self.assertEqual(result, ['Hello world'])
+        self.assertEqual(view.request.context, context)
+
+    def test_call_lean_events_decided_at_creation(self):
+        from pyramid.interfaces import INewRequest
+        from pyramid.interfaces import INewResponse
+        from pyramid.interfaces import IViewClassifier
+        self._registerSettings(lean_router=True)
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        response = DummyResponse()
+        response.app_iter = ['Hello world']
+        view = DummyView(response)
+        self._registerView(view, '', IViewClassifier, None, None)
+        response_events = self._registerEventListener(INewResponse)
+        router = self._makeOne()
+        self.assertEqual(router.notify_flags, (False, False, True))
+        request_events = self._registerEventListener(INewRequest)
+        start_response = DummyStartResponse()
+        router(self._makeEnviron(), start_response)
+        self.assertEqual(len(response_events), 1)
+        self.assertEqual(len(request_events), 0)
+
+    def test_call_lean_exception_view_no_legacy_message(self):
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.interfaces import IExceptionViewClassifier
+        from pyramid.interfaces import IRequest
+        self._registerSettings(lean_router=True)
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        view = DummyView(DummyResponse(), raise_exception=RuntimeError)
+        exception_response = DummyResponse()
+        exception_response.app_iter = ['Hello, world']
+        exception_view = DummyView(exception_response)
+        environ = self._makeEnviron()
+        self._registerView(view, '', IViewClassifier, IRequest, None)
+        self._registerView(exception_view, '', IExceptionViewClassifier,
+                           IRequest, RuntimeError)
+        router = self._makeOne()
+        start_response = DummyStartResponse()
+        result = router(environ, start_response)
+        self.assertEqual(result, ['Hello, world'])
+        self.assertFalse('repoze.bfg.message' in environ)
+
+    def test_call_profile_requests(self):
+        import os
+        import shutil
+        import tempfile
+        from pyramid.interfaces import IViewClassifier
+        tempdir = tempfile.mkdtemp()
+        try:
+            self._registerSettings(profile_requests=1,
+                                   profile_directory=tempdir)
+            self._registerRouteRequest('foo')
+            self._connectRoute('foo', 'archives/:action/:article')
+            context = DummyContext()
+            self._registerTraverserFactory(context, view_name='edit')
+            response = DummyResponse()
+            response.app_iter = ['Hello world']
+            view = DummyView(response)
+            environ = self._makeEnviron(PATH_INFO='/archives/action1/article1')
+            self._registerView(view, 'edit', IViewClassifier, None, None)
+            router = self._makeOne()
+            start_response = DummyStartResponse()
+            result = router(environ, start_response)
+            self.assertEqual(result, ['Hello world'])
+            self.assertEqual(os.listdir(tempdir),
+                             ['route-foo.view-edit.%d.pstats' % os.getpid()])
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_call_profile_requests_not_sampled(self):
+        from pyramid.interfaces import IViewClassifier
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        response = DummyResponse()
+        response.app_iter = ['Hello world']
+        view = DummyView(response)
+        self._registerView(view, '', IViewClassifier, None, None)
+        router = self._makeOne()
+        profiler = DummyRequestProfiler()
+        router.request_profiler = profiler
+        start_response = DummyStartResponse()
+        result = router(self._makeEnviron(), start_response)
+        self.assertEqual(result, ['Hello world'])
+        self.assertEqual(profiler.profiled, [])
+
+    def test_call_compress_responses(self):
+        import zlib
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.response import Response
+        self._registerSettings(compress_responses=True, compress_min_size=0)
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        response = Response('Hello world')
+        view = DummyView(response)
+        self._registerView(view, '', IViewClassifier, None, None)
+        router = self._makeOne()
+        self.assertEqual(router.response_compressor.min_size, 0)
+        start_response = DummyStartResponse()
+        environ = self._makeEnviron(HTTP_ACCEPT_ENCODING='deflate')
+        result = router(environ, start_response)
+        self.assertEqual(zlib.decompress(''.join(result)), 'Hello world')
+        headers = dict(start_response.headers)
+        self.assertEqual(headers['Content-Encoding'], 'deflate')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+
+    def test_call_compress_responses_disabled(self):
+        from pyramid.interfaces import IViewClassifier
+        from pyramid.response import Response
+        self._registerSettings(compress_min_size=0)
+        context = DummyContext()
+        self._registerTraverserFactory(context)
+        response = Response('Hello world')
+        view = DummyView(response)
+        self._registerView(view, '', IViewClassifier, None, None)
+        router = self._makeOne()
+        self.assertEqual(router.response_compressor, None)
+        start_response = DummyStartResponse()
+        environ = self._makeEnviron(HTTP_ACCEPT_ENCODING='gzip')
+        result = router(environ, start_response)
+        self.assertEqual(result, ['Hello world'])
+        headers = dict(start_response.headers)
+        self.assertFalse('Content-Encoding' in headers)
+
+class DummyRoutesMapper:
+    called = 0
+    def has_routes(self):
+        return False
+
+    def __call__(self, request): # pragma: no cover
+        self.called += 1
+
+class DummyRequestProfiler:
+    def __init__(self):
+        self.profiled = []
+
+    def sample(self):
+        return False
+
+    def profile(self, func, request): # pragma: no cover
+        self.profiled.append(request)
+        return func(request)
+
+class DummyInstrumentationSink:
+    def __init__(self):
+        self.records = []
+
+    def record(self, key, phase, elapsed):
+        self.records.append((key, phase, elapsed))
+
 class DummyContext:
     pass
 
@@ -0,0 +1,231 @@
+import unittest
+
+class TestScanCache(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def _makeOne(self, name='scan.json'):
+        import os
+        from pyramid.scan import ScanCache
+        return ScanCache(os.path.join(self.tempdir, name))
+
+    def test_get_no_file(self):
+        cache = self._makeOne()
+        self.assertEqual(cache.get('pkg:*'), None)
+
+    def test_set_and_get_roundtrip(self):
+        cache = self._makeOne()
+        cache.set('pkg:*', {'pkg':[[1.5, 10], ['view']]})
+        cache = self._makeOne()
+        self.assertEqual(cache.get('pkg:*'), {'pkg':[[1.5, 10], ['view']]})
+
+    def test_get_corrupt_file(self):
+        cache = self._makeOne()
+        f = open(cache.path, 'wb')
+        f.write('{not json')
+        f.close()
+        self.assertEqual(cache.get('pkg:*'), None)
+
+    def test_get_other_version(self):
+        from pyramid.compat import json
+        cache = self._makeOne()
+        f = open(cache.path, 'wb')
+        json.dump({'version':0, 'scans':{'pkg:*':{}}}, f)
+        f.close()
+        self.assertEqual(cache.get('pkg:*'), None)
+
+    def test_save_leaves_no_tempfiles(self):
+        import os
+        cache = self._makeOne()
+        cache.set('pkg:*', {})
+        cache.set('pkg:*', {'pkg':[None, []]})
+        self.assertEqual(os.listdir(self.tempdir), ['scan.json'])
+
+class TestCachingScanner(unittest.TestCase):
+    def setUp(self):
+        import sys
+        import tempfile
+        from pyramid.testing import cleanUp
+        cleanUp()
+        self.tempdir = tempfile.mkdtemp()
+        sys.path.insert(0, self.tempdir)
+
+    def tearDown(self):
+        import shutil
+        import sys
+        from pyramid.testing import cleanUp
+        cleanUp()
+        sys.path.remove(self.tempdir)
+        for name in sys.modules.keys():
+            if name.startswith('scancachepkg'):
+                del sys.modules[name]
+        shutil.rmtree(self.tempdir)
+
+    def _makeCache(self):
+        import os
+        from pyramid.scan import ScanCache
+        class DummyScanCache(ScanCache):
+            stored = 0
+            def set(self, key, modules):
+                self.stored += 1
+                ScanCache.set(self, key, modules)
+        return DummyScanCache(os.path.join(self.tempdir, 'scan.json'))
+
+    def _makeOne(self, cache, config):
+        from pyramid.scan import CachingScanner
+        return CachingScanner(config=config, cache=cache)
+
+    def _makeConfig(self):
+        from pyramid.config import Configurator
+        return Configurator(autocommit=True)
+
+    def _makePackage(self):
+        import os
+        pkgdir = os.path.join(self.tempdir, 'scancachepkg')
+        os.mkdir(pkgdir)
+        f = open(os.path.join(pkgdir, '__init__.py'), 'w')
+        f.write('')
+        f.close()
+        f = open(os.path.join(pkgdir, 'plain.py'), 'w')
+        f.write('x = 1\n')
+        f.close()
+        f = open(os.path.join(pkgdir, 'views.py'), 'w')
+        f.write('from pyramid.view import view_config\n'
+                '@view_config(name="cached")\n'
+                'def cached(request):\n'
+                '    return "cached"\n')
+        f.close()
+        import scancachepkg
+        return scancachepkg
+
+    def _render(self, config, name):
+        from zope.interface import alsoProvides
+        from pyramid.interfaces import IRequest
+        from pyramid.view import render_view_to_response
+        request = DummyRequest()
+        alsoProvides(request, IRequest)
+        request.registry = config.registry
+        return render_view_to_response(None, request, name)
+
+    def test_scan_records_and_replays(self):
+        import pyramid.tests.grokkedapp as package
+        cache = self._makeCache()
+        config = self._makeConfig()
+        self._makeOne(cache, config).scan(package)
+        self.assertEqual(cache.stored, 1)
+        self.assertEqual(self._render(config, 'another'), 'another_grokked')
+        recorded = cache.get('pyramid.tests.grokkedapp:*')
+        self.assertTrue('grokked_post' in
+                        recorded['pyramid.tests.grokkedapp'][1])
+        self.assertEqual(
+            recorded['pyramid.tests.grokkedapp.subpackage.notinit'][1],
+            ['subpackage_notinit'])
+        self.failIf('pyramid.tests.grokkedapp.pod.notinit' in recorded)
+
+        config = self._makeConfig()
+        self._makeOne(cache, config).scan(package)
+        self.assertEqual(cache.stored, 1)
+        self.assertEqual(self._render(config, 'another'), 'another_grokked')
+        self.assertEqual(self._render(config, 'subsubpackage_init'),
+                         'subsubpackage_init')
+
+    def test_scan_replay_does_not_import_undecorated_modules(self):
+        import sys
+        package = self._makePackage()
+        cache = self._makeCache()
+        self._makeOne(cache, self._makeConfig()).scan(package)
+        recorded = cache.get('scancachepkg:*')
+        self.assertEqual(recorded['scancachepkg.plain'][1], [])
+        self.assertEqual(recorded['scancachepkg.views'][1], ['cached'])
+        del sys.modules['scancachepkg.plain']
+        config = self._makeConfig()
+        self._makeOne(cache, config).scan(package)
+        self.failIf('scancachepkg.plain' in sys.modules)
+        self.assertEqual(self._render(config, 'cached'), 'cached')
+
+    def test_scan_changed_module_is_rescanned(self):
+        import os
+        package = self._makePackage()
+        cache = self._makeCache()
+        self._makeOne(cache, self._makeConfig()).scan(package)
+        f = open(os.path.join(self.tempdir, 'scancachepkg', 'plain.py'), 'w')
+        f.write('x = 12\n')
+        f.close()
+        self._makeOne(cache, self._makeConfig()).scan(package)
+        self.assertEqual(cache.stored, 2)
+        recorded = cache.get('scancachepkg:*')
+        self.assertEqual(recorded['scancachepkg.plain'][0][1], 7)
+
+    def test_scan_categories_keyed_separately(self):
+        package = self._makePackage()
+        cache = self._makeCache()
+        config = self._makeConfig()
+        self._makeOne(cache, config).scan(package, categories=('other',))
+        recorded = cache.get('scancachepkg:other')
+        self.assertEqual(recorded['scancachepkg.views'][1], [])
+        self.assertEqual(cache.get('scancachepkg:*'), None)
+        self.assertEqual(self._render(config, 'cached'), None)
+
+    def test_scan_not_on_filesystem(self):
+        L = []
+        class Module(object):
+            __name__ = 'dummy'
+            def ob(self): pass
+            ob.__venusian_callbacks__ = DummyCallbacks(L)
+        cache = self._makeCache()
+        self._makeOne(cache, None).scan(Module())
+        self.assertEqual(len(L), 1)
+        self.assertEqual(cache.stored, 0)
+
+class Test_find_modules(unittest.TestCase):
+    def _callFUT(self, package):
+        from pyramid.scan import _find_modules
+        return _find_modules(package)
+
+    def test_package(self):
+        import os
+        import pyramid.tests.grokkedapp as package
+        result = self._callFUT(package)
+        names = [ name for name, filename in result ]
+        self.assertEqual(names,
+                         ['pyramid.tests.grokkedapp',
+                          'pyramid.tests.grokkedapp.another',
+                          'pyramid.tests.grokkedapp.subpackage',
+                          'pyramid.tests.grokkedapp.subpackage.notinit',
+                          'pyramid.tests.grokkedapp.subpackage.subsubpackage',
+                          ])
+        for name, filename in result:
+            self.assertTrue(filename.endswith('.py'))
+            self.assertTrue(os.path.exists(filename))
+
+    def test_module(self):
+        import pyramid.tests.grokkedapp.another as module
+        result = self._callFUT(module)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0][0], 'pyramid.tests.grokkedapp.another')
+
+    def test_no_file(self):
+        class Module(object):
+            __name__ = 'dummy'
+        self.assertEqual(self._callFUT(Module()), None)
+
+class DummyRequest:
+    method = 'GET'
+    def __init__(self):
+        self.environ = {}
+        self.params = {}
+        self.cookies = {}
+
+class DummyCallbacks(dict):
+    def __init__(self, L):
+        def callback(scanner, name, ob):
+            L.append((scanner, name, ob))
+        self['pyramid'] = [callback]
+
+    def attached_to(self, ob):
+        return True
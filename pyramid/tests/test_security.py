@@ -309,6 +309,40 @@ class TestPrincipalsAllowedByPermission(unittest.TestCase):
         result = self._callFUT(context, 'view')
         self.assertEqual(result, 'yo')
 
+class TestBulkPrincipalsAllowedByPermission(unittest.TestCase):
+    def setUp(self):
+        cleanUp()
+        
+    def tearDown(self):
+        cleanUp()
+
+    def _callFUT(self, *arg):
+        from pyramid.security import bulk_principals_allowed_by_permission
+        return bulk_principals_allowed_by_permission(*arg)
+
+    def test_no_authorization_policy(self):
+        from pyramid.security import Everyone
+        result = self._callFUT([DummyContext(), DummyContext()], 'view')
+        self.assertEqual(result, [[Everyone], [Everyone]])
+
+    def test_with_authorization_policy(self):
+        from pyramid.threadlocal import get_current_registry
+        registry = get_current_registry()
+        _registerAuthorizationPolicy(registry, 'yo')
+        result = self._callFUT([DummyContext(), DummyContext()], 'view')
+        self.assertEqual(result, ['yo', 'yo'])
+
+    def test_with_bulk_authorization_policy(self):
+        from pyramid.threadlocal import get_current_registry
+        from pyramid.interfaces import IAuthorizationPolicy
+        registry = get_current_registry()
+        policy = DummyBulkAuthorizationPolicy('yo')
+        registry.registerUtility(policy, IAuthorizationPolicy)
+        contexts = [DummyContext(), DummyContext()]
+        result = self._callFUT(contexts, 'view')
+        self.assertEqual(result, ['yo', 'yo'])
+        self.assertEqual(policy.called, (contexts, 'view'))
+
 class TestRemember(unittest.TestCase):
     def setUp(self):
         cleanUp()
@@ -407,6 +441,11 @@ class DummyAuthorizationPolicy:
     def principals_allowed_by_permission(self, context, permission):
         return self.result
 
+class DummyBulkAuthorizationPolicy(DummyAuthorizationPolicy):
+    def bulk_principals_allowed_by_permission(self, contexts, permission):
+        self.called = contexts, permission
+        return [ self.result for context in contexts ]
+
 def _registerAuthenticationPolicy(reg, result):
     from pyramid.interfaces import IAuthenticationPolicy
     policy = DummyAuthenticationPolicy(result)
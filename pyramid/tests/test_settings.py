@@ -219,6 +219,150 @@ class TestSettings(unittest.TestCase):
                              {'PYRAMID_DEFAULT_LOCALE_NAME':'abc'})
         self.assertEqual(result['default_locale_name'], 'abc')
 
+    def test_profile_startup(self):
+        result = self._makeOne({})
+        self.assertEqual(result['profile_startup'], False)
+        result = self._makeOne({'profile_startup':'false'})
+        self.assertEqual(result['profile_startup'], False)
+        result = self._makeOne({'profile_startup':'t'})
+        self.assertEqual(result['profile_startup'], True)
+        result = self._makeOne({}, {'PYRAMID_PROFILE_STARTUP':'1'})
+        self.assertEqual(result['profile_startup'], True)
+        result = self._makeOne({'profile_startup':'false'},
+                             {'PYRAMID_PROFILE_STARTUP':'1'})
+        self.assertEqual(result['profile_startup'], True)
+
+    def test_lean_router(self):
+        result = self._makeOne({})
+        self.assertEqual(result['lean_router'], False)
+        result = self._makeOne({'lean_router':'false'})
+        self.assertEqual(result['lean_router'], False)
+        result = self._makeOne({'lean_router':'t'})
+        self.assertEqual(result['lean_router'], True)
+        result = self._makeOne({}, {'PYRAMID_LEAN_ROUTER':'1'})
+        self.assertEqual(result['lean_router'], True)
+        result = self._makeOne({'lean_router':'false'},
+                             {'PYRAMID_LEAN_ROUTER':'1'})
+        self.assertEqual(result['lean_router'], True)
+
+    def test_warm_templates(self):
+        result = self._makeOne({})
+        self.assertEqual(result['warm_templates'], False)
+        result = self._makeOne({'warm_templates':'false'})
+        self.assertEqual(result['warm_templates'], False)
+        result = self._makeOne({'warm_templates':'t'})
+        self.assertEqual(result['warm_templates'], True)
+        result = self._makeOne({}, {'PYRAMID_WARM_TEMPLATES':'1'})
+        self.assertEqual(result['warm_templates'], True)
+        result = self._makeOne({'warm_templates':'false'},
+                             {'PYRAMID_WARM_TEMPLATES':'1'})
+        self.assertEqual(result['warm_templates'], True)
+
+    def test_static_error_responses(self):
+        result = self._makeOne({})
+        self.assertEqual(result['static_error_responses'], False)
+        result = self._makeOne({'static_error_responses':'false'})
+        self.assertEqual(result['static_error_responses'], False)
+        result = self._makeOne({'static_error_responses':'t'})
+        self.assertEqual(result['static_error_responses'], True)
+        result = self._makeOne({}, {'PYRAMID_STATIC_ERROR_RESPONSES':'1'})
+        self.assertEqual(result['static_error_responses'], True)
+        result = self._makeOne({'static_error_responses':'false'},
+                             {'PYRAMID_STATIC_ERROR_RESPONSES':'1'})
+        self.assertEqual(result['static_error_responses'], True)
+
+    def test_compress_responses(self):
+        result = self._makeOne({})
+        self.assertEqual(result['compress_responses'], False)
+        result = self._makeOne({'compress_responses':'false'})
+        self.assertEqual(result['compress_responses'], False)
+        result = self._makeOne({'compress_responses':'t'})
+        self.assertEqual(result['compress_responses'], True)
+        result = self._makeOne({}, {'PYRAMID_COMPRESS_RESPONSES':'1'})
+        self.assertEqual(result['compress_responses'], True)
+        result = self._makeOne({'compress_responses':'false'},
+                             {'PYRAMID_COMPRESS_RESPONSES':'1'})
+        self.assertEqual(result['compress_responses'], True)
+
+    def test_compress_level(self):
+        result = self._makeOne({})
+        self.assertEqual(result['compress_level'], 6)
+        result = self._makeOne({'compress_level':'9'})
+        self.assertEqual(result['compress_level'], 9)
+        result = self._makeOne({}, {'PYRAMID_COMPRESS_LEVEL':'1'})
+        self.assertEqual(result['compress_level'], 1)
+        result = self._makeOne({'compress_level':'9'},
+                             {'PYRAMID_COMPRESS_LEVEL':'2'})
+        self.assertEqual(result['compress_level'], 2)
+
+    def test_compress_min_size(self):
+        result = self._makeOne({})
+        self.assertEqual(result['compress_min_size'], 256)
+        result = self._makeOne({'compress_min_size':'1024'})
+        self.assertEqual(result['compress_min_size'], 1024)
+        result = self._makeOne({}, {'PYRAMID_COMPRESS_MIN_SIZE':'0'})
+        self.assertEqual(result['compress_min_size'], 0)
+        result = self._makeOne({'compress_min_size':'1024'},
+                             {'PYRAMID_COMPRESS_MIN_SIZE':'128'})
+        self.assertEqual(result['compress_min_size'], 128)
+
+    def test_cache_resource_paths(self):
+        result = self._makeOne({})
+        self.assertEqual(result['cache_resource_paths'], False)
+        result = self._makeOne({'cache_resource_paths':'false'})
+        self.assertEqual(result['cache_resource_paths'], False)
+        result = self._makeOne({'cache_resource_paths':'t'})
+        self.assertEqual(result['cache_resource_paths'], True)
+        result = self._makeOne({}, {'PYRAMID_CACHE_RESOURCE_PATHS':'1'})
+        self.assertEqual(result['cache_resource_paths'], True)
+        result = self._makeOne({'cache_resource_paths':'false'},
+                             {'PYRAMID_CACHE_RESOURCE_PATHS':'1'})
+        self.assertEqual(result['cache_resource_paths'], True)
+
+    def test_fanout_threads(self):
+        result = self._makeOne({})
+        self.assertEqual(result['fanout_threads'], 4)
+        result = self._makeOne({'fanout_threads':'8'})
+        self.assertEqual(result['fanout_threads'], 8)
+        result = self._makeOne({}, {'PYRAMID_FANOUT_THREADS':'0'})
+        self.assertEqual(result['fanout_threads'], 0)
+        result = self._makeOne({'fanout_threads':'8'},
+                             {'PYRAMID_FANOUT_THREADS':'2'})
+        self.assertEqual(result['fanout_threads'], 2)
+
+    def test_profile_requests(self):
+        result = self._makeOne({})
+        self.assertEqual(result['profile_requests'], 0)
+        result = self._makeOne({'profile_requests':'0.5'})
+        self.assertEqual(result['profile_requests'], 0.5)
+        result = self._makeOne({}, {'PYRAMID_PROFILE_REQUESTS':'0.25'})
+        self.assertEqual(result['profile_requests'], 0.25)
+        result = self._makeOne({'profile_requests':'0.5'},
+                               {'PYRAMID_PROFILE_REQUESTS':''})
+        self.assertEqual(result['profile_requests'], 0)
+
+    def test_profile_directory(self):
+        result = self._makeOne({})
+        self.assertEqual(result['profile_directory'], '')
+        result = self._makeOne({'profile_directory':'/tmp/profiles'})
+        self.assertEqual(result['profile_directory'], '/tmp/profiles')
+        result = self._makeOne({}, {'PYRAMID_PROFILE_DIRECTORY':'/tmp/env'})
+        self.assertEqual(result['profile_directory'], '/tmp/env')
+        result = self._makeOne({'profile_directory':'/tmp/profiles'},
+                               {'PYRAMID_PROFILE_DIRECTORY':'/tmp/env'})
+        self.assertEqual(result['profile_directory'], '/tmp/env')
+
+    def test_scan_cache(self):
+        result = self._makeOne({})
+        self.assertEqual(result['scan_cache'], '')
+        result = self._makeOne({'scan_cache':'/tmp/scan.json'})
+        self.assertEqual(result['scan_cache'], '/tmp/scan.json')
+        result = self._makeOne({}, {'PYRAMID_SCAN_CACHE':'/tmp/env.json'})
+        self.assertEqual(result['scan_cache'], '/tmp/env.json')
+        result = self._makeOne({'scan_cache':'/tmp/scan.json'},
+                               {'PYRAMID_SCAN_CACHE':'/tmp/env.json'})
+        self.assertEqual(result['scan_cache'], '/tmp/env.json')
+
     def test_originals_kept(self):
         result = self._makeOne({'a':'i am so a'})
         self.assertEqual(result['a'], 'i am so a')
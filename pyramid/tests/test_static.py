@@ -182,6 +182,174 @@ class TestPackageURLParser(unittest.TestCase):
         self.assertTrue('404 Not Found' in body)
         self.assertEqual(sr.status, '404 Not Found')
 
+class TestPrecompressedFileApp(unittest.TestCase):
+    def setUp(self):
+        import os
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'foo.css')
+        self._write(self.filename, 'body {}')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def _write(self, filename, data, mtime=None):
+        import os
+        f = open(filename, 'wb')
+        try:
+            f.write(data)
+        finally:
+            f.close()
+        if mtime is not None:
+            os.utime(filename, (mtime, mtime))
+
+    def _writeVariant(self, mtime=None):
+        import gzip
+        import os
+        f = gzip.open(self.filename + '.gz', 'wb')
+        try:
+            f.write('body {}')
+        finally:
+            f.close()
+        if mtime is None:
+            mtime = os.stat(self.filename).st_mtime + 1
+        os.utime(self.filename + '.gz', (mtime, mtime))
+
+    def _makeOne(self):
+        from pyramid.static import PrecompressedFileApp
+        return PrecompressedFileApp(self.filename)
+
+    def _makeEnviron(self, **kw):
+        environ = {
+            'wsgi.url_scheme':'http',
+            'wsgi.version':(1,0),
+            'SERVER_NAME':'example.com',
+            'SERVER_PORT':'6543',
+            'PATH_INFO':'/foo.css',
+            'SCRIPT_NAME':'',
+            'REQUEST_METHOD':'GET',
+            }
+        environ.update(kw)
+        return environ
+
+    def _callApp(self, app, environ):
+        sr = DummyStartResponse()
+        result = app(environ, sr)
+        body = ''.join(result)
+        close = getattr(result, 'close', None)
+        if close is not None:
+            close()
+        return sr, body
+
+    def test_no_variant(self):
+        app = self._makeOne()
+        self.assertEqual(app.variant(), None)
+        sr, body = self._callApp(
+            app, self._makeEnviron(HTTP_ACCEPT_ENCODING='gzip'))
+        headers = dict(sr.headerlist)
+        self.assertEqual(body, 'body {}')
+        self.assertEqual(headers['Content-Type'], 'text/css')
+        self.assertFalse('Content-Encoding' in headers)
+        self.assertFalse('Vary' in headers)
+
+    def test_variant_accepted(self):
+        import gzip
+        from StringIO import StringIO
+        self._writeVariant()
+        app = self._makeOne()
+        self.assertEqual(app.variant(), self.filename + '.gz')
+        sr, body = self._callApp(
+            app, self._makeEnviron(HTTP_ACCEPT_ENCODING='deflate, gzip'))
+        headers = dict(sr.headerlist)
+        self.assertEqual(gzip.GzipFile(fileobj=StringIO(body)).read(),
+                         'body {}')
+        self.assertEqual(headers['Content-Type'], 'text/css')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+
+    def test_variant_not_accepted(self):
+        self._writeVariant()
+        app = self._makeOne()
+        sr, body = self._callApp(
+            app, self._makeEnviron(HTTP_ACCEPT_ENCODING='gzip;q=0'))
+        headers = dict(sr.headerlist)
+        self.assertEqual(body, 'body {}')
+        self.assertFalse('Content-Encoding' in headers)
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+
+    def test_variant_stale(self):
+        import os
+        self._writeVariant(mtime=os.stat(self.filename).st_mtime - 10)
+        app = self._makeOne()
+        self.assertEqual(app.variant(), None)
+        sr, body = self._callApp(
+            app, self._makeEnviron(HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(body, 'body {}')
+
+    def test_if_none_match_strong(self):
+        app = self._makeOne()
+        sr, body = self._callApp(app, self._makeEnviron())
+        etag = dict(sr.headerlist)['ETag']
+        sr, body = self._callApp(
+            app, self._makeEnviron(HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(sr.status, '304 Not Modified')
+
+    def test_if_none_match_weak(self):
+        app = self._makeOne()
+        sr, body = self._callApp(app, self._makeEnviron())
+        etag = dict(sr.headerlist)['ETag']
+        environ = self._makeEnviron(HTTP_IF_NONE_MATCH='"other", W/' + etag)
+        sr, body = self._callApp(app, environ)
+        self.assertEqual(sr.status, '304 Not Modified')
+        self.assertEqual(environ['HTTP_IF_NONE_MATCH'], '"other", W/' + etag)
+
+    def test_if_none_match_weak_not_matching(self):
+        app = self._makeOne()
+        sr, body = self._callApp(
+            app, self._makeEnviron(HTTP_IF_NONE_MATCH='W/"other"'))
+        self.assertEqual(sr.status, '200 OK')
+        self.assertEqual(body, 'body {}')
+
+    def test_if_none_match_weak_compressed(self):
+        from pyramid.compression import ResponseCompressor
+        from pyramid.request import Request
+        self._write(self.filename, 'body {}' * 100)
+        app = self._makeOne()
+        request = Request.blank('/foo.css', headers={'Accept-Encoding':'gzip'})
+        response = ResponseCompressor(min_size=0)(request,
+                                                  request.get_response(app))
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        request = Request.blank('/foo.css', headers={'Accept-Encoding':'gzip',
+                                                     'If-None-Match':etag})
+        response = request.get_response(app)
+        self.assertEqual(response.status_int, 304)
+
+    def test_cache_control(self):
+        app = self._makeOne()
+        self.assertEqual(app.cache_control(max_age=100), app)
+        sr, body = self._callApp(app, self._makeEnviron())
+        headers = dict(sr.headerlist)
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=100')
+
+class TestStaticURLParser(unittest.TestCase):
+    def _makeOne(self, *arg, **kw):
+        from pyramid.static import StaticURLParser
+        return StaticURLParser(*arg, **kw)
+
+    def test_is_paste_static_url_parser(self):
+        from paste.urlparser import StaticURLParser
+        inst = self._makeOne('/')
+        self.assertTrue(isinstance(inst, StaticURLParser))
+
+    def test_make_app(self):
+        from pyramid.static import PrecompressedFileApp
+        inst = self._makeOne('/')
+        app = inst.make_app('/foo.css')
+        self.assertTrue(isinstance(app, PrecompressedFileApp))
+        self.assertEqual(app.filename, '/foo.css')
+
 class Test_static_view(unittest.TestCase):
     def setUp(self):
         cleanUp()
@@ -216,7 +384,7 @@ class Test_static_view(unittest.TestCase):
         request.subpath = ['__init__.py']
         request.environ = self._makeEnviron()
         response = view(context, request)
-        self.assertEqual(request.copied, True)
+        self.assertFalse(hasattr(request, 'copied'))
         self.assertEqual(response.directory, os.path.normcase(path))
 
     def test_relpath(self):
@@ -227,7 +395,7 @@ class Test_static_view(unittest.TestCase):
         request.subpath = ['__init__.py']
         request.environ = self._makeEnviron()
         response = view(context, request)
-        self.assertEqual(request.copied, True)
+        self.assertFalse(hasattr(request, 'copied'))
         self.assertEqual(response.root_resource, 'fixtures')
         self.assertEqual(response.resource_name, 'fixtures')
         self.assertEqual(response.package_name, 'pyramid.tests')
@@ -240,7 +408,7 @@ class Test_static_view(unittest.TestCase):
         request.subpath = ['__init__.py']
         request.environ = self._makeEnviron()
         response = view(context, request)
-        self.assertEqual(request.copied, True)
+        self.assertFalse(hasattr(request, 'copied'))
         self.assertEqual(response.root_resource, 'fixtures')
         self.assertEqual(response.resource_name, 'fixtures')
         self.assertEqual(response.package_name, 'another')
@@ -253,7 +421,7 @@ class Test_static_view(unittest.TestCase):
         request.subpath = ['__init__.py']
         request.environ = self._makeEnviron()
         response = view(context, request)
-        self.assertEqual(request.copied, True)
+        self.assertFalse(hasattr(request, 'copied'))
         self.assertEqual(response.root_resource, 'fixtures')
         self.assertEqual(response.resource_name, 'fixtures')
         self.assertEqual(response.package_name, 'another')
@@ -267,9 +435,10 @@ class Test_static_view(unittest.TestCase):
         request.environ = self._makeEnviron(PATH_INFO='/path_info', 
                                             SCRIPT_NAME='/script_name')
         view(context, request)
-        self.assertEqual(request.copied, True)
-        self.assertEqual(request.environ['PATH_INFO'], '/')
-        self.assertEqual(request.environ['SCRIPT_NAME'],
+        self.assertFalse(hasattr(request, 'copied'))
+        subenviron = DummyRequest.subrequest.environ
+        self.assertEqual(subenviron['PATH_INFO'], '/')
+        self.assertEqual(subenviron['SCRIPT_NAME'],
                          '/script_name/path_info')
 
     def test_with_subpath_path_info_ends_with_slash(self):
@@ -279,9 +448,10 @@ class Test_static_view(unittest.TestCase):
         request.subpath = ('subpath',)
         request.environ = self._makeEnviron(PATH_INFO='/path_info/subpath/')
         view(context, request)
-        self.assertEqual(request.copied, True)
-        self.assertEqual(request.environ['PATH_INFO'], '/subpath/')
-        self.assertEqual(request.environ['SCRIPT_NAME'], '/path_info')
+        self.assertFalse(hasattr(request, 'copied'))
+        subenviron = DummyRequest.subrequest.environ
+        self.assertEqual(subenviron['PATH_INFO'], '/subpath/')
+        self.assertEqual(subenviron['SCRIPT_NAME'], '/path_info')
 
     def test_with_subpath_original_script_name_preserved(self):
         view = self._makeOne('fixtures', package_name='another')
@@ -291,9 +461,10 @@ class Test_static_view(unittest.TestCase):
         request.environ = self._makeEnviron(PATH_INFO='/path_info/subpath/',
                                             SCRIPT_NAME='/scriptname')
         view(context, request)
-        self.assertEqual(request.copied, True)
-        self.assertEqual(request.environ['PATH_INFO'], '/subpath/')
-        self.assertEqual(request.environ['SCRIPT_NAME'], 
+        self.assertFalse(hasattr(request, 'copied'))
+        subenviron = DummyRequest.subrequest.environ
+        self.assertEqual(subenviron['PATH_INFO'], '/subpath/')
+        self.assertEqual(subenviron['SCRIPT_NAME'], 
                          '/scriptname/path_info')
 
     def test_with_subpath_new_script_name_fixes_trailing_slashes(self):
@@ -303,9 +474,10 @@ class Test_static_view(unittest.TestCase):
         request.subpath = ('sub', 'path')
         request.environ = self._makeEnviron(PATH_INFO='/path_info//sub//path//')
         view(context, request)
-        self.assertEqual(request.copied, True)
-        self.assertEqual(request.environ['PATH_INFO'], '/sub/path/')
-        self.assertEqual(request.environ['SCRIPT_NAME'], '/path_info')
+        self.assertFalse(hasattr(request, 'copied'))
+        subenviron = DummyRequest.subrequest.environ
+        self.assertEqual(subenviron['PATH_INFO'], '/sub/path/')
+        self.assertEqual(subenviron['SCRIPT_NAME'], '/path_info')
 
 class TestStaticURLInfo(unittest.TestCase):
     def _getTargetClass(self):
@@ -485,6 +657,8 @@ class DummyRequest:
         self.environ = environ
         
     def get_response(self, application):
+        # the static view calls the application with a new request
+        self.__class__.subrequest = self
         return application
 
     def copy(self):
@@ -340,6 +340,17 @@ class ResourceTreeTraverserTests(unittest.TestCase):
         self.assertEqual(result['virtual_root'], resource)
         self.assertEqual(result['virtual_root_path'], ())
 
+    def test_withroute_matched_route_without_environ_keys(self):
+        resource = DummyContext()
+        traverser = self._makeOne(resource)
+        request = DummyRequest({'PATH_INFO':'/ignored'})
+        request.matched_route = object()
+        request.matchdict = {'traverse':'foo/bar'}
+        result = traverser(request)
+        self.assertEqual(result['context'], resource)
+        self.assertEqual(result['view_name'], 'foo')
+        self.assertEqual(result['subpath'], ('bar',))
+
     def test_withroute_and_traverse_tuple(self):
         resource = DummyContext()
         traverser = self._makeOne(resource)
@@ -735,6 +746,146 @@ class ResourcePathTupleTests(unittest.TestCase):
         result = self._callFUT(other2)
         self.assertEqual(result, ('', '', 'other2'))
 
+class CachedResourcePathTests(ResourcePathTests):
+    def setUp(self):
+        from pyramid.testing import setUp
+        setUp(settings={'cache_resource_paths':True})
+
+    def tearDown(self):
+        from pyramid.testing import tearDown
+        from pyramid.traversal import invalidate_resource_paths
+        invalidate_resource_paths()
+        tearDown()
+
+    def _makeTree(self):
+        root = DummyContext(name='')
+        foo = DummyContext(name='foo')
+        foo.__parent__ = root
+        bar = DummyContext(name='bar')
+        bar.__parent__ = foo
+        return root, foo, bar
+
+    def test_remembered(self):
+        root, foo, bar = self._makeTree()
+        self.assertEqual(self._callFUT(bar), '/foo/bar')
+        foo.__name__ = 'moved'
+        self.assertEqual(self._callFUT(bar), '/foo/bar')
+
+    def test_invalidate_resource_paths(self):
+        from pyramid.traversal import invalidate_resource_paths
+        root, foo, bar = self._makeTree()
+        self.assertEqual(self._callFUT(bar, 'x'), '/foo/bar/x')
+        foo.__name__ = 'moved'
+        invalidate_resource_paths()
+        self.assertEqual(self._callFUT(bar, 'x'), '/moved/bar/x')
+
+    def test_not_affected_by_other_configurators(self):
+        from pyramid.config import Configurator
+        root, foo, bar = self._makeTree()
+        self.assertEqual(self._callFUT(bar), '/foo/bar')
+        Configurator(settings={})
+        foo.__name__ = 'moved'
+        self.assertEqual(self._callFUT(bar), '/foo/bar')
+
+    def test_not_remembered_when_disabled(self):
+        from pyramid.testing import setUp
+        root, foo, bar = self._makeTree()
+        self.assertEqual(self._callFUT(bar), '/foo/bar')
+        setUp()
+        foo.__name__ = 'moved'
+        self.assertEqual(self._callFUT(bar), '/moved/bar')
+
+class CachedResourcePathTupleTests(ResourcePathTupleTests):
+    def setUp(self):
+        from pyramid.testing import setUp
+        setUp(settings={'cache_resource_paths':True})
+
+    def tearDown(self):
+        from pyramid.testing import tearDown
+        from pyramid.traversal import invalidate_resource_paths
+        invalidate_resource_paths()
+        tearDown()
+
+    def test_remembered_until_invalidated(self):
+        from pyramid.traversal import invalidate_resource_paths
+        root = DummyContext(name='')
+        foo = DummyContext(name='foo')
+        foo.__parent__ = root
+        self.assertEqual(self._callFUT(foo, 'a'), ('', 'foo', 'a'))
+        foo.__parent__ = None
+        self.assertEqual(self._callFUT(foo), ('', 'foo'))
+        invalidate_resource_paths()
+        self.assertEqual(self._callFUT(foo), ('foo',))
+
+class TestResourcePathCache(unittest.TestCase):
+    def _makeOne(self):
+        from pyramid.traversal import ResourcePathCache
+        return ResourcePathCache()
+
+    def test_get(self):
+        cache = self._makeOne()
+        root = DummyContext(name=None)
+        foo = DummyContext(name=unicode('La Pe\xc3\xb1a', 'utf-8'))
+        foo.__parent__ = root
+        bar = DummyContext(name='b r')
+        bar.__parent__ = foo
+        result = cache.get(bar)
+        self.assertEqual(result, (('', foo.__name__, 'b r'),
+                                  '/La%20Pe%C3%B1a/b%20r'))
+        self.assertEqual(len(cache.entries), 3)
+        self.assertEqual(cache.get(foo), (('', foo.__name__),
+                                          '/La%20Pe%C3%B1a'))
+
+    def test_siblings_share_parent(self):
+        cache = self._makeOne()
+        root = DummyContext(name='')
+        a = DummyContext(name='a')
+        a.__parent__ = root
+        cache.get(a)
+        entry = cache.entries[id(root)]
+        root.__name__ = 'changed'
+        b = DummyContext(name='b')
+        b.__parent__ = root
+        self.assertEqual(cache.get(b), (('', 'b'), '/b'))
+        self.assertTrue(cache.entries[id(root)] is entry)
+
+    def test_invalidate(self):
+        cache = self._makeOne()
+        root = DummyContext(name='')
+        cache.get(root)
+        cache.invalidate()
+        self.assertEqual(cache.generation, 1)
+        self.assertEqual(cache.entries, {})
+        root.__name__ = 'changed'
+        self.assertEqual(cache.get(root), (('changed',), 'changed'))
+
+    def test_stale_generation(self):
+        cache = self._makeOne()
+        root = DummyContext(name='')
+        cache.get(root)
+        cache.generation = 1
+        root.__name__ = 'changed'
+        self.assertEqual(cache.get(root), (('changed',), 'changed'))
+
+    def test_entry_removed_when_resource_collected(self):
+        import gc
+        cache = self._makeOne()
+        root = DummyContext(name='')
+        cache.get(root)
+        del root
+        gc.collect()
+        self.assertEqual(cache.entries, {})
+
+    def test_resource_not_weakly_referenceable(self):
+        cache = self._makeOne()
+        class Resource(object):
+            __slots__ = ('__name__', '__parent__')
+        root = Resource()
+        root.__name__ = ''
+        root.__parent__ = None
+        self.assertEqual(cache.get(root), (('',), ''))
+        self.assertEqual(cache.entries, {})
+
 class QuotePathSegmentTests(unittest.TestCase):
     def _callFUT(self, s):
         from pyramid.traversal import quote_path_segment
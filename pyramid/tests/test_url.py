@@ -144,6 +144,133 @@ class ResourceURLTests(unittest.TestCase):
         result = self._callFUT(root, request)
         self.assertEqual(result, 'http://example.com/context/')
 
+class Test_resource_urls(unittest.TestCase):
+    def setUp(self):
+        cleanUp()
+
+    def tearDown(self):
+        cleanUp()
+
+    def _callFUT(self, resources, request, *elements, **kw):
+        from pyramid.url import resource_urls
+        return resource_urls(resources, request, *elements, **kw)
+
+    def _makeTree(self):
+        root = DummyResource('', None)
+        folder = DummyResource('folder', root)
+        items = [ DummyResource(name, folder)
+                  for name in ('a', 'b c', unicode('La Pe\xc3\xb1a', 'utf-8')) ]
+        return root, folder, items
+
+    def _resource_urls(self, resources, request, *elements, **kw):
+        from pyramid.url import resource_url
+        return [ resource_url(resource, request, *elements, **kw)
+                 for resource in resources ]
+
+    def test_same_as_resource_url(self):
+        root, folder, items = self._makeTree()
+        resources = [root, folder] + items + [items[0]]
+        request = _makeRequest()
+        result = self._callFUT(resources, request)
+        self.assertEqual(result, self._resource_urls(resources, request))
+        self.assertEqual(result[:4],
+                         ['http://example.com:5432/',
+                          'http://example.com:5432/folder/',
+                          'http://example.com:5432/folder/a/',
+                          'http://example.com:5432/folder/b%20c/'])
+
+    def test_with_elements_query_and_anchor(self):
+        root, folder, items = self._makeTree()
+        request = _makeRequest()
+        result = self._callFUT(items, request, 'edit', query={'a':'1'},
+                               anchor='x')
+        self.assertEqual(result, self._resource_urls(
+            items, request, 'edit', query={'a':'1'}, anchor='x'))
+        self.assertEqual(result[0],
+                         'http://example.com:5432/folder/a/edit?a=1#x')
+
+    def test_virtual_root(self):
+        from pyramid.interfaces import VH_ROOT_KEY
+        root, folder, items = self._makeTree()
+        request = _makeRequest({VH_ROOT_KEY:'/folder'})
+        resources = [root] + items
+        result = self._callFUT(resources, request)
+        self.assertEqual(result, self._resource_urls(resources, request))
+        self.assertEqual(result[:2], ['http://example.com:5432/',
+                                      'http://example.com:5432/a/'])
+
+    def test_named_root_and_no_parent_attribute(self):
+        root = DummyContext()
+        root.__name__ = 'root'
+        child = DummyResource('child', root)
+        request = _makeRequest()
+        result = self._callFUT([child, root], request)
+        self.assertEqual(result, self._resource_urls([child, root], request))
+
+    def test_lazy_resources(self):
+        # resources which are freed while the call runs must not be
+        # mistaken for the earlier resources whose ids they reuse
+        root = DummyResource('', None)
+        def resources():
+            for i in range(200):
+                parent = DummyResource('p%d' % i, root)
+                yield DummyResource('item%d' % i, parent)
+        request = _makeRequest()
+        result = self._callFUT(resources(), request)
+        self.assertEqual(result,
+                         [ 'http://example.com:5432/p%d/item%d/' % (i, i)
+                           for i in range(200) ])
+
+    def test_application_url_computed_once(self):
+        root, folder, items = self._makeTree()
+        request = _makeRequest()
+        L = []
+        class Request(DummyRequest):
+            def application_url(self):
+                L.append(1)
+                return 'http://example.com'
+            application_url = property(application_url)
+        request.__class__ = Request
+        self._callFUT(items, request)
+        self.assertEqual(len(L), 1)
+
+    def test_resource_url_method(self):
+        root, folder, items = self._makeTree()
+        def resource_url(request, info):
+            return 'http://example.com/custom%s' % info['virtual_path']
+        items[0].__resource_url__ = resource_url
+        items[1].__resource_url__ = lambda request, info: None
+        request = _makeRequest()
+        result = self._callFUT(items[:2], request, 'x')
+        self.assertEqual(result, ['http://example.com/custom/folder/a/x',
+                                  'http://example.com:5432/folder/b%20c/x'])
+
+    def test_IContextURL_registered(self):
+        from pyramid.interfaces import IContextURL
+        from zope.interface import Interface
+        from zope.interface import directlyProvides
+        class IMarked(Interface):
+            pass
+        class DummyContextURL(object):
+            def __init__(self, context, request):
+                pass
+            def __call__(self):
+                return 'http://example.com/context/'
+        root, folder, items = self._makeTree()
+        directlyProvides(items[1], IMarked)
+        request = _makeRequest()
+        request.registry.registerAdapter(DummyContextURL,
+                                         (IMarked, Interface), IContextURL)
+        result = self._callFUT(items[:2], request, 'x')
+        self.assertEqual(result, ['http://example.com:5432/folder/a/x',
+                                  'http://example.com/context/x'])
+
+    def test_no_registry_on_request(self):
+        root, folder, items = self._makeTree()
+        request = DummyRequest()
+        result = self._callFUT([folder], request)
+        self.assertEqual(result, ['http://example.com:5432/folder/'])
+
 class TestRouteUrl(unittest.TestCase):
     def setUp(self):
         cleanUp()
@@ -392,6 +519,11 @@ class DummyContext(object):
     def __init__(self, next=None):
         self.next = next
         
+class DummyResource(object):
+    def __init__(self, name, parent):
+        self.__name__ = name
+        self.__parent__ = parent
+
 class DummyRequest:
     application_url = 'http://example.com:5432' # app_url never ends with slash
     script_name = ''
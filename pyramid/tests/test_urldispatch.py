@@ -42,6 +42,10 @@ class TestRoute(unittest.TestCase):
         route = self._makeOne('name', ':path')
         self.assertEqual(route.generate({'path':'abc'}), '/abc')
 
+    def test_first_segment(self):
+        route = self._makeOne('name', 'archives/:action')
+        self.assertEqual(route.first_segment, 'archives')
+
 class RoutesMapperTests(unittest.TestCase):
     def setUp(self):
         testing.setUp()
@@ -79,6 +83,14 @@ class RoutesMapperTests(unittest.TestCase):
         self.assertEqual(result['match'], None)
         self.assertEqual(result['route'], None)
 
+    def test_no_route_matches_result_not_shared(self):
+        mapper = self._makeOne()
+        request = self._getRequest(PATH_INFO='/')
+        result = mapper(request)
+        result['route'] = 'route'
+        result = mapper(request)
+        self.assertEqual(result['route'], None)
+
     def test_connect_name_exists_removes_old(self):
         mapper = self._makeOne()
         mapper.connect('foo', 'archives/:action/:article')
@@ -240,6 +252,50 @@ class RoutesMapperTests(unittest.TestCase):
         result = mapper.get_route('whatever')
         self.assertEqual(result, None)
 
+    def test_candidate_routes(self):
+        mapper = self._makeOne()
+        foo = mapper.connect('foo', 'foo/:id')
+        anything = mapper.connect('anything', ':name/edit')
+        foo2 = mapper.connect('foo2', '/foo')
+        bar = mapper.connect('bar', 'bar/*rest')
+        self.assertEqual(mapper.candidate_routes('/foo/1'),
+                         [foo, anything, foo2])
+        self.assertEqual(mapper.candidate_routes('/bar/baz'), [anything, bar])
+        self.assertEqual(mapper.candidate_routes('/other/edit'), [anything])
+        self.assertEqual(mapper.candidate_routes('/'), [anything])
+
+    def test_candidate_routes_index_rebuilt_on_connect(self):
+        mapper = self._makeOne()
+        old = mapper.connect('foo', 'foo/:id')
+        first = mapper.candidate_routes('/foo/1')
+        self.assertTrue(mapper.candidate_routes('/foo/2') is first)
+        new = mapper.connect('foo', 'bar/:id')
+        self.assertEqual(mapper.candidate_routes('/foo/1'), [])
+        self.assertEqual(mapper.candidate_routes('/bar/1'), [new])
+        # lists handed out earlier are not mutated
+        self.assertEqual(first, [old])
+
+    def test_candidate_routes_routelist_changed_directly(self):
+        from pyramid.urldispatch import Route
+        mapper = self._makeOne()
+        mapper.connect('foo', 'foo/:id')
+        mapper.candidate_routes('/foo/1')
+        route = Route('foo2', 'foo/:id/:x')
+        mapper.routelist.append(route)
+        self.assertEqual(mapper.candidate_routes('/foo/1/2')[-1], route)
+        mapper.routelist = [route]
+        self.assertEqual(mapper.candidate_routes('/foo/1/2'), [route])
+
+    def test___call__uses_candidate_routes_in_order(self):
+        mapper = self._makeOne()
+        mapper.connect('other', 'other/:id')
+        mapper.connect('any', ':section/:id')
+        mapper.connect('foo', 'foo/:id')
+        request = self._getRequest(PATH_INFO='/foo/1')
+        result = mapper(request)
+        self.assertEqual(result['route'], mapper.routes['any'])
+        self.assertEqual(result['match'], {'section':'foo', 'id':'1'})
+
     def test_generate(self):
         mapper = self._makeOne()
         def generator(kw):
@@ -334,6 +390,30 @@ class TestCompileRoute(unittest.TestCase):
         self.assertEqual(generator({'buz':'2001-Nov-15'}), '/2001-Nov-15')
         self.assertEqual(generator({'buz':'99-June-10'}), '/99-June-10')
 
+class Test_first_segment(unittest.TestCase):
+    def _callFUT(self, pattern):
+        from pyramid.urldispatch import _first_segment
+        return _first_segment(pattern)
+
+    def test_literal(self):
+        self.assertEqual(self._callFUT('/foo'), 'foo')
+        self.assertEqual(self._callFUT('foo/bar'), 'foo')
+        self.assertEqual(self._callFUT('/'), '')
+        self.assertEqual(self._callFUT(''), '')
+
+    def test_replacement_marker_after_first_segment(self):
+        self.assertEqual(self._callFUT('/foo/{id}'), 'foo')
+        self.assertEqual(self._callFUT('/foo/:id'), 'foo')
+        self.assertEqual(self._callFUT('/foo/*traverse'), 'foo')
+        self.assertEqual(self._callFUT('/foo/bar{id:\d{4}}'), 'foo')
+
+    def test_replacement_marker_in_first_segment(self):
+        self.assertEqual(self._callFUT('/{id}'), None)
+        self.assertEqual(self._callFUT('/foo{id}/bar'), None)
+        self.assertEqual(self._callFUT(':id'), None)
+        self.assertEqual(self._callFUT('/foo*traverse'), None)
+        self.assertEqual(self._callFUT('*traverse'), None)
+
 class TestCompileRouteMatchFunctional(unittest.TestCase):
     def matches(self, pattern, path, expected):
         from pyramid.urldispatch import _compile_route
@@ -253,13 +253,17 @@ class TestViewConfigDecorator(unittest.TestCase):
     def test_create_nondefaults(self):
         decorator = self._makeOne(name=None, request_type=None, for_=None,
                                   permission='foo', mapper='mapper',
-                                  decorator='decorator')
+                                  decorator='decorator', etag='etag',
+                                  last_modified='last_modified', cache=60)
         self.assertEqual(decorator.name, None)
         self.assertEqual(decorator.request_type, None)
         self.assertEqual(decorator.context, None)
         self.assertEqual(decorator.permission, 'foo')
         self.assertEqual(decorator.mapper, 'mapper')
         self.assertEqual(decorator.decorator, 'decorator')
+        self.assertEqual(decorator.etag, 'etag')
+        self.assertEqual(decorator.last_modified, 'last_modified')
+        self.assertEqual(decorator.cache, 60)
         
     def test_call_function(self):
         decorator = self._makeOne()
@@ -469,6 +473,54 @@ class TestAppendSlashNotFoundViewFactory(BaseTest, unittest.TestCase):
         response = view(context, request)
         self.assertEqual(response, 'OK')
 
+    def _registerMapper(self, reg):
+        from pyramid.interfaces import IRoutesMapper
+        from pyramid.urldispatch import RoutesMapper
+        mapper = RoutesMapper()
+        reg.registerUtility(mapper, IRoutesMapper)
+        return mapper
+
+    def test_matches_candidate_route(self):
+        request = self._makeRequest(PATH_INFO='/foo/abc')
+        context = ExceptionResponse()
+        mapper = self._registerMapper(request.registry)
+        mapper.connect('bar', 'bar/:id/')
+        mapper.connect('foo', 'foo/:id/')
+        view = self._makeOne(None)
+        response = view(context, request)
+        self.assertEqual(response.status, '302 Found')
+        self.assertEqual(response.location, '/foo/abc/')
+        self.assertEqual(view.misses.get('/foo/abc/'), None)
+
+    def test_miss_remembered(self):
+        request = self._makeRequest(PATH_INFO='/foo/abc')
+        context = ExceptionResponse()
+        mapper = self._registerMapper(request.registry)
+        route = mapper.connect('foo', 'foo/:id')
+        L = []
+        match = route.match
+        def counting_match(path):
+            L.append(path)
+            return match(path)
+        route.match = counting_match
+        view = self._makeOne(None)
+        response = view(context, request)
+        self.assertEqual(response.status, '404 Not Found')
+        response = view(context, request)
+        self.assertEqual(response.status, '404 Not Found')
+        self.assertEqual(L, ['/foo/abc/'])
+
+    def test_miss_forgotten_when_routes_added(self):
+        request = self._makeRequest(PATH_INFO='/foo/abc')
+        context = ExceptionResponse()
+        mapper = self._registerMapper(request.registry)
+        view = self._makeOne(None)
+        response = view(context, request)
+        self.assertEqual(response.status, '404 Not Found')
+        mapper.connect('foo', 'foo/:id/')
+        response = view(context, request)
+        self.assertEqual(response.status, '302 Found')
+
 class Test_default_exceptionresponse_view(unittest.TestCase):
     def _callFUT(self, context, request):
         from pyramid.view import default_exceptionresponse_view
@@ -84,6 +84,23 @@ class WSGIApp2Tests(unittest.TestCase):
         self.assertEqual(request.environ['PATH_INFO'], '/')
         self.assertEqual(request.environ['SCRIPT_NAME'], '')
 
+class WSGIApp2StreamTests(unittest.TestCase):
+    def _callFUT(self, app):
+        from pyramid.wsgi import wsgiapp2
+        return wsgiapp2(app, stream=True)
+
+    def test_decorator_does_not_copy_request(self):
+        context = DummyContext()
+        request = DummyRequest()
+        request.subpath = ('subpath',)
+        request.environ = {'SCRIPT_NAME':'/foo', 'PATH_INFO':'/b/subpath'}
+        decorator = self._callFUT(dummyapp)
+        response = decorator(context, request)
+        self.assertEqual(response, dummyapp)
+        self.assertFalse(hasattr(request, 'copied'))
+        self.assertEqual(request.environ['PATH_INFO'], '/b/subpath')
+        self.assertEqual(decorator.__name__, dummyapp.__name__)
+
 def dummyapp(environ, start_response):
     """ """
 
@@ -91,6 +108,9 @@ class DummyContext:
     pass
 
 class DummyRequest:
+    def __init__(self, environ=None):
+        self.environ = environ
+
     def get_response(self, application):
         return application
 
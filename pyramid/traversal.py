@@ -1,5 +1,7 @@
+import threading
 import urllib
 import warnings
+import weakref
 
 from zope.interface import implements
 from zope.interface.interfaces import IInterface
@@ -155,6 +157,12 @@ def resource_path(resource, *elements):
        be imported as ``model_path``, although doing so will cause
        a deprecation warning to be emitted.
     """
+    if _path_cache_enabled():
+        path = _resource_path_cache.get(resource)[1]
+        if elements:
+            path = path + '/' + '/'.join(
+                [quote_path_segment(x) for x in elements])
+        return path or '/'
     # joining strings is a bit expensive so we delegate to a function
     # which caches the joined result for us
     return _join_path_tuple(resource_path_tuple(resource, *elements))
@@ -367,6 +375,8 @@ def resource_path_tuple(resource, *elements):
        deprecation warning to be emitted.
 
     """
+    if _path_cache_enabled():
+        return _resource_path_cache.get(resource)[0] + elements
     return tuple(_resource_path_list(resource, *elements))
 
 model_path_tuple = resource_path_tuple  # b/w compat
@@ -386,6 +396,91 @@ def _resource_path_list(resource, *elements):
 
 _model_path_list = _resource_path_list # b/w compat, not an API
 
+class ResourcePathCache(object):
+    """ Remembers the path tuple and the quoted path string of resources,
+    keyed on resource identity, so that the path of a resource whose parent
+    path is known is computed without walking its :term:`lineage`.  Entries
+    are held by weak reference and are discarded when their resource is
+    garbage collected; resources which cannot be weakly referenced are not
+    remembered.  All entries are invalidated by :meth:`invalidate`."""
+    def __init__(self):
+        self.generation = 0
+        self.entries = {} # id(resource) -> (ref, generation, paths)
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        """ Forget the paths of all resources."""
+        self.lock.acquire()
+        try:
+            self.generation += 1
+            self.entries.clear()
+        finally:
+            self.lock.release()
+
+    def get(self, resource):
+        """ Return a tuple ``(path_tuple, path)``, where ``path_tuple`` is
+        the result of :func:`resource_path_tuple` for ``resource`` and
+        ``path`` is the quoted segments of ``path_tuple`` joined by
+        slashes."""
+        # the generation is read before the paths are computed, so that
+        # paths computed across an invalidation are stored as stale
+        generation = self.generation
+        entries = self.entries
+        unknown = []
+        paths = None
+        while resource is not None:
+            entry = entries.get(id(resource))
+            if (entry is not None and entry[1] == generation and
+                entry[0]() is resource):
+                paths = entry[2]
+                break
+            unknown.append(resource)
+            resource = getattr(resource, '__parent__', None)
+        while unknown:
+            resource = unknown.pop()
+            name = resource.__name__ or ''
+            if paths is None:
+                paths = ((name,), quote_path_segment(name))
+            else:
+                paths = (paths[0] + (name,),
+                         paths[1] + '/' + quote_path_segment(name))
+            self._store(resource, generation, paths)
+        return paths
+
+    def _store(self, resource, generation, paths):
+        key = id(resource)
+        entries = self.entries
+        def remove(ref):
+            entry = entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del entries[key]
+        try:
+            ref = weakref.ref(resource, remove)
+        except TypeError:
+            return
+        entries[key] = (ref, generation, paths)
+
+_resource_path_cache = ResourcePathCache()
+
+def _path_cache_enabled():
+    # read from the settings of the current registry on each call, so that
+    # every application in the process decides for itself
+    settings = get_current_registry().settings
+    return settings is not None and settings.get('cache_resource_paths')
+
+def invalidate_resource_paths():
+    """ Invalidate the paths remembered for resources when the
+    ``cache_resource_paths`` setting is true.  An application which enables
+    that setting *must* call this function whenever it changes the
+    ``__name__`` or ``__parent__`` of a resource whose path may already have
+    been computed (e.g. when a resource is renamed, moved or removed), or
+    :func:`pyramid.traversal.resource_path`,
+    :func:`pyramid.traversal.resource_path_tuple` and the URLs generated for
+    the resource and its descendants will continue to reflect its old
+    position.  Calling this function when the setting is false is
+    harmless."""
+    _resource_path_cache.invalidate()
+
 def virtual_root(resource, request):
     """
     Provided any :term:`resource` and a :term:`request` object, return
@@ -581,7 +676,14 @@ class ResourceTreeTraverser(object):
 
         if 'bfg.routes.matchdict' in environ:
             matchdict = environ['bfg.routes.matchdict']
+        elif getattr(request, 'matched_route', None) is not None:
+            # the router does not set the bfg.routes.* environ keys when
+            # the ``lean_router`` setting is enabled
+            matchdict = request.matchdict
+        else:
+            matchdict = None
 
+        if matchdict is not None:
             path = matchdict.get('traverse', '/') or '/'
             if hasattr(path, '__iter__'):
                 # this is a *traverse stararg (not a {traverse})
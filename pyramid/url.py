@@ -3,12 +3,14 @@
 import os
 
 from zope.deprecation import deprecated
+from zope.interface import providedBy
 
 from repoze.lru import lru_cache
 
 from pyramid.interfaces import IContextURL
 from pyramid.interfaces import IRoutesMapper
 from pyramid.interfaces import IStaticURLInfo
+from pyramid.interfaces import VH_ROOT_KEY
 
 from pyramid.encode import urlencode
 from pyramid.path import caller_package
@@ -291,6 +293,104 @@ def resource_url(resource, request, *elements, **kw):
         context_url = TraversalContextURL(resource, request)
     resource_url = context_url()
 
+    return resource_url + _url_suffix(elements, kw)
+
+model_url = resource_url # b/w compat (forever)
+
+deprecated(
+    'model_url',
+    'pyramid.url.model_url is deprecated as of Pyramid 1.0.  Use'
+    '``pyramid.url.resource_url`` instead (API-compat, simple '
+    'rename).')
+
+def resource_urls(resources, request, *elements, **kw):
+    """
+    Return a list of the URLs of each :term:`resource` in the sequence
+    ``resources``, in the same order.  The result is the same as calling
+    :func:`pyramid.url.resource_url` with ``request``, ``*elements`` and
+    ``**kw`` for each resource in turn, but it is computed faster when many
+    URLs are generated at once (e.g. for the items of a folder listing):
+    the application URL, the virtual root and the query string and anchor
+    are computed once, and the path of each parent resource is computed
+    once for all of its children.
+
+    .. note:: Calling :meth:`pyramid.Request.resource_urls` can be used to
+              achieve the same result as :func:`pyramid.url.resource_urls`.
+
+    Resources for which an :class:`pyramid.interfaces.IContextURL` adapter
+    is registered are passed to that adapter, as they are by
+    :func:`pyramid.url.resource_url`.
+    """
+    try:
+        reg = request.registry
+    except AttributeError:
+        reg = get_current_registry() # b/c
+
+    suffix = _url_suffix(elements, kw)
+    lookup = reg.adapters.lookup
+    request_iface = providedBy(request)
+    vroot_path = request.environ.get(VH_ROOT_KEY)
+    app_url = None
+    paths = {} # id(resource) -> (resource, its path)
+    result = []
+
+    for resource in resources:
+        factory = lookup((providedBy(resource), request_iface), IContextURL)
+        if factory is not None:
+            result.append(factory(resource, request)() + suffix)
+            continue
+
+        physical_path = _resource_path(resource, paths) or '/'
+        if physical_path != '/':
+            physical_path = physical_path + '/'
+        virtual_path = physical_path
+        if vroot_path is not None:
+            if physical_path.startswith(vroot_path):
+                virtual_path = physical_path[len(vroot_path):]
+
+        local_url = getattr(resource, '__resource_url__', None)
+        if local_url is not None:
+            url = local_url(request,
+                            {'virtual_path':virtual_path,
+                             'physical_path':physical_path},
+                            )
+            if url is not None:
+                result.append(url + suffix)
+                continue
+
+        if app_url is None:
+            app_url = request.application_url # never ends in a slash
+        result.append(app_url + virtual_path + suffix)
+
+    return result
+
+def _resource_path(resource, paths):
+    # the quoted names of the lineage of ``resource`` joined by slashes, as
+    # computed by pyramid.traversal.resource_path (but without turning an
+    # empty path into '/'); the paths of ``resource`` and its ancestors are
+    # remembered in ``paths`` so that siblings share them; each resource is
+    # stored along with its path, so that its id is not reused by another
+    # resource (e.g. when the resources are created lazily)
+    unknown = []
+    path = None
+    while resource is not None:
+        entry = paths.get(id(resource))
+        if entry is not None and entry[0] is resource:
+            path = entry[1]
+            break
+        unknown.append(resource)
+        resource = getattr(resource, '__parent__', None)
+    while unknown:
+        resource = unknown.pop()
+        name = quote_path_segment(resource.__name__ or '')
+        if path is None:
+            path = name
+        else:
+            path = path + '/' + name
+        paths[id(resource)] = (resource, path)
+    return path
+
+def _url_suffix(elements, kw):
     qs = ''
     anchor = ''
 
@@ -308,15 +408,7 @@ def resource_url(resource, request, *elements, **kw):
     else:
         suffix = ''
 
-    return resource_url + suffix + qs + anchor
-
-model_url = resource_url # b/w compat (forever)
-
-deprecated(
-    'model_url',
-    'pyramid.url.model_url is deprecated as of Pyramid 1.0.  Use'
-    '``pyramid.url.resource_url`` instead (API-compat, simple '
-    'rename).')
+    return suffix + qs + anchor
 
 def static_url(path, request, **kw):
     """
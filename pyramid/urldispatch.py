@@ -5,7 +5,6 @@ from zope.interface import implements
 from pyramid.interfaces import IRoutesMapper
 from pyramid.interfaces import IRoute
 
-from pyramid.compat import all
 from pyramid.encode import url_quote
 from pyramid.exceptions import URLDecodeError
 from pyramid.traversal import traversal_path
@@ -21,6 +20,7 @@ class Route(object):
         self.pattern = pattern
         self.path = pattern # indefinite b/w compat, not in interface
         self.match, self.generate = _compile_route(pattern)
+        self.first_segment = _first_segment(pattern)
         self.name = name
         self.factory = factory
         self.predicates = predicates
@@ -31,6 +31,7 @@ class RoutesMapper(object):
     def __init__(self):
         self.routelist = []
         self.routes = {}
+        self._index = None # see _build_index
 
     def has_routes(self):
         return bool(self.routelist)
@@ -51,11 +52,42 @@ class RoutesMapper(object):
         if not static:
             self.routelist.append(route)
         self.routes[name] = route
+        self._index = None
         return route
 
     def generate(self, name, kw):
         return self.routes[name].generate(kw)
 
+    def _build_index(self):
+        # Map the literal first path segment of each route which has one to
+        # the list of routes which may match a path starting with that
+        # segment: the routes with that first segment and the routes with
+        # no literal first segment, in the order they were connected.  The
+        # lists are replaced (never mutated) when routes are connected.
+        routelist = list(self.routelist)
+        segments = set([ route.first_segment for route in routelist ])
+        segments.discard(None)
+        index = {}
+        for segment in segments:
+            index[segment] = [ route for route in routelist
+                               if route.first_segment in (segment, None) ]
+        default = [ route for route in routelist if route.first_segment is None ]
+        self._index = index, default, self.routelist, len(routelist)
+        return self._index
+
+    def candidate_routes(self, path):
+        """ Return the routes whose pattern may match ``path``, in the order
+        they were connected.  Routes whose pattern starts with a literal
+        path segment other than the first segment of ``path`` are
+        omitted."""
+        index = self._index
+        routelist = self.routelist
+        if (index is None or index[2] is not routelist or
+            index[3] != len(routelist)):
+            index = self._build_index()
+        segment = path[1:].split('/', 1)[0]
+        return index[0].get(segment, index[1])
+
     def __call__(self, request):
         environ = request.environ
         try:
@@ -64,14 +96,15 @@ class RoutesMapper(object):
         except KeyError:
             path = '/'
 
-        for route in self.routelist:
+        for route in self.candidate_routes(path):
             match = route.match(path)
             if match is not None:
-                preds = route.predicates
                 info = {'match':match, 'route':route}
-                if preds and not all((p(info, request) for p in preds)):
-                    continue
-                return info
+                for predicate in route.predicates:
+                    if not predicate(info, request):
+                        break
+                else:
+                    return info
 
         return {'route':None, 'match':None}
 
@@ -89,7 +122,7 @@ def update_pattern(matchobj):
     name = matchobj.group(0)
     return '{%s}' % name[1:]
 
-def _compile_route(route):
+def _normalize_route(route):
     if old_route_re.search(route) and not route_re.search(route):
         route = old_route_re.sub(update_pattern, route)
 
@@ -100,6 +133,24 @@ def _compile_route(route):
 
     if '*' in route and not star_in_brackets.search(route):
         route, star = route.rsplit('*', 1)
+
+    return route, star
+
+def _first_segment(route):
+    """ Return the first segment of every path matched by the route
+    pattern ``route`` if it is literal text, or ``None`` if it contains a
+    replacement marker or star."""
+    route, star = _normalize_route(route)
+    pat = route_re.split(route)
+    prefix = pat[0][1:]
+    if '/' in prefix:
+        return prefix.split('/', 1)[0]
+    if len(pat) == 1 and not star:
+        return prefix
+    return None
+
+def _compile_route(route):
+    route, star = _normalize_route(route)
     pat = route_re.split(route)
     pat.reverse()
     rpat = []
@@ -1,6 +1,8 @@
 import mimetypes
 import venusian
 
+from repoze.lru import LRUCache
+
 from zope.interface import providedBy
 from zope.deprecation import deprecated
 
@@ -176,7 +178,8 @@ class view_config(object):
     :class:`pyramid.view.view_config`: ``context``, ``permission``, ``name``,
     ``request_type``, ``route_name``, ``request_method``, ``request_param``,
     ``containment``, ``xhr``, ``accept``, ``header``, ``path_info``,
-    ``custom_predicates``, ``decorator``, and ``mapper``.
+    ``custom_predicates``, ``decorator``, ``mapper``, ``etag``,
+    ``last_modified`` and ``cache``.
 
     The meanings of these arguments are the same as the arguments passed to
     :meth:`pyramid.config.Configurator.add_view`.
@@ -191,7 +194,7 @@ class view_config(object):
                  containment=None, attr=None, renderer=None, wrapper=None,
                  xhr=False, accept=None, header=None, path_info=None,
                  custom_predicates=(), context=None, decorator=None,
-                 mapper=None):
+                 mapper=None, etag=None, last_modified=None, cache=None):
         self.name = name
         self.request_type = request_type
         self.context = context or for_
@@ -210,6 +213,9 @@ class view_config(object):
         self.custom_predicates = custom_predicates
         self.decorator = decorator
         self.mapper = mapper
+        self.etag = etag
+        self.last_modified = last_modified
+        self.cache = cache
 
     def __call__(self, wrapped):
         settings = self.__dict__.copy()
@@ -284,11 +290,20 @@ class AppendSlashNotFoundViewFactory(object):
     view callable calling convention of ``(context, request)``
     (``context`` will be the exception object).
 
+    Only the routes which may match the slash-appended path are tried, and
+    the most recent slash-appended paths known not to match any route (up
+    to ``miss_cache_size`` of them) are remembered, so that a flood of
+    requests for nonexistent URLs does not try every route for each
+    request.
+
     """
+    miss_cache_size = 1000
+
     def __init__(self, notfound_view=None):
         if notfound_view is None:
             notfound_view = default_exceptionresponse_view
         self.notfound_view = notfound_view
+        self.misses = LRUCache(self.miss_cache_size)
 
     def __call__(self, context, request):
         if not isinstance(context, Exception):
@@ -300,12 +315,24 @@ class AppendSlashNotFoundViewFactory(object):
         mapper = registry.queryUtility(IRoutesMapper)
         if mapper is not None and not path.endswith('/'):
             slashpath = path + '/'
-            for route in mapper.get_routes():
+            candidate_routes = getattr(mapper, 'candidate_routes', None)
+            if candidate_routes is None:
+                routes = mapper.get_routes()
+            else:
+                routes = candidate_routes(slashpath)
+                # the candidate lists of a mapper are replaced when routes
+                # are added, so a miss recorded against another list is
+                # stale
+                if self.misses.get(slashpath) is routes:
+                    return self.notfound_view(context, request)
+            for route in routes:
                 if route.match(slashpath) is not None:
                     qs = request.query_string
                     if qs:
                         slashpath += '?' + qs
                     return HTTPFound(location=slashpath)
+            if candidate_routes is not None:
+                self.misses.put(slashpath, routes)
         return self.notfound_view(context, request)
 
 append_slash_notfound_view = AppendSlashNotFoundViewFactory()
@@ -33,7 +33,7 @@ def wsgiapp(wrapped):
         return request.get_response(wrapped)
     return wraps(wrapped)(decorator)
 
-def wsgiapp2(wrapped):
+def wsgiapp2(wrapped, stream=False):
     """ Decorator to turn a WSGI application into a :app:`Pyramid`
     view callable.  This decorator differs from the
     :func:`pyramid.wsgi.wsgiapp` decorator inasmuch as fixups of
@@ -63,8 +63,21 @@ def wsgiapp2(wrapped):
     generated, and the :term:`subpath` of the request passed to ``wsgiapp2``
     is used as the new request's ``PATH_INFO`` and everything preceding the
     subpath is used as the ``SCRIPT_NAME``.  The new environment is passed to
-    the downstream WSGI application."""
+    the downstream WSGI application.
+
+    By default, the request body is copied (into memory, or a temporary file
+    if it is large) before the downstream application is invoked, so that it
+    remains readable via the original request afterwards.  If ``stream`` is
+    ``True``, the downstream application instead shares the original
+    request's ``wsgi.input`` and can read a large request body (e.g. a file
+    upload) as it arrives; the body can then no longer be read via the
+    original request.  To use this mode, call ``wsgiapp2`` directly instead of
+    using it as a decorator, e.g.::
+
+        config.add_view(wsgiapp2(upload_app, stream=True), name='upload')
+    """
 
     def decorator(context, request):
-        return call_app_with_subpath_as_path_info(request, wrapped)
+        return call_app_with_subpath_as_path_info(request, wrapped,
+                                                  stream=stream)
     return wraps(wrapped)(decorator)